@@ -0,0 +1,180 @@
+import json
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+
+try:
+    from google.api_core import exceptions
+except ImportError:
+    # the local storage backend runs without the Google client libraries
+    exceptions = None
+
+# Firestore limits one commit to 500 writes and 10 MiB; stay under the size
+MAX_OPERATIONS = 500
+MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 0.5
+
+# errors caused by contention or load; the whole batch is safe to resend
+RETRYABLE_ERRORS = ()
+if exceptions is not None:
+    RETRYABLE_ERRORS = (
+        exceptions.Aborted,
+        exceptions.DeadlineExceeded,
+        exceptions.InternalServerError,
+        exceptions.ResourceExhausted,
+        exceptions.ServiceUnavailable,
+    )
+
+
+def estimate_size(data: Any) -> int:
+    """
+    Return an estimate in bytes of how large a value is when written.
+    """
+    return len(json.dumps(data, default=str).encode("utf-8"))
+
+
+class BatchWriter:
+    """
+    Collect Firestore writes into batches and commit them from a thread pool.
+
+    A batch is sent as soon as it reaches max_operations writes or max_bytes
+    of estimated payload, and up to workers batches are committed at once
+    while the caller keeps adding writes. The writes of a batch are kept as
+    plain operations so a batch that fails with a contention error is
+    rebuilt and sent again; set, update with fixed values and delete give
+    the same result when applied twice.
+
+    Use it as a context manager, or call close() to wait for every commit
+    and print the throughput.
+    """
+
+    def __init__(
+        self,
+        db,
+        label: str = "documents",
+        max_operations: int = MAX_OPERATIONS,
+        max_bytes: int = MAX_BYTES,
+        workers: int = DEFAULT_WORKERS,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+    ):
+        self.db = db
+        self.label = label
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.executor = ThreadPoolExecutor(workers)
+        self.in_flight = deque()
+        self.pending = []
+        self.pending_bytes = 0
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.operations = 0
+        self.bytes = 0
+        self.batches = 0
+        self.retried = 0
+
+    def set(self, ref, data: Dict[str, Any], merge: bool = False) -> None:
+        self._add(("set", ref, data, merge), estimate_size(data) + len(ref.path))
+
+    def update(self, ref, data: Dict[str, Any]) -> None:
+        self._add(("update", ref, data, None), estimate_size(data) + len(ref.path))
+
+    def delete(self, ref) -> None:
+        self._add(("delete", ref, None, None), len(ref.path))
+
+    def flush(self) -> None:
+        """
+        Send the writes collected so far as one batch.
+        """
+        if not self.pending:
+            return
+        operations = self.pending
+        size = self.pending_bytes
+        self.pending = []
+        self.pending_bytes = 0
+        # keep at most two batches per worker queued so memory stays bounded
+        while len(self.in_flight) >= 2 * self.workers:
+            self.in_flight.popleft().result()
+        self.in_flight.append(self.executor.submit(self._commit, operations, size))
+
+    def close(self) -> None:
+        """
+        Send the remaining writes, wait for every commit and print the
+        throughput. Raises the error of a batch that could not be committed.
+        """
+        self.flush()
+        try:
+            while self.in_flight:
+                self.in_flight.popleft().result()
+        finally:
+            self.executor.shutdown(wait=True)
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stats = self.get_stats()
+        print(
+            f"Committed {stats['operations']} {self.label} writes in "
+            f"{stats['batches']} batches ({stats['retried']} retried), "
+            f"{stats['operations'] / elapsed:.0f} writes/s, "
+            f"{stats['bytes'] / elapsed / 1024:.0f} KiB/s"
+        )
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "operations": self.operations,
+                "bytes": self.bytes,
+                "batches": self.batches,
+                "retried": self.retried,
+            }
+
+    def _add(self, operation, size: int) -> None:
+        if self.pending and (
+            len(self.pending) >= self.max_operations
+            or self.pending_bytes + size > self.max_bytes
+        ):
+            self.flush()
+        self.pending.append(operation)
+        self.pending_bytes += size
+
+    def _commit(self, operations, size: int) -> None:
+        for attempt in range(self.retries + 1):
+            batch = self.db.batch()
+            for kind, ref, data, merge in operations:
+                if kind == "set":
+                    batch.set(ref, data, merge=merge)
+                elif kind == "update":
+                    batch.update(ref, data)
+                else:
+                    batch.delete(ref)
+            try:
+                batch.commit()
+                break
+            except RETRYABLE_ERRORS as error:
+                if attempt == self.retries:
+                    raise
+                with self.lock:
+                    self.retried += 1
+                delay = self.backoff * (2**attempt) * (1 + random.random())
+                print(f"Retrying batch of {len(operations)} {self.label}: {error}")
+                time.sleep(delay)
+        with self.lock:
+            self.operations += len(operations)
+            self.bytes += size
+            self.batches += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.executor.shutdown(wait=True)
+        return False
@@ -0,0 +1,331 @@
+import argparse
+import ast
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# the builders never touch the database; don't load Firestore credentials
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+import parseText
+from getCourse import get_single_course, get_group, get_section, get_meeting
+
+EXAMPLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "example.py")
+
+SEMESTER = "SP25"
+
+# about the number of classes the roster lists in a fall or spring semester
+DEFAULT_COURSES = 4500
+DEFAULT_ROUNDS = 5
+# a function regresses when it is this much slower or allocates this much more
+DEFAULT_TOLERANCE = 0.25
+
+# share of courses that repeat the requirement text of another course, as
+# cross-listed courses do
+CROSS_LISTED = 0.2
+
+SUBJECTS = ["CS", "MATH", "ECE", "ORIE", "PHYS", "CHEM", "ECON", "INFO", "BTRY"]
+
+PREREQ_FRAGMENTS = [
+    "CS 1110 or CS 1112",
+    "CS 2110 or equivalent",
+    "CS 2800",
+    "MATH 1120, MATH 1920, or equivalent",
+    "MATH 2210, MATH 2940, or equivalent",
+    "linear algebra (e.g. MATH 2940)",
+    "calculus (e.g. MATH 1920)",
+    "probability theory (e.g. BTRY 3010, ECON 3130, MATH 4710, ENGRD 2700)",
+    "programming proficiency (e.g. CS 2110)",
+    "one programming course or equivalent programming experience",
+    "CS 3110/ECE 3140",
+    "PHYS 1112 or equivalent",
+    "ECE 2100-ECE 2200",
+    "For CS majors: CS 3410.",
+    "1) data structures: CS 2110; 2) discrete mathematics: CS 2800;",
+    "excellent performance in CS 2800",
+    "knowledge of Python",
+]
+
+PREREQ_FORMATS = [
+    "Prerequisite: {0}.",
+    "Prerequisite: {0}, {1}, or permission of instructor.",
+    "Prerequisite: {0}; {1}. Corequisite: {2}.",
+    "Prerequisite or corequisite: {0}.",
+    "Prerequisite: {0} and {1}. Prerequisite or corequisite: {2}.",
+]
+
+OVERLAP_TEXTS = [
+    "Forbidden Overlap: due to an overlap in content, students will not receive "
+    "credit for both CS 1110 and CS 1112.",
+    "Forbidden Overlap: due to an overlap in content, students will receive "
+    "credit for only one course in the following group: ECE 2720, ENGRD 2700, "
+    "MATH 1710, STSCI 2100.",
+    "",
+]
+
+
+def load_example_group():
+    """
+    Return the recorded enroll group of example.py without running the file.
+    """
+    with open(EXAMPLE_PATH, "r") as file:
+        tree = ast.parse(file.read())
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and node.targets[0].id == "lst":
+            return ast.literal_eval(node.value)[0]
+    raise ValueError(f"No recorded enroll group in {EXAMPLE_PATH}")
+
+
+def build_semester(count=DEFAULT_COURSES, seed=0):
+    """
+    Return count roster course payloads built around the recorded enroll group.
+
+    Every course keeps the lecture of the recording and a random number of its
+    discussions. Requirement texts are drawn from realistic fragments, and
+    some courses reuse an earlier text like cross-listed courses do.
+    """
+    rng = random.Random(seed)
+    group = load_example_group()
+    lectures = [s for s in group["classSections"] if s["ssrComponent"] == "LEC"]
+    discussions = [s for s in group["classSections"] if s["ssrComponent"] != "LEC"]
+
+    courses = []
+    texts = []
+    for index in range(count):
+        if texts and rng.random() < CROSS_LISTED:
+            text = rng.choice(texts)
+        elif rng.random() < 0.3:
+            text = ""
+        else:
+            fragments = rng.sample(PREREQ_FRAGMENTS, 3)
+            text = rng.choice(PREREQ_FORMATS).format(*fragments)
+            texts.append(text)
+
+        groups = []
+        for _ in range(rng.choice([1, 1, 1, 2])):
+            sections = lectures + rng.sample(discussions, rng.randint(0, 4))
+            groups.append(dict(group, classSections=sections))
+
+        courses.append(
+            {
+                "subject": SUBJECTS[index % len(SUBJECTS)],
+                "catalogNbr": str(1000 + index // len(SUBJECTS)),
+                "titleLong": "Introduction to Computing: A Design and Development "
+                "Perspective",
+                "titleShort": "Intro Computing: Design & Dev",
+                "description": "Programming and problem solving using Python. "
+                "Emphasizes principles of software development, style, and "
+                "testing.\xa0Topics include procedures and functions, iteration, "
+                "recursion, arrays and vectors, strings, and classes.",
+                "catalogPrereqCoreq": text,
+                "catalogComments": "",
+                "catalogWhenOffered": "Fall, Spring, Summer.",
+                "catalogBreadth": "",
+                "catalogDistr": "(SMR-AS)",
+                "catalogAttribute": "",
+                "catalogLang": "",
+                "catalogForbiddenOverlaps": rng.choice(OVERLAP_TEXTS),
+                "catalogFee": "",
+                "catalogSatisfiesReq": "",
+                "catalogPermission": "",
+                "catalogOutcomes": [
+                    "Be fluent in the use of procedural statements.",
+                    "Design, code, and test programs in Python.",
+                ],
+                "catalogCourseSubfield": "",
+                "acadCareer": "UG",
+                "acadGroup": "EN",
+                "enrollGroups": groups,
+            }
+        )
+    return courses
+
+
+def build_workloads(courses, semester=SEMESTER):
+    """
+    Return a dictionary that maps each benchmarked name to its function and
+    the argument tuples of every document it builds for the semester.
+    """
+    preco = []
+    convert = []
+    overlap = []
+    single = []
+    groups = []
+    sections = []
+    meetings = []
+    for course in courses:
+        course_id = course["subject"] + course["catalogNbr"]
+        subject = course["subject"]
+        single.append((course, semester))
+        text = parseText.clean(course["catalogPrereqCoreq"])
+        if text:
+            preco.append((text,))
+            for part in parseText.separate_prereq(text):
+                convert.append((part,))
+        if course["catalogForbiddenOverlaps"]:
+            overlap.append((course["catalogForbiddenOverlaps"],))
+        for group_index, group in enumerate(course["enrollGroups"], 1):
+            group_id = f"{semester}_{course_id}_Grp{group_index}"
+            groups.append((group, group_id, course_id, semester, subject))
+            for section in group["classSections"]:
+                component = f"{section['ssrComponent']}_{section['section']}"
+                section_id = f"{group_id}_{component}"
+                sections.append(
+                    (section, section_id, course_id, group_id, semester, subject)
+                )
+                for i, meeting in enumerate(section["meetings"]):
+                    meetings.append(
+                        (
+                            meeting,
+                            f"{section_id}_meeting{i+1}",
+                            course_id,
+                            group_id,
+                            section_id,
+                            semester,
+                            subject,
+                        )
+                    )
+    return {
+        "convert_prerequisites": (parseText.convert_prerequisites, convert),
+        "parse_preco": (parseText.parse_preco, preco),
+        "parse_overlap": (parseText.parse_overlap, overlap),
+        "get_single_course": (get_single_course, single),
+        "get_group": (get_group, groups),
+        "get_section": (get_section, sections),
+        "get_meeting": (get_meeting, meetings),
+    }
+
+
+def run_once(function, calls):
+    # every round parses the semester from scratch, like one ingest run
+    parseText.PARSER.clear()
+    return [function(*args) for args in calls]
+
+
+def measure(function, calls, rounds=DEFAULT_ROUNDS):
+    """
+    Return the timing and allocations of running function over calls.
+
+    The time is the best of rounds runs with the garbage collector paused.
+    Allocations are measured in one more run with tracemalloc, since tracing
+    slows the timed runs down; the peak includes the built documents.
+    """
+    times = []
+    for _ in range(rounds):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run_once(function, calls)
+            times.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        documents = run_once(function, calls)
+        _, peak = tracemalloc.get_traced_memory()
+        del documents
+    finally:
+        tracemalloc.stop()
+
+    seconds = min(times)
+    docs = max(len(calls), 1)
+    return {
+        "docs": len(calls),
+        "seconds": seconds,
+        "docs_per_sec": len(calls) / seconds if seconds else 0.0,
+        "usec_per_doc": seconds / docs * 1e6,
+        "peak_bytes_per_doc": peak / docs,
+    }
+
+
+def run_benchmarks(courses=DEFAULT_COURSES, rounds=DEFAULT_ROUNDS, only=None):
+    """
+    Return the results of every benchmark, or of the names in only.
+    """
+    workloads = build_workloads(build_semester(courses))
+    results = {}
+    for name, (function, calls) in workloads.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(function, calls, rounds)
+    return results
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Return a message for every function that is slower or allocates more than
+    the baseline allows.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result["docs_per_sec"] < base["docs_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {result['docs_per_sec']:.0f} docs/s, baseline "
+                f"{base['docs_per_sec']:.0f} docs/s"
+            )
+        if result["peak_bytes_per_doc"] > base["peak_bytes_per_doc"] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {result['peak_bytes_per_doc']:.0f} peak bytes/doc, "
+                f"baseline {base['peak_bytes_per_doc']:.0f} bytes/doc"
+            )
+    return regressions
+
+
+def print_results(results):
+    print(
+        f"{'function':<24}{'docs':>8}{'docs/s':>12}{'us/doc':>10}{'peak B/doc':>12}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<24}{result['docs']:>8}{result['docs_per_sec']:>12.0f}"
+            f"{result['usec_per_doc']:>10.1f}{result['peak_bytes_per_doc']:>12.0f}"
+        )
+    # the documents one ingest run writes: courses, groups, sections, meetings
+    builders = ["get_single_course", "get_group", "get_section", "get_meeting"]
+    if all(name in results for name in builders):
+        docs = sum(results[name]["docs"] for name in builders)
+        seconds = sum(results[name]["seconds"] for name in builders)
+        print(f"Built {docs} documents at {docs / seconds:.0f} docs/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the roster parsers and document builders"
+    )
+    parser.add_argument("--courses", type=int, default=DEFAULT_COURSES)
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--only", nargs="*", help="names of the benchmarks to run")
+    parser.add_argument("--save", help="write the results to this json file")
+    parser.add_argument("--baseline", help="compare with results saved earlier")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.courses, args.rounds, args.only)
+    print_results(results)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        for message in regressions:
+            print(f"Regression in {message}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
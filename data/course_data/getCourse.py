@@ -3,30 +3,34 @@ Author: Raymond Xu
 Start Date: February 8, 2025
 """
 
-import firebase_admin
-from firebase_admin import credentials, firestore
 import json
+import hashlib
 import sys
 import os
 from parseText import *
-import requests
+import rosterFetch
+from httpCache import semester_key
+from batchWriter import BatchWriter
+import argparse
 from typing import List, Dict, Any, Tuple
-import time
 
-# store the path of the original directory
-init_sys_path = sys.path.copy()
+# the data directory, for the storage backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from storage import get_db
 
-# moves two levels up (to the project directory)
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
-# moves one more level up (outside the project directory to get account key)
-base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
-key_path = os.path.join(base_dir, "secret-keys\serviceAccountKey.json")
-cred = credentials.Certificate(key_path)
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+db = get_db()
 
-# go back to the original directory
-sys.path = init_sys_path
+# concurrent roster API requests, set with --jobs
+JOBS = rosterFetch.DEFAULT_JOBS
+
+# documents read per get_all call when prefetching
+PREFETCH_CHUNK_SIZE = 300
+
+# compare against stored content hashes and only write what changed, set with --delta
+DELTA = False
+
+# per-semester collections written by upload_courses
+DELTA_COLLECTIONS = ["enrollGroups", "sections", "meetings"]
 
 
 def fetch_subjects_courses(
@@ -43,46 +47,47 @@ def fetch_subjects_courses(
             - List of subject dictionaries
             - List of course data dictionaries
     """
-    print(f"Fetching data for {semester}...")
-
-    # Step 1: Fetch subjects from the subjects API
-    subjects_url = (
-        f"https://classes.cornell.edu/api/2.0/config/subjects.json?roster={semester}"
-    )
-    subjects_response = requests.get(subjects_url)
+    return rosterFetch.fetch_subjects_courses(semester, jobs=JOBS)
 
-    if subjects_response.status_code != 200:
-        print(
-            f"Error fetching subjects for {semester}: {subjects_response.status_code}"
-        )
-        return [], []
 
-    subjects_data = subjects_response.json()
-    if subjects_data.get("status") != "success":
-        print(
-            f"API error for subjects in {semester}: {subjects_data.get('message', 'Unknown error')}"
-        )
-        return [], []
-
-    subjects = subjects_data["data"]["subjects"]
-    print(f"Fetched {len(subjects)} subjects for {semester}")
-
-    # Step 2: Fetch courses for each subject
-    all_courses = []
-    for subject in subjects:
-        subject_code = subject["value"]
-        course_url = f"https://classes.cornell.edu/api/2.0/search/classes.json?roster={semester}&subject={subject_code}"
-        course_response = requests.get(course_url)
+def prefetch_documents(
+    collection: str, doc_ids: List[str], field_paths: List[str] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Read many documents of a collection with batched get_all calls instead of
+    one get() round trip per document.
 
-        if (
-            course_response.status_code == 200
-            and course_response.json()["status"] == "success"
-        ):
-            courses = course_response.json()["data"]["classes"]
-            all_courses.extend(courses)
-            print(f"Fetched {len(courses)} courses for {subject_code} in {semester}")
+    Args:
+        collection: The Firestore collection name
+        doc_ids: The ids of the documents to read
+        field_paths: Only read these fields (default: the whole document)
 
-    return subjects, all_courses
+    Returns:
+        A dictionary that maps the id of every existing document to its data
+    """
+    existing = {}
+    doc_ids = list(dict.fromkeys(doc_ids))
+    for start in range(0, len(doc_ids), PREFETCH_CHUNK_SIZE):
+        refs = [
+            db.collection(collection).document(doc_id)
+            for doc_id in doc_ids[start : start + PREFETCH_CHUNK_SIZE]
+        ]
+        for doc in db.get_all(refs, field_paths=field_paths):
+            if doc.exists:
+                existing[doc.id] = doc.to_dict()
+    print(f"Prefetched {len(existing)} of {len(doc_ids)} {collection} documents")
+    return existing
+
+
+def course_ids(courses: List[Dict[str, Any]], max_level=5) -> List[str]:
+    """
+    Return the ids of the API courses at or below max_level.
+    """
+    return [
+        f"{course['subject']}{course['catalogNbr']}"
+        for course in courses
+        if int(course["catalogNbr"][0]) <= max_level
+    ]
 
 
 def upload_subjects(subjects: List[Dict[str, Any]], semester: str) -> None:
@@ -95,16 +100,18 @@ def upload_subjects(subjects: List[Dict[str, Any]], semester: str) -> None:
         semester: The semester code (e.g., "SP25")
     """
     # Process subjects with proper names from the API
-    subject_batch = db.batch()
-    subject_count = 0
+    writer = BatchWriter(db, "subject")
     subjects_added = 0
+    existing_subjects = prefetch_documents(
+        "subjects", [subject["value"] for subject in subjects], field_paths=["code"]
+    )
 
     for subject in subjects:
         subject_code = subject["value"]
 
         # Check if subject already exists
         subject_ref = db.collection("subjects").document(subject_code)
-        if not subject_ref.get().exists:
+        if subject_code not in existing_subjects:
             # Subject doesn't exist, add it
             subject_data = {
                 "code": subject_code,
@@ -112,36 +119,105 @@ def upload_subjects(subjects: List[Dict[str, Any]], semester: str) -> None:
                 "formalName": subject["descrformal"],
             }
 
-            subject_batch.set(subject_ref, subject_data)
-            subject_count += 1
+            writer.set(subject_ref, subject_data)
+            existing_subjects[subject_code] = subject_data
             subjects_added += 1
 
-            # Commit in smaller batches if needed
-            if subject_count >= 200:
-                subject_batch.commit()
-                subject_batch = db.batch()
-                subject_count = 0
-
-    # Commit any remaining subjects
-    if subject_count > 0:
-        subject_batch.commit()
+    writer.close()
 
     print(f"Added {subjects_added} new subjects for {semester}")
 
 
-def upload_courses(courses: List[Dict[str, Any]], semester: str, max_level=5) -> None:
+def document_hash(data: Dict[str, Any]) -> str:
+    """
+    Return a hash of the content of a document, independent of key order.
+    """
+    content = {key: value for key, value in data.items() if key != "hash"}
+    encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()
+
+
+def prefetch_hashes(collection: str, semester: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Read the stored content hash and subject of every document of a semester
+    in one paged projection query.
+
+    Returns:
+        A dictionary that maps document ids to {"hash": ..., "sbj": ...}
+    """
+    query = (
+        db.collection(collection)
+        .where("semester", "==", semester)
+        .select(["hash", "sbj"])
+    )
+    stored = {doc.id: doc.to_dict() for doc in query.stream()}
+    print(f"Prefetched {len(stored)} {collection} hashes for {semester}")
+    return stored
+
+
+def write_if_changed(
+    writer: BatchWriter,
+    collection: str,
+    doc_id: str,
+    data: Dict[str, Any],
+    stored: Dict[str, Dict[str, Any]],
+    counts: Dict[str, int],
+    delta: bool,
+) -> None:
+    """
+    Set a document. In delta mode the document also stores its content hash,
+    and it is not written if the stored hash shows that the same content is
+    already written.
+    """
+    if not delta:
+        counts["inserted"] += 1
+        writer.set(db.collection(collection).document(doc_id), data)
+        return
+    data["hash"] = document_hash(data)
+    previous = stored.get(doc_id)
+    if previous is None:
+        counts["inserted"] += 1
+    elif previous.get("hash") != data["hash"]:
+        counts["changed"] += 1
+    else:
+        counts["unchanged"] += 1
+        return
+    writer.set(db.collection(collection).document(doc_id), data)
+
+
+def upload_courses(
+    courses: List[Dict[str, Any]], semester: str, max_level=5, delta=None
+) -> None:
     """
     Process course data and upload to Firestore with semester tracking.
     Includes enrollment groups, sections, meetings, and instructors.
 
+    In delta mode every group, section and meeting document also stores a
+    hash of its content. Those hashes are read first, unchanged documents
+    are not written again, and documents of the uploaded subjects that are
+    no longer in the roster are deleted. Without delta mode the documents
+    are written as before, without a hash.
+
     Args:
         courses: List of course data from the API
         semester: The semester code (e.g., "SP25")
+        delta: Only write changes (default: the --delta setting)
     """
-    # Track batch operations to stay within Firestore limits
-    batch = db.batch()
-    batch_count = 0
-    MAX_BATCH_SIZE = 200
+    if delta is None:
+        delta = DELTA
+    # Batches are sized to Firestore limits and committed in the background
+    writer = BatchWriter(db, "course")
+    existing_courses = prefetch_documents(
+        "courses", course_ids(courses, max_level), field_paths=["smst", "creditsTotal"]
+    )
+    stored = {
+        collection: prefetch_hashes(collection, semester) if delta else {}
+        for collection in DELTA_COLLECTIONS
+    }
+    seen = {collection: set() for collection in DELTA_COLLECTIONS}
+    counts = {"inserted": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+    subjects_seen = set()
+    instructors_written = set()
 
     # Process and upload courses with semester tracking
     for course in courses:
@@ -149,32 +225,50 @@ def upload_courses(courses: List[Dict[str, Any]], semester: str, max_level=5) ->
             continue
         course_id = f"{course['subject']}{course['catalogNbr']}"
         subject = course["subject"]
+        subjects_seen.add(subject)
 
         # Check if the course already exists
         course_ref = db.collection("courses").document(course_id)
-        course_doc = course_ref.get()
+        existing_data = existing_courses.get(course_id)
+        credits = course_credits(course)
 
-        if course_doc.exists:
-            # Course exists, just add the semester if not already present
-            existing_data = course_doc.to_dict()
+        if existing_data is not None:
+            # Course exists, add the semester if not already present
             semesters = existing_data.get("smst", [])
+            changes = {}
             if semester not in semesters:
                 semesters.append(semester)
-                batch.update(course_ref, {"smst": semesters})
-                batch_count += 1
+                existing_data["smst"] = semesters
+                changes["smst"] = semesters
+            # credits follow the most recent semester the course was offered in
+            latest = max(semesters, key=semester_key) == semester
+            if credits and latest and existing_data.get("creditsTotal") != credits:
+                existing_data["creditsTotal"] = credits
+                changes["creditsTotal"] = credits
+            if changes:
+                writer.update(course_ref, changes)
         else:
             # New course, create full document
             course_data = get_single_course(course, semester)
-            batch.set(course_ref, course_data)
-            batch_count += 1
+            if credits:
+                course_data["creditsTotal"] = credits
+            writer.set(course_ref, course_data)
+            existing_courses[course_id] = course_data
 
         # Process groups
         for group_index, enroll_group in enumerate(course.get("enrollGroups", []), 1):
             group_id = f"{semester}_{course_id}_Grp{group_index}"
             group_data = get_group(enroll_group, group_id, course_id, semester, subject)
-            group_ref = db.collection("enrollGroups").document(group_id)
-            batch.set(group_ref, group_data)
-            batch_count += 1
+            seen["enrollGroups"].add(group_id)
+            write_if_changed(
+                writer,
+                "enrollGroups",
+                group_id,
+                group_data,
+                stored["enrollGroups"],
+                counts,
+                delta,
+            )
 
             # Process sections
             for section in enroll_group.get("classSections", []):
@@ -184,9 +278,16 @@ def upload_courses(courses: List[Dict[str, Any]], semester: str, max_level=5) ->
                 section_data = get_section(
                     section, section_id, course_id, group_id, semester, subject
                 )
-                section_ref = db.collection("sections").document(section_id)
-                batch.set(section_ref, section_data)
-                batch_count += 1
+                seen["sections"].add(section_id)
+                write_if_changed(
+                    writer,
+                    "sections",
+                    section_id,
+                    section_data,
+                    stored["sections"],
+                    counts,
+                    delta,
+                )
 
                 # Process meetings
                 for i, meeting in enumerate(section.get("meetings", [])):
@@ -208,34 +309,43 @@ def upload_courses(courses: List[Dict[str, Any]], semester: str, max_level=5) ->
                             netid = instructor.get("netid", "")
                             if netid:
                                 instructors.append(netid)
+                                if netid in instructors_written:
+                                    continue
+                                instructors_written.add(netid)
                                 # Store instructor data in separate collection
                                 instructor_data = get_instructor(instructor)
                                 instructor_ref = db.collection("instructors").document(
                                     netid
                                 )
-                                batch.set(instructor_ref, instructor_data, merge=True)
-                                batch_count += 1
+                                writer.set(instructor_ref, instructor_data, merge=True)
 
                     # Only store the instructor IDs in the meeting
                     meeting_data["instructors"] = instructors
-                    meeting_ref = db.collection("meetings").document(meeting_id)
-                    batch.set(meeting_ref, meeting_data)
-                    batch_count += 1
-
-                # Commit batch if we're approaching the limit
-                if batch_count >= MAX_BATCH_SIZE:
-                    batch.commit()
-                    print(f"Committed batch of {batch_count} documents")
-                    time.sleep(1.5)
-                    batch = db.batch()
-                    batch_count = 0
+                    seen["meetings"].add(meeting_id)
+                    write_if_changed(
+                        writer,
+                        "meetings",
+                        meeting_id,
+                        meeting_data,
+                        stored["meetings"],
+                        counts,
+                        delta,
+                    )
 
         print(f"finished {course_id}")
 
-    # Commit any remaining documents
-    if batch_count > 0:
-        batch.commit()
-        print(f"Committed remaining {batch_count} documents")
+    # Delete documents of the uploaded subjects that left the roster
+    for collection in DELTA_COLLECTIONS:
+        for doc_id, previous in stored[collection].items():
+            if previous.get("sbj") in subjects_seen and doc_id not in seen[collection]:
+                writer.delete(db.collection(collection).document(doc_id))
+                counts["deleted"] += 1
+
+    writer.close()
+    print(
+        f"{semester}: {counts['inserted']} inserted, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged, {counts['deleted']} deleted"
+    )
 
 
 def get_single_course(course: Dict[str, Any], semester):
@@ -414,64 +524,44 @@ def get_instructor(instructor):
 
 def update_course_credits():
     """
-    Add credits information to course documents by aggregating data from enrollment groups.
-    """
-    # Get all courses from the database
-    courses_ref = db.collection("courses")
-    courses = courses_ref.stream()
-
-    batch = db.batch()
-    batch_count = 0
-    MAX_BATCH_SIZE = 200
+    Recompute creditsTotal of every course from the enrollment groups of its
+    most recent semester.
 
-    for course in courses:
-        course_id = course.id
-        course_data = course.to_dict()
-        semesters = course_data.get("smst", [])
+    Courses and enrollment groups are each read in one projected collection
+    scan and grouped by courseId in memory, instead of one enrollGroups
+    query per course. Only courses whose credits changed are written.
+    """
+    courses = {
+        doc.id: doc.to_dict()
+        for doc in db.collection("courses").select(["smst", "creditsTotal"]).stream()
+    }
+    latest_semesters = {
+        course_id: max(course_data["smst"], key=semester_key)
+        for course_id, course_data in courses.items()
+        if course_data.get("smst")
+    }
 
-        if not semesters:
+    credits_by_course = {}
+    groups = db.collection("enrollGroups").select(["courseId", "semester", "credits"])
+    for group in groups.stream():
+        group_data = group.to_dict()
+        course_id = group_data.get("courseId")
+        if latest_semesters.get(course_id) != group_data.get("semester"):
             continue
-
-        # Get the latest semester for this course
-        latest_semester = semesters[0]  # Assuming semesters are ordered newest first
-
-        # Query all enrollment groups for this course in the latest semester
-        query = (
-            db.collection("enrollGroups")
-            .where("courseId", "==", course_id)
-            .where("semester", "==", latest_semester)
-        )
-        enrollment_groups = query.stream()
-
-        # Collect and combine all credits options
-        all_credits = []
-        for group in enrollment_groups:
-            group_data = group.to_dict()
-            group_credits = group_data.get("credits", [])
-            for credit in group_credits:
-                if credit not in all_credits:
-                    all_credits.append(credit)
-
-        # Sort credits in descending order
-        all_credits.sort(reverse=True)
-
-        if all_credits:
-            # Update the course document with the combined credits
-            batch.update(courses_ref.document(course_id), {"creditsTotal": all_credits})
-            batch_count += 1
-
-            # Commit batch if we're approaching the limit
-            if batch_count >= MAX_BATCH_SIZE:
-                batch.commit()
-                print(f"Committed batch of {batch_count} course credit updates")
-                time.sleep(1)
-                batch = db.batch()
-                batch_count = 0
-
-    # Commit any remaining updates
-    if batch_count > 0:
-        batch.commit()
-        print(f"Committed remaining {batch_count} course credit updates")
+        all_credits = credits_by_course.setdefault(course_id, [])
+        for credit in group_data.get("credits", []):
+            if credit not in all_credits:
+                all_credits.append(credit)
+
+    with BatchWriter(db, "course credit") as writer:
+        for course_id, all_credits in credits_by_course.items():
+            # Sort credits in descending order
+            all_credits.sort(reverse=True)
+            if all_credits and courses[course_id].get("creditsTotal") != all_credits:
+                writer.update(
+                    db.collection("courses").document(course_id),
+                    {"creditsTotal": all_credits},
+                )
 
 
 def update_course_instructors():
@@ -482,9 +572,7 @@ def update_course_instructors():
     courses_ref = db.collection("courses")
     courses = courses_ref.stream()
 
-    batch = db.batch()
-    batch_count = 0
-    MAX_BATCH_SIZE = 200
+    writer = BatchWriter(db, "course instructor")
 
     for course in courses:
         course_id = course.id
@@ -522,24 +610,12 @@ def update_course_instructors():
 
         if instructors_by_semester:
             # Update the course document with the instructor information
-            batch.update(
+            writer.update(
                 courses_ref.document(course_id),
                 {"instructors": instructors_by_semester},
             )
-            batch_count += 1
 
-            # Commit batch if we're approaching the limit
-            if batch_count >= MAX_BATCH_SIZE:
-                batch.commit()
-                print(f"Committed batch of {batch_count} course instructor updates")
-                time.sleep(1)
-                batch = db.batch()
-                batch_count = 0
-
-    # Commit any remaining updates
-    if batch_count > 0:
-        batch.commit()
-        print(f"Committed remaining {batch_count} course instructor updates")
+    writer.close()
 
 
 def add_older_courses(semesters, max_level=5):
@@ -550,8 +626,9 @@ def add_older_courses(semesters, max_level=5):
         semesters: List of older semester codes (e.g., ["SP24", "FA23"])
         max_level: Maximum course level to process (default=5)
     """
+    fetched = rosterFetch.fetch_semesters(semesters, jobs=JOBS)
     for semester in semesters:
-        subjects, courses = fetch_subjects_courses(semester)
+        subjects, courses = fetched[semester]
         print(
             f"Processing {len(subjects)} subjects and {len(courses)} courses for {semester}"
         )
@@ -559,9 +636,12 @@ def add_older_courses(semesters, max_level=5):
         upload_subjects(subjects, semester)
 
         # Process courses but don't store detailed enrollment data
-        batch = db.batch()
-        batch_count = 0
-        MAX_BATCH_SIZE = 200
+        writer = BatchWriter(db, f"{semester} course")
+        existing_courses = prefetch_documents(
+            "courses",
+            course_ids(courses, max_level),
+            field_paths=["smst", "instructors"],
+        )
 
         for course in courses:
             # Skip courses with level greater than max_level
@@ -585,17 +665,14 @@ def add_older_courses(semesters, max_level=5):
                                 instructor_ref = db.collection("instructors").document(
                                     netid
                                 )
-                                batch.set(instructor_ref, instructor_data, merge=True)
-                                batch_count += 1
+                                writer.set(instructor_ref, instructor_data, merge=True)
 
             # Check if the course already exists
             course_ref = db.collection("courses").document(course_id)
-            course_doc = course_ref.get()
+            existing_data = existing_courses.get(course_id)
 
-            if course_doc.exists:
+            if existing_data is not None:
                 # Course exists, update semester list and add instructors
-                existing_data = course_doc.to_dict()
-
                 # Update semester list
                 semesters_list = existing_data.get("smst", [])
                 if semester not in semesters_list:
@@ -622,15 +699,13 @@ def add_older_courses(semesters, max_level=5):
                         instructors_list.append({semester: instructors_netids})
 
                     # Update the course with both semester and instructor changes
-                    batch.update(
+                    writer.update(
                         course_ref,
                         {"smst": semesters_list, "instructors": instructors_list},
                     )
                 else:
                     # Just update the semester list if no instructors found
-                    batch.update(course_ref, {"smst": semesters_list})
-
-                batch_count += 1
+                    writer.update(course_ref, {"smst": semesters_list})
             else:
                 # New course, create full document
                 course_data = get_single_course(course, semester)
@@ -654,21 +729,10 @@ def add_older_courses(semesters, max_level=5):
                 if instructors_netids:
                     course_data["instructors"] = [{semester: instructors_netids}]
 
-                batch.set(course_ref, course_data)
-                batch_count += 1
-
-            # Commit batch if we're approaching the limit
-            if batch_count >= MAX_BATCH_SIZE:
-                batch.commit()
-                print(f"Committed batch of {batch_count} documents for older semester")
-                time.sleep(1.5)
-                batch = db.batch()
-                batch_count = 0
+                writer.set(course_ref, course_data)
+                existing_courses[course_id] = course_data
 
-        # Commit any remaining documents
-        if batch_count > 0:
-            batch.commit()
-            print(f"Committed remaining {batch_count} documents for older semester")
+        writer.close()
 
         print(f"Completed processing for older semester {semester}\n")
 
@@ -688,9 +752,7 @@ def remove_high_level_courses(max_level=5):
     high_level_courses = high_level_query.stream()
 
     # Start a batch delete
-    batch = db.batch()
-    batch_count = 0
-    MAX_BATCH_SIZE = 200
+    writer = BatchWriter(db, "course deletion")
 
     removed_count = 0
 
@@ -701,22 +763,10 @@ def remove_high_level_courses(max_level=5):
 
         # Delete the course document
         course_ref = db.collection("courses").document(course_id)
-        batch.delete(course_ref)
-        batch_count += 1
+        writer.delete(course_ref)
         removed_count += 1
 
-        # Process batch if needed
-        if batch_count >= MAX_BATCH_SIZE:
-            batch.commit()
-            print(f"Committed batch of {batch_count} deletions")
-            time.sleep(1.5)
-            batch = db.batch()
-            batch_count = 0
-
-    # Commit any remaining deletions
-    if batch_count > 0:
-        batch.commit()
-        print(f"Committed remaining {batch_count} course deletions")
+    writer.close()
 
     print(f"Completed removing {removed_count} high-level courses")
     print("Instructor documents were not removed.")
@@ -755,16 +805,18 @@ def add_instructors_to_all_courses(semesters, max_level=5):
         "SP22",
     ]
 
+    fetched = rosterFetch.fetch_semesters(semesters, jobs=JOBS)
     for semester in semesters:
         print(f"Processing semester {semester}...")
 
-        # Fetch all courses for this semester from the API
-        _, courses = fetch_subjects_courses(semester)
+        # All courses for this semester from the API
+        _, courses = fetched[semester]
         print(f"Fetched {len(courses)} courses for {semester}")
 
-        batch = db.batch()
-        batch_count = 0
-        MAX_BATCH_SIZE = 200
+        writer = BatchWriter(db, f"{semester} instructor")
+        existing_courses = prefetch_documents(
+            "courses", course_ids(courses, max_level), field_paths=["instructors"]
+        )
 
         # Process each course from the API
         for course in courses:
@@ -776,14 +828,12 @@ def add_instructors_to_all_courses(semesters, max_level=5):
 
             # Find the course document in Firestore
             course_ref = db.collection("courses").document(course_id)
-            course_doc = course_ref.get()
+            course_data = existing_courses.get(course_id)
 
-            if not course_doc.exists:
+            if course_data is None:
                 print(f"  Course {course_id} not found in database, skipping")
                 continue
 
-            # Get existing course data
-            course_data = course_doc.to_dict()
             instructors_list = course_data.get("instructors", [])
 
             # Check if we already have instructors for this semester
@@ -816,8 +866,7 @@ def add_instructors_to_all_courses(semesters, max_level=5):
                                 instructor_ref = db.collection("instructors").document(
                                     netid
                                 )
-                                batch.set(instructor_ref, instructor_data, merge=True)
-                                batch_count += 1
+                                writer.set(instructor_ref, instructor_data, merge=True)
 
             if not instructors_netids:
                 print(f"  No instructors found for {course_id} in {semester}")
@@ -854,32 +903,199 @@ def add_instructors_to_all_courses(semesters, max_level=5):
                 ordered_instructors.append(new_instructor_entry)
 
             # Update the course with the ordered instructor data
-            batch.update(course_ref, {"instructors": ordered_instructors})
-            batch_count += 1
+            writer.update(course_ref, {"instructors": ordered_instructors})
             print(
                 f"  Updated {course_id} with {len(instructors_netids)} instructors for {semester}"
             )
 
-            # Commit batch if we're approaching the limit
-            if batch_count >= MAX_BATCH_SIZE:
-                batch.commit()
-                print(f"Committed batch of {batch_count} updates")
-                time.sleep(1.5)
-                batch = db.batch()
-                batch_count = 0
-
-        # Commit any remaining updates
-        if batch_count > 0:
-            batch.commit()
-            print(f"Committed remaining {batch_count} updates for {semester}")
+        writer.close()
 
         print(f"Completed processing for semester {semester}")
 
     print("Completed adding instructors to all courses")
 
 
+def course_instructors(course: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Return the distinct instructors of every meeting of an API course.
+    """
+    result = {}
+    for group in course.get("enrollGroups", []):
+        for section in group.get("classSections", []):
+            for meeting in section.get("meetings", []):
+                for instructor in meeting.get("instructors", []):
+                    netid = instructor.get("netid", "")
+                    if netid and netid not in result:
+                        result[netid] = instructor
+    return list(result.values())
+
+
+def course_credits(course: Dict[str, Any]) -> List[float]:
+    """
+    Return every credit option of an API course, in descending order.
+    """
+    all_credits = []
+    for group in course.get("enrollGroups", []):
+        for credit in parse_credit(group["unitsMaximum"], group["unitsMinimum"]):
+            if credit not in all_credits:
+                all_credits.append(credit)
+    all_credits.sort(reverse=True)
+    return all_credits
+
+
+def fold_course(
+    aggregates: Dict[str, Dict[str, Any]],
+    instructors: Dict[str, Tuple[tuple, Dict[str, Any]]],
+    course: Dict[str, Any],
+    semester: str,
+) -> None:
+    """
+    Add one semester of an API course to the in-memory aggregates.
+
+    The base document and credits come from the newest semester a course
+    appears in; instructors are kept per semester. Instructor documents come
+    from the newest semester an instructor appears in.
+    """
+    course_id = f"{course['subject']}{course['catalogNbr']}"
+    key = semester_key(semester)
+    aggregate = aggregates.setdefault(
+        course_id, {"semesters": {}, "newest": None, "document": None, "credits": []}
+    )
+
+    netids = []
+    for instructor in course_instructors(course):
+        netid = instructor["netid"]
+        netids.append(netid)
+        if netid not in instructors or instructors[netid][0] < key:
+            instructors[netid] = (key, get_instructor(instructor))
+    aggregate["semesters"][semester] = netids
+
+    if aggregate["newest"] is None or semester_key(aggregate["newest"]) < key:
+        aggregate["newest"] = semester
+        aggregate["document"] = get_single_course(course, semester)
+        aggregate["credits"] = course_credits(course)
+
+
+def merge_course(
+    aggregate: Dict[str, Any], existing: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """
+    Return the smst, creditsTotal and instructors fields of a course after
+    combining the aggregate of this run with the stored document.
+    """
+    existing = existing or {}
+    smst = set(existing.get("smst", [])) | set(aggregate["semesters"])
+    smst = sorted(smst, key=semester_key, reverse=True)
+
+    by_semester = {}
+    for item in existing.get("instructors", []):
+        by_semester.update(item)
+    for semester, netids in aggregate["semesters"].items():
+        if netids:
+            by_semester[semester] = netids
+    instructors = [
+        {semester: by_semester[semester]}
+        for semester in sorted(by_semester, key=semester_key, reverse=True)
+    ]
+
+    # credits follow the most recent semester the course was offered in
+    credits = existing.get("creditsTotal", [])
+    if aggregate["credits"] and smst[0] == aggregate["newest"]:
+        credits = aggregate["credits"]
+
+    fields = {"smst": smst}
+    if credits:
+        fields["creditsTotal"] = credits
+    if instructors:
+        fields["instructors"] = instructors
+    return fields
+
+
+def ingest_semesters(semesters: List[str], max_level=5) -> None:
+    """
+    Backfill several semesters in one pass.
+
+    Each semester's roster is fetched once and folded into per-course
+    aggregates (semesters offered, credits of the newest offering and
+    instructors by semester), then dropped before the next semester is
+    fetched. The existing course documents are read once, and every course
+    and instructor document is written once at the end. This replaces
+    running add_older_courses, add_instructors_to_all_courses,
+    update_course_credits and update_course_instructors one after another.
+
+    Args:
+        semesters: List of semester codes (e.g., ["SP24", "FA23"])
+        max_level: Maximum course level to process (default=5)
+    """
+    aggregates = {}
+    instructors = {}
+    all_subjects = {}
+    for semester in semesters:
+        subjects, courses = fetch_subjects_courses(semester)
+        for subject in subjects:
+            all_subjects.setdefault(subject["value"], subject)
+        for course in courses:
+            if int(course["catalogNbr"][0]) > max_level:
+                continue
+            fold_course(aggregates, instructors, course, semester)
+        print(f"Folded {len(courses)} courses of {semester}")
+
+    upload_subjects(list(all_subjects.values()), ", ".join(semesters))
+
+    existing_courses = prefetch_documents(
+        "courses", list(aggregates), field_paths=["smst", "creditsTotal", "instructors"]
+    )
+    unchanged = 0
+    with BatchWriter(db, "course") as writer:
+        for course_id, aggregate in aggregates.items():
+            course_ref = db.collection("courses").document(course_id)
+            existing_data = existing_courses.get(course_id)
+            fields = merge_course(aggregate, existing_data)
+            if existing_data is None:
+                course_data = aggregate["document"]
+                course_data.update(fields)
+                writer.set(course_ref, course_data)
+                continue
+            changes = {
+                name: value
+                for name, value in fields.items()
+                if existing_data.get(name) != value
+            }
+            if changes:
+                writer.update(course_ref, changes)
+            else:
+                unchanged += 1
+
+    with BatchWriter(db, "instructor") as writer:
+        for netid, (_, instructor_data) in instructors.items():
+            instructor_ref = db.collection("instructors").document(netid)
+            writer.set(instructor_ref, instructor_data, merge=True)
+
+    print(
+        f"Ingested {len(aggregates)} courses from {len(semesters)} semesters "
+        f"({unchanged} already up to date)"
+    )
+
+
 def main():
     """Process and upload course data for all semesters."""
+    global JOBS, DELTA
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=rosterFetch.DEFAULT_JOBS,
+        help="number of concurrent roster API requests",
+    )
+    parser.add_argument(
+        "--delta",
+        action="store_true",
+        help="only write enroll groups, sections and meetings that changed",
+    )
+    args = parser.parse_args()
+    JOBS = args.jobs
+    DELTA = args.delta
+
     CURRENT_YEAR = ["SP25", "WI25", "FA24", "SU24"]
     ADDED = ["SP24", "WI24", "FA23", "SU23", "SP23", "WI23", "FA22", "SU22", "SP22"]
     TO_BE_ADDED = [
@@ -902,7 +1118,7 @@ def main():
     # update_course_credits()
     # update_course_instructors()
     # add_older_courses(TO_BE_ADDED)
-    add_older_courses(TO_BE_ADDED)
+    ingest_semesters(TO_BE_ADDED)
 
 
 if __name__ == "__main__":
@@ -6,20 +6,12 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import time
 
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from service import *
+from storage import get_db
 
-if not firebase_admin._apps:
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
-    key_path = os.path.join(base_dir, "secret-keys/serviceAccountKey.json")
-    cred = credentials.Certificate(key_path)
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+db = get_db()
 
 
 def get_rate_by_subject(sbj, driver):
@@ -0,0 +1,253 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import requests
+
+# the data directory, for constants
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from constants import *
+
+CACHE_DIR = os.environ.get(
+    "ROSTER_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "http_cache"),
+)
+
+# set ROSTER_CACHE_OFFLINE=1 to replay cached responses without the network
+OFFLINE = os.environ.get("ROSTER_CACHE_OFFLINE", "") not in ("", "0")
+
+# how long a page of a current or future semester is used without revalidating
+DEFAULT_TTL = 6 * 60 * 60
+
+SEASON_ORDER = {"WI": 0, "SP": 1, "SU": 2, "FA": 3}
+
+SEMESTER_PATTERN = re.compile(r"roster[=/]((?:WI|SP|SU|FA)\d{2})")
+
+
+class CacheMiss(Exception):
+    """
+    Raised in offline mode when a url has never been fetched.
+    """
+
+    pass
+
+
+def semester_key(semester):
+    """
+    return a tuple that sorts semesters in chronological order
+    """
+    return (int(semester[2:]), SEASON_ORDER[semester[:2]])
+
+
+def semester_is_past(semester):
+    """
+    return true if the roster of semester can no longer change: it is older
+    than the latest semester and not part of the current academic year
+    """
+    if semester in CURRENT_YEAR:
+        return False
+    return semester_key(semester) < semester_key(LAST_SEMESTER)
+
+
+def url_semester(url):
+    """
+    return the semester a roster url refers to, or None
+    """
+    match = SEMESTER_PATTERN.search(url)
+    return match.group(1) if match else None
+
+
+class CachedResponse(object):
+    """
+    The parts of a requests.Response the scrapers use, read from the cache or
+    from the network.
+    """
+
+    def json(self):
+        return json.loads(self.content)
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def __init__(self, url, status_code, content, headers, from_cache, encoding=None):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+        self.encoding = encoding
+
+
+class HTTPCache(object):
+    """
+    On-disk cache of roster pages keyed by url.
+
+    Each url has a small json entry (status, ETag, Last-Modified, fetch time)
+    pointing to a body stored under the sha256 of its content, so identical
+    pages are stored once. Pages of past semesters never expire. Other pages
+    are reused for ttl seconds and then revalidated with If-None-Match /
+    If-Modified-Since, which costs a 304 instead of a download when nothing
+    changed. In offline mode only the cache is used.
+    """
+
+    def get(self, url):
+        """
+        return a CachedResponse for url, from the cache when it is fresh
+
+        Only 200 responses are stored; other responses are returned as is.
+        """
+        entry = self._read_entry(url)
+        if entry is not None and (self.offline or self._is_fresh(url, entry)):
+            self.hits += 1
+            return self._response(url, entry)
+        if self.offline:
+            raise CacheMiss(f"{url} is not in the cache at {self.cache_dir}")
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self._session.get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304 and entry is not None:
+            self.revalidated += 1
+            entry["fetched_at"] = time.time()
+            self._write_entry(url, entry)
+            return self._response(url, entry)
+
+        self.misses += 1
+        if response.status_code != 200:
+            return CachedResponse(
+                url,
+                response.status_code,
+                response.content,
+                dict(response.headers),
+                False,
+                response.encoding,
+            )
+        digest = self._write_blob(response.content)
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "sha256": digest,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_type": response.headers.get("Content-Type"),
+            "encoding": response.encoding,
+            "fetched_at": time.time(),
+        }
+        self._write_entry(url, entry)
+        return CachedResponse(
+            url,
+            response.status_code,
+            response.content,
+            dict(response.headers),
+            False,
+            response.encoding,
+        )
+
+    def contains(self, url):
+        return self._read_entry(url) is not None
+
+    def invalidate(self, url):
+        """
+        forget the entry of url; its body stays until no entry uses it
+        """
+        path = self._entry_path(url)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def get_stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+    def _is_fresh(self, url, entry):
+        semester = url_semester(url)
+        if semester and semester_is_past(semester):
+            return True
+        return time.time() - entry["fetched_at"] < self.ttl
+
+    def _response(self, url, entry):
+        with open(self._blob_path(entry["sha256"]), "rb") as file:
+            content = file.read()
+        headers = {}
+        if entry.get("content_type"):
+            headers["Content-Type"] = entry["content_type"]
+        return CachedResponse(
+            url, entry["status"], content, headers, True, entry.get("encoding")
+        )
+
+    def _entry_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, "entries", key[:2], key + ".json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.cache_dir, "blobs", digest[:2], digest)
+
+    def _read_entry(self, url):
+        path = self._entry_path(url)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            entry = json.load(file)
+        if not os.path.exists(self._blob_path(entry["sha256"])):
+            return None
+        return entry
+
+    def _write_entry(self, url, entry):
+        self._write_file(self._entry_path(url), json.dumps(entry).encode("utf-8"))
+
+    def _write_blob(self, content):
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            self._write_file(path, content)
+        return digest
+
+    def _write_file(self, path, content):
+        # write next to the target and rename so readers never see half a file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+    def __init__(
+        self, cache_dir=CACHE_DIR, ttl=DEFAULT_TTL, offline=OFFLINE, timeout=30
+    ):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.offline = offline
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._session = requests.Session()
+
+
+_cache = None
+
+
+def get_cache():
+    """
+    return the HTTPCache shared by the scrapers in this process
+    """
+    global _cache
+    if _cache is None:
+        _cache = HTTPCache()
+    return _cache
+
+
+def cached_get(url):
+    """
+    drop-in replacement for requests.get(url) that goes through the cache
+    """
+    return get_cache().get(url)
@@ -67,30 +67,7 @@ def has_preco(text):
 
 
 def parse_preco(text):
-    details = {"prereq": None, "coreq": None, "preco": None, "note": False}
-    text = clean(text)
-    if not text:
-        return details
-
-    preco_list = separate_prereq(text)
-
-    prerequisite = convert_prerequisites(preco_list[0])
-    details["prereq"] = prerequisite[:-1]
-
-    coreq = convert_prerequisites(preco_list[1])
-    details["coreq"] = coreq[:-1]
-
-    precoreq = convert_prerequisites(preco_list[2])
-    details["preco"] = precoreq[:-1]
-
-    last_pre = prerequisite[-1] if prerequisite else None
-    last_co = coreq[-1] if coreq else None
-    last_preco = precoreq[-1] if precoreq else None
-    need_note = last_pre or last_co or last_preco
-    if need_note == None:
-        need_note = False
-    details["note"] = need_note
-    return details
+    return PARSER.parse_preco(text)
 
 
 def separate_prereq(text):
@@ -103,39 +80,7 @@ def separate_prereq(text):
     Parameter text: text is the string that would be separated
     Precondition: text is a str object
     """
-    text = text.replace("Prerequisite: ", "A_Prerequisite: ")
-    text = text.replace(
-        "Prerequisite or corequisite: ", "B_Prerequisite or corequisite: "
-    )
-    text = text.replace("Corequisite: ", "C_Corequisite: ")
-
-    prereq_match = re.search(
-        r"a_prerequisite:(.*?)(b_prerequisite or corequisite|c_corequisite|$)",
-        text,
-        re.IGNORECASE,
-    )
-
-    prereq_or_coreq_match = re.search(
-        r"b_prerequisite or corequisite:(.*?)(c_corequisite|$)", text, re.IGNORECASE
-    )
-
-    coreq_match = re.search(r"c_corequisite:(.*)", text, re.IGNORECASE)
-
-    result = []
-
-    prereq = prereq_match.group(1).strip() if prereq_match else None
-    result.append(prereq)
-
-    coreq = coreq_match.group(1).strip() if coreq_match else None
-    result.append(coreq)
-
-    if prereq_or_coreq_match:
-        prereq_or_coreq = prereq_or_coreq_match.group(1).strip()
-    else:
-        prereq_or_coreq = None
-    result.append(prereq_or_coreq)
-
-    return result
+    return PARSER.separate_prereq(text)
 
 
 def convert_prerequisites(prereq_text):
@@ -160,106 +105,231 @@ def convert_prerequisites(prereq_text):
     Parameter prereq_text: The raw prerequisite text.
     Precondition: a str from Cornell's class roster
     """
-    if not prereq_text:
-        return []
+    return PARSER.convert_prerequisites(prereq_text)
+
+
+# courses that a topic named in a requirement stands for
+TOPIC_REPLACEMENTS = {
+    "linear algebra": "MATH 2210 or MATH 2230 or MATH 2310 or MATH 2940",
+    "single-variable calculus": "MATH 1910 or MATH 1120",
+    "calculus": "MATH 1120 or MATH 1910 or MATH 1920 or MATH 2220 or MATH 2240",
+    "multi-variable calculus": "MATH 1920 or MATH 2220 or MATH 2240",
+    "core statistics": "STSCI 2100 or MATH 1710",
+    "probability theory": (
+        "BTRY 3080 or CS 2800 or ECON 3130 or ENGRD 2700 or " "MATH 4710"
+    ),
+    "one programming course": "CS 1110 or CS 1112 or CS 1132 or CS 1133",
+    "knowledge of programming": "CS 1110 or CS 1112 or CS 1132 or CS 1133",
+    "core programming": "CS 1110 or CS 1112",
+    "Python": "CS 1110 or CS 1112 or CS 1133",
+    "MATLAB": "CS 1132",
+    "C++": "CS 2024",
+    "programming proficiency": "CS 2110 or CS 2112",
+    "proficient with programming": "CS 2110 or CS 2112",
+    "data structures": "CS 2110 or CS 2112",
+    "discrete math": "CS 2800",
+    "discrete mathematics": "CS 2800",
+    "introductory ML course": "CS 3780",
+    "numerical methods": "CS 4210 or CS 4220",
+}
+
+
+class PrereqParser(object):
+    """
+    Parser of prerequisite and corequisite text that compiles its regular
+    expressions once.
 
-    prereq_text = prereq_text.replace("\xa0", " ")
-    note = False
+    The topics are replaced with one alternation that tries the longest topic
+    first, so "multi-variable calculus" is not taken for "calculus". Results
+    are memoized by text, because cross-listed courses repeat the same
+    requirement text, and copies are returned so callers may modify them.
+    """
 
-    patterns = [
-        (r"\(.*?\)", ""),
-        (r"For\s.*?majors[:;].*?[.;]", ""),
-        (r"Note:.*?;", ""),
-        (r"[A-Za-z\s]+(?:degree|experience),", ""),
-        (r"([A-Z]+\s\d{4})-([A-Z]+\s\d{4})", r"\2"),
-    ]
-    for pattern, replace in patterns:
-        if re.search(pattern, prereq_text, flags=re.IGNORECASE):
-            prereq_text = re.sub(pattern, replace, prereq_text, flags=re.IGNORECASE)
-            note = True
+    def parse_preco(self, text):
+        """
+        Return a dictionary with the prereq, coreq and preco nested lists of
+        text and whether it needs a note.
+        """
+        details = {"prereq": None, "coreq": None, "preco": None, "note": False}
+        text = clean(text)
+        if not text:
+            return details
+
+        preco_list = self.separate_prereq(text)
+
+        prerequisite = self.convert_prerequisites(preco_list[0])
+        details["prereq"] = prerequisite[:-1]
+
+        coreq = self.convert_prerequisites(preco_list[1])
+        details["coreq"] = coreq[:-1]
+
+        precoreq = self.convert_prerequisites(preco_list[2])
+        details["preco"] = precoreq[:-1]
+
+        last_pre = prerequisite[-1] if prerequisite else None
+        last_co = coreq[-1] if coreq else None
+        last_preco = precoreq[-1] if precoreq else None
+        need_note = last_pre or last_co or last_preco
+        if need_note == None:
+            need_note = False
+        details["note"] = need_note
+        return details
+
+    def parse_many(self, texts):
+        """
+        Return the parse_preco dictionary of every text in texts, in order.
+
+        Each distinct text is only parsed once, so a whole semester of
+        catalogPrereqCoreq strings can be passed at once.
+
+        Parameter texts: the requirement texts
+        Precondition: texts is an iterable of str or None
+        """
+        return [self.parse_preco(text) for text in texts]
+
+    def separate_prereq(self, text):
+        """
+        Return a list of the prerequisite, corequisite and prerequisite or
+        corequisite parts of text; see separate_prereq.
+        """
+        text = text.replace("Prerequisite: ", "A_Prerequisite: ")
+        text = text.replace(
+            "Prerequisite or corequisite: ", "B_Prerequisite or corequisite: "
+        )
+        text = text.replace("Corequisite: ", "C_Corequisite: ")
+
+        prereq_match = self._prereq.search(text)
+        prereq_or_coreq_match = self._prereq_or_coreq.search(text)
+        coreq_match = self._coreq.search(text)
+
+        result = []
+
+        prereq = prereq_match.group(1).strip() if prereq_match else None
+        result.append(prereq)
+
+        coreq = coreq_match.group(1).strip() if coreq_match else None
+        result.append(coreq)
+
+        if prereq_or_coreq_match:
+            prereq_or_coreq = prereq_or_coreq_match.group(1).strip()
+        else:
+            prereq_or_coreq = None
+        result.append(prereq_or_coreq)
+
+        return result
+
+    def convert_prerequisites(self, prereq_text):
+        """
+        Return the nested list of prereq_text with its note flag as the last
+        element; see convert_prerequisites.
+        """
+        if not prereq_text:
+            return []
+        result = self._converted.get(prereq_text)
+        if result is None:
+            result = self._convert(prereq_text)
+            self._converted[prereq_text] = result
+        return [list(item) if isinstance(item, list) else item for item in result]
+
+    def clear(self):
+        """
+        Forget every memoized result.
+        """
+        self._converted.clear()
+
+    def _convert(self, prereq_text):
+        prereq_text = prereq_text.replace("\xa0", " ")
+        note = False
+
+        for pattern, replace in self._patterns:
+            prereq_text, count = pattern.subn(replace, prereq_text)
+            if count:
+                note = True
 
-    if re.search(r"\d\)\s*.*?:", prereq_text):
-        # print("1)")
         # check structure "1)...; 2)...; 3)...;
-        matches = re.findall(r"\d\)\s*(.*?):", prereq_text)
-        topics = [match.strip() for match in matches]
-        prereq_text = " and ".join(topics)
-        note = True
-    if prereq_text.find(", or permission of the instructor.") != -1:
-        # print("instructor")
-        prereq_text = prereq_text.replace(", or permission of the instructor.", "")
-        note = True
-    if prereq_text.find(", or permission of instructor.") != -1:
-        # print("instructor")
-        prereq_text = prereq_text.replace(", or permission of instructor.", "")
-        note = True
-    if prereq_text.find("performance") != -1 or prereq_text.find("excellent") != -1:
-        # print("performance")
-        note = True
-
-    if re.search(r",\s*or\s", prereq_text):
-        # check structure A, B, or C
-        prereq_text = re.sub(r",(?=\s*[^o])", " or ", prereq_text)
-        # replace "," with " or "
-
-    prereq_text = re.sub(r"[;,]\s*$", "", prereq_text)  # remove trailing semicolons
-
-    prereq_text = prereq_text.replace(", ", " and ")
-    prereq_text = prereq_text.replace(";", " and ")
-    prereq_text = prereq_text.replace("/", " or ")
-
-    replacements = {
-        "linear algebra": "MATH 2210 or MATH 2230 or MATH 2310 or MATH 2940",
-        "single-variable calculus": "MATH 1910 or MATH 1120",
-        "calculus": "MATH 1120 or MATH 1910 or MATH 1920 or MATH 2220 or MATH 2240",
-        "multi-variable calculus": "MATH 1920 or MATH 2220 or MATH 2240",
-        "core statistics": "STSCI 2100 or MATH 1710",
-        "probability theory": (
-            "BTRY 3080 or CS 2800 or ECON 3130 or ENGRD 2700 or " "MATH 4710"
-        ),
-        "one programming course": "CS 1110 or CS 1112 or CS 1132 or CS 1133",
-        "knowledge of programming": "CS 1110 or CS 1112 or CS 1132 or CS 1133",
-        "core programming": "CS 1110 or CS 1112",
-        "Python": "CS 1110 or CS 1112 or CS 1133",
-        "MATLAB": "CS 1132",
-        "C++": "CS 2024",
-        "programming proficiency": "CS 2110 or CS 2112",
-        "proficient with programming": "CS 2110 or CS 2112",
-        "data structures": "CS 2110 or CS 2112",
-        "discrete math": "CS 2800",
-        "discrete mathematics": "CS 2800",
-        "introductory ML course": "CS 3780",
-        "numerical methods": "CS 4210 or CS 4220",
-    }
-
-    for topic, course in replacements.items():
-        if re.search(rf"\b{re.escape(topic)}\b", prereq_text, flags=re.IGNORECASE):
-            prereq_text = re.sub(
-                rf"\b{re.escape(topic)}\b", course, prereq_text, flags=re.IGNORECASE
-            )
+        matches = self._numbered.findall(prereq_text)
+        if matches:
+            topics = [match.strip() for match in matches]
+            prereq_text = " and ".join(topics)
+            note = True
+        if prereq_text.find(", or permission of the instructor.") != -1:
+            prereq_text = prereq_text.replace(", or permission of the instructor.", "")
+            note = True
+        if prereq_text.find(", or permission of instructor.") != -1:
+            prereq_text = prereq_text.replace(", or permission of instructor.", "")
+            note = True
+        if prereq_text.find("performance") != -1 or prereq_text.find("excellent") != -1:
             note = True
 
-    and_split = re.split(r"\s+and\s+", prereq_text)
-    or_split = [re.split(r"\s+or\s+", item) for item in and_split]
+        if self._comma_or.search(prereq_text):
+            # check structure A, B, or C; replace "," with " or "
+            prereq_text = self._comma.sub(" or ", prereq_text)
 
-    # Matches patterns like "CS 1110", "MATH 1920"
-    course_code_pattern = r"[A-Z]{2,10}\s\d{4}"
-    nested_list = []
-    for group in or_split:
-        course_list = [
-            re.sub(r"\s", "", match.group())  # Remove spaces in matched course codes
-            for item in group
-            for match in re.finditer(course_code_pattern, item)
-        ]
-        nested_list.append(course_list)
-    for sublist in nested_list:
-        if len(sublist) == 0:
-            # print("empty")
+        prereq_text = self._trailing.sub("", prereq_text)
+
+        prereq_text = prereq_text.replace(", ", " and ")
+        prereq_text = prereq_text.replace(";", " and ")
+        prereq_text = prereq_text.replace("/", " or ")
+
+        prereq_text, count = self._topic.subn(
+            lambda match: self._topics[match.group().lower()], prereq_text
+        )
+        if count:
             note = True
-    cleaned_list = [sublist for sublist in nested_list if sublist]
-    result = remove_repeat(cleaned_list)
-    result.append(note)
-    return result
+
+        nested_list = []
+        for item in self._and.split(prereq_text):
+            course_list = [
+                self._space.sub("", match.group())  # Remove spaces in course codes
+                for part in self._or.split(item)
+                for match in self._course_code.finditer(part)
+            ]
+            nested_list.append(course_list)
+        for sublist in nested_list:
+            if len(sublist) == 0:
+                note = True
+        cleaned_list = [sublist for sublist in nested_list if sublist]
+        result = remove_repeat(cleaned_list)
+        result.append(note)
+        return result
+
+    def __init__(self, replacements=TOPIC_REPLACEMENTS):
+        self._prereq = re.compile(
+            r"a_prerequisite:(.*?)(b_prerequisite or corequisite|c_corequisite|$)",
+            re.IGNORECASE,
+        )
+        self._prereq_or_coreq = re.compile(
+            r"b_prerequisite or corequisite:(.*?)(c_corequisite|$)", re.IGNORECASE
+        )
+        self._coreq = re.compile(r"c_corequisite:(.*)", re.IGNORECASE)
+
+        self._patterns = [
+            (re.compile(pattern, re.IGNORECASE), replace)
+            for pattern, replace in [
+                (r"\(.*?\)", ""),
+                (r"For\s.*?majors[:;].*?[.;]", ""),
+                (r"Note:.*?;", ""),
+                (r"[A-Za-z\s]+(?:degree|experience),", ""),
+                (r"([A-Z]+\s\d{4})-([A-Z]+\s\d{4})", r"\2"),
+            ]
+        ]
+        self._numbered = re.compile(r"\d\)\s*(.*?):")
+        self._comma_or = re.compile(r",\s*or\s")
+        self._comma = re.compile(r",(?=\s*[^o])")
+        self._trailing = re.compile(r"[;,]\s*$")
+        self._and = re.compile(r"\s+and\s+")
+        self._or = re.compile(r"\s+or\s+")
+        # Matches patterns like "CS 1110", "MATH 1920"
+        self._course_code = re.compile(r"[A-Z]{2,10}\s\d{4}")
+        self._space = re.compile(r"\s")
+
+        self._topics = {topic.lower(): course for topic, course in replacements.items()}
+        topics = sorted(replacements, key=len, reverse=True)
+        self._topic = re.compile(
+            r"\b(?:" + "|".join(re.escape(topic) for topic in topics) + r")\b",
+            re.IGNORECASE,
+        )
+        self._converted = {}
 
 
 def remove_repeat(nested_list):
@@ -339,3 +409,7 @@ def parse_credit(crdmax, crdmin):
         crdmax -= 1
         result.append(crdmax)
     return result
+
+
+# the parser shared by the module-level functions
+PARSER = PrereqParser()
@@ -0,0 +1,225 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Any, Tuple, Optional
+
+SUBJECTS_URL = (
+    "https://classes.cornell.edu/api/2.0/config/subjects.json?roster={semester}"
+)
+CLASSES_URL = (
+    "https://classes.cornell.edu/api/2.0/search/classes.json"
+    "?roster={semester}&subject={subject}"
+)
+
+# number of requests in flight at once
+DEFAULT_JOBS = 8
+# sustained requests per second across all jobs, and the burst allowed above it
+DEFAULT_RATE = 4.0
+DEFAULT_BURST = 8
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF = 0.5
+DEFAULT_TIMEOUT = 30
+
+# responses worth retrying: rate limited or a server-side failure
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by every request of a fetcher.
+
+    The bucket refills at rate tokens per second up to capacity, and each
+    request takes one token, waiting for the refill when the bucket is empty.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class RosterFetcher:
+    """
+    Fetch class roster API pages concurrently.
+
+    Requests go through one pooled requests.Session whose blocking calls run
+    in worker threads, so at most jobs connections are open and reused. The
+    token bucket keeps the total request rate polite, and failed requests
+    are retried with exponential backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        jobs: int = DEFAULT_JOBS,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = DEFAULT_BACKOFF,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.jobs = max(1, jobs)
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.jobs)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.requests = 0
+        self.failures = 0
+
+    def close(self) -> None:
+        self.session.close()
+
+    async def fetch_json(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch url and return its decoded json, or None if it failed.
+
+        A response with an error status that is not worth retrying (such as
+        404 for a subject without classes) returns None right away.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.retries + 1):
+            await self.bucket.acquire()
+            async with self.semaphore:
+                self.requests += 1
+                try:
+                    response = await loop.run_in_executor(
+                        None, lambda: self.session.get(url, timeout=self.timeout)
+                    )
+                except requests.RequestException as error:
+                    response = None
+                    reason = repr(error)
+            if response is not None:
+                if response.status_code == 200:
+                    try:
+                        return response.json()
+                    except ValueError:
+                        reason = "invalid json"
+                elif response.status_code not in RETRY_STATUS:
+                    return None
+                else:
+                    reason = f"status {response.status_code}"
+            if attempt < self.retries:
+                delay = self.backoff * (2**attempt) * (1 + random.random())
+                await asyncio.sleep(delay)
+        self.failures += 1
+        print(f"Giving up on {url}: {reason}")
+        return None
+
+    async def fetch_semester(
+        self, semester: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Fetch the subjects of a semester and the classes of every subject.
+
+        Returns the same (subjects, courses) tuple as
+        getCourse.fetch_subjects_courses, with the courses in subject order.
+        """
+        subjects_data = await self.fetch_json(SUBJECTS_URL.format(semester=semester))
+        if not subjects_data or subjects_data.get("status") != "success":
+            message = (subjects_data or {}).get("message", "request failed")
+            print(f"API error for subjects in {semester}: {message}")
+            return [], []
+
+        subjects = subjects_data["data"]["subjects"]
+        print(f"Fetched {len(subjects)} subjects for {semester}")
+
+        pages = await asyncio.gather(
+            *[
+                self.fetch_json(
+                    CLASSES_URL.format(semester=semester, subject=subject["value"])
+                )
+                for subject in subjects
+            ]
+        )
+        all_courses = []
+        for subject, page in zip(subjects, pages):
+            if page and page.get("status") == "success":
+                courses = page["data"]["classes"]
+                all_courses.extend(courses)
+                print(
+                    f"Fetched {len(courses)} courses for {subject['value']} in {semester}"
+                )
+        return subjects, all_courses
+
+    async def fetch_semesters(
+        self, semesters: List[str]
+    ) -> Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+        """
+        Fetch several semesters at once, sharing the connection pool and rate.
+        """
+        results = await asyncio.gather(
+            *[self.fetch_semester(semester) for semester in semesters]
+        )
+        return dict(zip(semesters, results))
+
+    async def _run(self, coroutine):
+        # the limiter and semaphore belong to the event loop that runs them
+        self.bucket = TokenBucket(self.rate, self.burst)
+        self.semaphore = asyncio.Semaphore(self.jobs)
+        loop = asyncio.get_running_loop()
+        loop.set_default_executor(ThreadPoolExecutor(self.jobs))
+        start = time.monotonic()
+        result = await coroutine
+        print(
+            f"{self.requests} requests ({self.failures} failed) "
+            f"in {time.monotonic() - start:.1f}s with {self.jobs} jobs"
+        )
+        return result
+
+    def run(self, coroutine):
+        """
+        Run one of the fetch coroutines to completion and return its result.
+        """
+        return asyncio.run(self._run(coroutine))
+
+
+def fetch_subjects_courses(
+    semester: str, jobs: int = DEFAULT_JOBS
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Fetch subject and course data for a semester with jobs concurrent requests.
+    """
+    print(f"Fetching data for {semester}...")
+    fetcher = RosterFetcher(jobs=jobs)
+    try:
+        return fetcher.run(fetcher.fetch_semester(semester))
+    finally:
+        fetcher.close()
+
+
+def fetch_semesters(
+    semesters: List[str], jobs: int = DEFAULT_JOBS
+) -> Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """
+    Fetch subject and course data for every semester in one concurrent pass.
+
+    Returns a dictionary that maps each semester to its (subjects, courses).
+    """
+    print(f"Fetching data for {', '.join(semesters)}...")
+    fetcher = RosterFetcher(jobs=jobs)
+    try:
+        return fetcher.run(fetcher.fetch_semesters(semesters))
+    finally:
+        fetcher.close()
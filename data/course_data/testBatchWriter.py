@@ -0,0 +1,125 @@
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+import batchWriter
+
+# the data directory, for the storage backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import localStore
+
+
+class Contention(Exception):
+    pass
+
+
+class FlakyClient(object):
+    """
+    An in-memory LocalClient whose first failures batches raise error when
+    they are committed.
+    """
+
+    def collection(self, name):
+        return self.db.collection(name)
+
+    def batch(self):
+        batch = self.db.batch()
+        self.commits += 1
+        if self.failures:
+            self.failures -= 1
+
+            def commit():
+                raise self.error("too much contention")
+
+            batch.commit = commit
+        return batch
+
+    def __init__(self, failures, error=Contention):
+        self.db = localStore.LocalClient(":memory:")
+        self.failures = failures
+        self.error = error
+        self.commits = 0
+
+
+class TestBatchWriter(unittest.TestCase):
+    def setUp(self):
+        self.db = localStore.LocalClient(":memory:")
+        self.courses = self.db.collection("courses")
+        # close() prints the throughput and retries print a line
+        output = mock.patch("sys.stdout", new_callable=io.StringIO)
+        output.start()
+        self.addCleanup(output.stop)
+
+    def write(self, writer, count, collection=None):
+        collection = collection or self.courses
+        with writer:
+            for number in range(count):
+                writer.set(collection.document(f"CS{number:04d}"), {"n": number})
+
+    def test_operations(self):
+        """
+        a batch is sent at max_operations writes, and every write lands
+        """
+        writer = batchWriter.BatchWriter(self.db, workers=2)
+        self.write(writer, 1001)
+        stats = writer.get_stats()
+        self.assertEqual(stats["batches"], 3)
+        self.assertEqual(stats["operations"], 1001)
+        self.assertEqual(len(list(self.courses.stream())), 1001)
+        self.assertEqual(self.courses.document("CS1000").get().get("n"), 1000)
+
+    def test_bytes(self):
+        """
+        a batch is sent before it passes max_bytes
+        """
+        reference = self.courses.document("CS0000")
+        size = batchWriter.estimate_size({"n": 0}) + len(reference.path)
+        writer = batchWriter.BatchWriter(self.db, max_bytes=3 * size)
+        self.write(writer, 7)
+        self.assertEqual(writer.get_stats()["batches"], 3)
+        self.assertEqual(len(list(self.courses.stream())), 7)
+
+    def test_mixed(self):
+        """
+        updates and deletes go through the batches in order
+        """
+        self.write(batchWriter.BatchWriter(self.db), 3)
+        with batchWriter.BatchWriter(self.db, max_operations=2) as writer:
+            writer.update(self.courses.document("CS0001"), {"n": 10})
+            writer.delete(self.courses.document("CS0002"))
+            writer.set(self.courses.document("CS0000"), {"m": 1}, merge=True)
+        self.assertEqual(
+            {doc.id: doc.to_dict() for doc in self.courses.stream()},
+            {"CS0000": {"n": 0, "m": 1}, "CS0001": {"n": 10}},
+        )
+
+    def test_retry(self):
+        """
+        a batch that fails with a retryable error is rebuilt and sent again
+        """
+        client = FlakyClient(failures=2)
+        writer = batchWriter.BatchWriter(client, backoff=0)
+        with mock.patch.object(batchWriter, "RETRYABLE_ERRORS", (Contention,)):
+            self.write(writer, 5, client.collection("courses"))
+        self.assertEqual(client.commits, 3)
+        self.assertEqual(writer.get_stats()["retried"], 2)
+        self.assertEqual(len(list(client.collection("courses").stream())), 5)
+
+    def test_give_up(self):
+        """
+        a batch that keeps failing, or fails with another error, is raised
+        """
+        client = FlakyClient(failures=3)
+        writer = batchWriter.BatchWriter(client, retries=2, backoff=0)
+        with mock.patch.object(batchWriter, "RETRYABLE_ERRORS", (Contention,)):
+            with self.assertRaises(Contention):
+                self.write(writer, 1, client.collection("courses"))
+        client = FlakyClient(failures=1, error=ValueError)
+        with self.assertRaises(ValueError):
+            self.write(batchWriter.BatchWriter(client), 1, client.collection("c"))
+        self.assertEqual(client.commits, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
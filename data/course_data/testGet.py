@@ -128,6 +128,39 @@ class TestParsePrerequisites(unittest.TestCase):
         expected = [['CS1110', 'CS1112', 'CS1132', 'CS1133'],True]
         self.assertCountEqual(parseText.convert_prerequisites(text), expected)
 
+    def test_longest_topic(self):
+        """
+        "multi-variable calculus" is not replaced as "calculus"
+        """
+        text = "multi-variable calculus."
+        expected = [['MATH1920', 'MATH2220', 'MATH2240'],True]
+        self.assertCountEqual(parseText.convert_prerequisites(text), expected)
+
+
+class TestPrereqParser(unittest.TestCase):
+    def test_parse_many(self):
+        """
+        parse_many gives the same result as parse_preco for every text
+        """
+        texts = ["Prerequisite: CS 2110. Corequisite: CS 2800.", None,
+        "Prerequisite: CS 2110. Corequisite: CS 2800.",
+        "Prerequisite or corequisite: MATH 1920."]
+        parser = parseText.PrereqParser()
+        self.assertEqual(parser.parse_many(texts),
+        [parseText.parse_preco(text) for text in texts])
+
+    def test_memoized_copy(self):
+        """
+        changing a result does not change the memoized result
+        """
+        parser = parseText.PrereqParser()
+        text = "CS 1110 or CS 1112, and MATH 1110."
+        first = parser.convert_prerequisites(text)
+        first[0].append("CS9999")
+        first.pop()
+        self.assertCountEqual(parser.convert_prerequisites(text),
+        [['CS1110', 'CS1112'], ['MATH1110'], False])
+
 
 if __name__ == "__main__":
     unittest.main()
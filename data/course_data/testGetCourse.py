@@ -0,0 +1,165 @@
+import io
+import os
+import sys
+import unittest
+from unittest import mock
+
+# the data directory, for the storage backend
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import localStore
+import storage
+
+# getCourse connects to the shared client when it is imported
+storage.set_db(localStore.LocalClient(":memory:"))
+import getCourse
+
+
+def roster_section(component, number, meetings=1, open_status="O"):
+    """
+    return a class section of the roster API with meetings meetings
+    """
+    return {
+        "ssrComponent": component,
+        "section": number,
+        "classNbr": 10000 + int(number),
+        "isComponentGraded": True,
+        "openStatus": open_status,
+        "topicDescription": "",
+        "location": "ITH",
+        "addConsent": "N",
+        "instructionMode": "P",
+        "exploreCriteriaIds": [],
+        "materials": [],
+        "notes": [],
+        "meetings": [
+            {
+                "timeStart": "10:10AM",
+                "timeEnd": "11:00AM",
+                "pattern": "MWF",
+                "startDt": "01/21/2025",
+                "endDt": "05/06/2025",
+                "meetingTopicDescription": "",
+                "instructors": [],
+            }
+            for _ in range(meetings)
+        ],
+    }
+
+
+def roster_course(course_code, *sections):
+    """
+    return a course of the roster API with one enroll group of sections
+    """
+    subject = course_code.rstrip("0123456789")
+    return {
+        "subject": subject,
+        "catalogNbr": course_code[len(subject) :],
+        "enrollGroups": [
+            {
+                "unitsMaximum": 4,
+                "unitsMinimum": 4,
+                "componentsRequired": sorted({s["ssrComponent"] for s in sections}),
+                "componentsOptional": [],
+                "gradingBasis": "GRD",
+                "sessionCode": "1",
+                "simpleCombinations": [],
+                "exploreCriteriaIds": [],
+                "classSections": list(sections),
+            }
+        ],
+    }
+
+
+class TestDeltaUpload(unittest.TestCase):
+    def setUp(self):
+        self.db = localStore.LocalClient(":memory:")
+        patches = [
+            mock.patch.object(getCourse, "db", self.db),
+            mock.patch("sys.stdout", new_callable=io.StringIO),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        # existing courses, so the upload only adds the semester to them
+        for course_code in ("CS2110", "MATH1920"):
+            self.db.collection("courses").document(course_code).set(
+                {"smst": ["SP25"], "creditsTotal": [4]}
+            )
+        self.roster = [
+            roster_course("CS2110", roster_section("LEC", "001", meetings=2)),
+            roster_course("MATH1920", roster_section("LEC", "001")),
+        ]
+
+    def upload(self, courses):
+        """
+        return the counts line printed by a delta upload of courses
+        """
+        getCourse.upload_courses(courses, "SP25", delta=True)
+        return sys.stdout.getvalue().splitlines()[-1]
+
+    def ids(self, collection):
+        return sorted(doc.id for doc in self.db.collection(collection).stream())
+
+    def test_unchanged(self):
+        """
+        documents whose content hash is stored already are not written again
+        """
+        self.assertEqual(
+            self.upload(self.roster),
+            "SP25: 7 inserted, 0 changed, 0 unchanged, 0 deleted",
+        )
+        # a write would replace the whole document and drop this field
+        meetings = self.db.collection("meetings")
+        meeting_id = "SP25_CS2110_Grp1_LEC_001_meeting1"
+        meetings.document(meeting_id).update({"marker": True})
+        self.assertEqual(
+            self.upload(self.roster),
+            "SP25: 0 inserted, 0 changed, 7 unchanged, 0 deleted",
+        )
+        self.assertTrue(meetings.document(meeting_id).get().get("marker"))
+
+    def test_changed(self):
+        """
+        a document whose content changed is written with its new hash
+        """
+        self.upload(self.roster)
+        section_id = "SP25_CS2110_Grp1_LEC_001"
+        before = self.db.collection("sections").document(section_id).get().to_dict()
+        self.roster[0] = roster_course(
+            "CS2110", roster_section("LEC", "001", meetings=2, open_status="C")
+        )
+        self.assertEqual(
+            self.upload(self.roster),
+            "SP25: 0 inserted, 1 changed, 6 unchanged, 0 deleted",
+        )
+        after = self.db.collection("sections").document(section_id).get().to_dict()
+        self.assertEqual(after["open"], "C")
+        self.assertNotEqual(after["hash"], before["hash"])
+
+    def test_vanished(self):
+        """
+        documents of an uploaded subject that left the roster are deleted,
+        and the documents of other subjects are kept
+        """
+        self.upload(self.roster)
+        self.assertEqual(
+            self.upload(
+                [roster_course("CS2110", roster_section("LEC", "001", meetings=1))]
+            ),
+            "SP25: 0 inserted, 0 changed, 3 unchanged, 1 deleted",
+        )
+        self.assertEqual(
+            self.ids("meetings"),
+            [
+                "SP25_CS2110_Grp1_LEC_001_meeting1",
+                "SP25_MATH1920_Grp1_LEC_001_meeting1",
+            ],
+        )
+        self.assertEqual(
+            self.ids("sections"),
+            ["SP25_CS2110_Grp1_LEC_001", "SP25_MATH1920_Grp1_LEC_001"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import tempfile
+import unittest
+import httpCache
+
+PAST_URL = "https://classes.cornell.edu/api/2.0/config/subjects.json?roster=SP20"
+CURRENT_URL = "https://classes.cornell.edu/api/2.0/config/subjects.json?roster=SP25"
+
+
+class StubResponse(object):
+    def __init__(self, status_code, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.encoding = "utf-8"
+
+
+class StubSession(object):
+    """
+    A requests.Session that answers with queued responses and records the
+    headers of every request.
+    """
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers))
+        return self.responses.pop(0)
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache_dir = directory.name
+
+    def make_cache(self, *responses, ttl=httpCache.DEFAULT_TTL, offline=False):
+        cache = httpCache.HTTPCache(self.cache_dir, ttl=ttl, offline=offline)
+        cache._session = StubSession(*responses)
+        return cache
+
+    def test_past_semester(self):
+        """
+        a page of a past semester is never fetched again, however old
+        """
+        page = StubResponse(200, b'{"status": "success"}')
+        cache = self.make_cache(page, ttl=0)
+        self.assertFalse(cache.get(PAST_URL).from_cache)
+        response = cache.get(PAST_URL)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.json(), {"status": "success"})
+        self.assertEqual(len(cache._session.requests), 1)
+        self.assertEqual(cache.get_stats(), {"hits": 1, "misses": 1, "revalidated": 0})
+
+    def test_revalidate(self):
+        """
+        a stale page of the current semester is revalidated with its ETag and
+        Last-Modified, and a 304 serves the stored body
+        """
+        headers = {"ETag": '"v1"', "Last-Modified": "Mon, 06 Jan 2025 00:00:00 GMT"}
+        page = StubResponse(200, b"page", headers)
+        cache = self.make_cache(page, StubResponse(304), ttl=0)
+        cache.get(CURRENT_URL)
+        response = cache.get(CURRENT_URL)
+        self.assertTrue(response.from_cache)
+        self.assertEqual(response.content, b"page")
+        self.assertEqual(
+            cache._session.requests[1][1],
+            {"If-None-Match": '"v1"', "If-Modified-Since": headers["Last-Modified"]},
+        )
+        self.assertEqual(cache.get_stats()["revalidated"], 1)
+
+    def test_changed(self):
+        """
+        a revalidated page that changed is stored again, and an error is not
+        stored
+        """
+        cache = self.make_cache(
+            StubResponse(200, b"old"),
+            StubResponse(200, b"new"),
+            StubResponse(503, b"busy"),
+            ttl=0,
+        )
+        cache.get(CURRENT_URL)
+        self.assertEqual(cache.get(CURRENT_URL).content, b"new")
+        self.assertEqual(cache.get(CURRENT_URL).status_code, 503)
+        cache.offline = True
+        self.assertEqual(cache.get(CURRENT_URL).content, b"new")
+
+    def test_offline(self):
+        """
+        offline, a cached page is served whatever its age, and a page never
+        fetched is a CacheMiss
+        """
+        self.make_cache(StubResponse(200, b"page")).get(CURRENT_URL)
+        cache = self.make_cache(ttl=0, offline=True)
+        self.assertEqual(cache.get(CURRENT_URL).content, b"page")
+        with self.assertRaises(httpCache.CacheMiss):
+            cache.get(PAST_URL)
+        self.assertEqual(cache._session.requests, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+from unittest import mock
+import rosterFetch
+
+
+class FakeClock(object):
+    """
+    A monotonic clock that only moves when something sleeps on it.
+    """
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+
+class TestTokenBucket(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patches = [
+            mock.patch.object(rosterFetch, "time", self.clock),
+            mock.patch.object(rosterFetch.asyncio, "sleep", self.clock.sleep),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def acquire(self, bucket, count):
+        async def run():
+            for _ in range(count):
+                await bucket.acquire()
+
+        asyncio.run(run())
+
+    def test_burst(self):
+        """
+        a full bucket lets capacity requests through without waiting
+        """
+        bucket = rosterFetch.TokenBucket(rate=2.0, capacity=4)
+        self.acquire(bucket, 4)
+        self.assertEqual(self.clock.sleeps, [])
+        self.assertEqual(bucket.tokens, 0)
+
+    def test_pacing(self):
+        """
+        past the burst, requests are spaced by 1 / rate
+        """
+        bucket = rosterFetch.TokenBucket(rate=2.0, capacity=1)
+        self.acquire(bucket, 5)
+        self.assertEqual(self.clock.sleeps, [0.5] * 4)
+        self.assertEqual(self.clock.now, 2.0)
+
+    def test_refill(self):
+        """
+        idle time refills the bucket, up to its capacity
+        """
+        bucket = rosterFetch.TokenBucket(rate=1.0, capacity=2)
+        self.acquire(bucket, 2)
+        self.clock.now += 10
+        self.acquire(bucket, 3)
+        self.assertEqual(self.clock.sleeps, [1.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,310 @@
+import json
+import re
+import sqlite3
+import threading
+
+# fields queried by the data layer; each gets an expression index
+INDEXED_FIELDS = ["sbj", "lvl", "semester", "courseId", "groupId", "sectionId"]
+
+# the field names a query may use; the json path of a field is written into
+# the SQL, so it has to be a plain name
+FIELD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+
+OPERATORS = {"==": "=", "!=": "!=", "<": "<", "<=": "<=", ">": ">", ">=": ">="}
+
+
+class NotFound(Exception):
+    """
+    Raised by update() when the document does not exist, like Firestore.
+    """
+
+    pass
+
+
+def _field_path(field):
+    """
+    return the SQL string literal of the json path of field, such as
+    '$.sbj'
+
+    The path is a literal, not a bound parameter, so json_extract(data,
+    '$.sbj') matches the expression index of the field.
+    """
+    if not isinstance(field, str) or not FIELD_PATTERN.fullmatch(field):
+        raise ValueError(f"Invalid field name: {field!r}")
+    return f"'$.{field}'"
+
+
+def _set_field(data, field, value):
+    # "a.b" updates the nested field b of a, as in Firestore
+    keys = field.split(".")
+    for key in keys[:-1]:
+        data = data.setdefault(key, {})
+    data[keys[-1]] = value
+
+
+def _merge(data, changes):
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(data.get(key), dict):
+            _merge(data[key], value)
+        else:
+            data[key] = value
+
+
+class LocalClient(object):
+    """
+    Embedded stand-in for the Firestore client, stored in SQLite.
+
+    It implements the part of the google-cloud-firestore API the pipeline
+    uses: collection/document references, get/set/update/delete, where
+    queries with select and limit, get_all and write batches. Every document
+    is one row of json; where clauses run as SQL on json_extract, and a
+    clause on a field of INDEXED_FIELDS is answered with its expression
+    index.
+
+    Use path ":memory:" for a throwaway store, or a file path to keep the
+    data between runs.
+    """
+
+    def collection(self, name):
+        return LocalCollection(self, name)
+
+    def batch(self):
+        return LocalBatch(self)
+
+    def get_all(self, references, field_paths=None):
+        """
+        yield a LocalDocumentSnapshot for every reference
+        """
+        for reference in references:
+            yield reference.get(field_paths=field_paths)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def _read(self, collection, doc_id):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM documents WHERE collection = ? AND id = ?",
+                (collection, doc_id),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _query(self, collection, filters, limit):
+        sql = "SELECT id, data FROM documents WHERE collection = ?"
+        params = [collection]
+        for field, op, value in filters:
+            path = _field_path(field)
+            if op == "array_contains":
+                sql += (
+                    f" AND EXISTS (SELECT 1 FROM json_each(data, {path}) "
+                    "WHERE value = ?)"
+                )
+                params.append(value)
+            elif op in ("in", "not-in"):
+                marks = ", ".join("?" * len(value))
+                keyword = "IN" if op == "in" else "NOT IN"
+                sql += f" AND json_extract(data, {path}) {keyword} ({marks})"
+                params += list(value)
+            else:
+                sql += f" AND json_extract(data, {path}) {OPERATORS[op]} ?"
+                params.append(value)
+        # documents come in id order, like Firestore; with a where clause the
+        # unary + stops SQLite from scanning the primary key for that order
+        # instead of using the expression index of the clause
+        sql += " ORDER BY +id" if filters else " ORDER BY id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [(doc_id, json.loads(data)) for doc_id, data in rows]
+
+    def _apply(self, operations):
+        """
+        apply a list of (kind, collection, id, data, merge) in one transaction
+        """
+        with self._lock, self._connection:
+            for kind, collection, doc_id, data, merge in operations:
+                if kind == "delete":
+                    self._connection.execute(
+                        "DELETE FROM documents WHERE collection = ? AND id = ?",
+                        (collection, doc_id),
+                    )
+                    continue
+                row = self._connection.execute(
+                    "SELECT data FROM documents WHERE collection = ? AND id = ?",
+                    (collection, doc_id),
+                ).fetchone()
+                current = json.loads(row[0]) if row else None
+                if kind == "update":
+                    if current is None:
+                        raise NotFound(f"No document to update: {collection}/{doc_id}")
+                    for field, value in data.items():
+                        _set_field(current, field, value)
+                    data = current
+                elif merge and current is not None:
+                    _merge(current, data)
+                    data = current
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO documents (collection, id, data) "
+                    "VALUES (?, ?, ?)",
+                    (collection, doc_id, json.dumps(data, default=str)),
+                )
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, "
+            "PRIMARY KEY (collection, id))"
+        )
+        for field in INDEXED_FIELDS:
+            self._connection.execute(
+                f"CREATE INDEX IF NOT EXISTS documents_{field} ON documents "
+                f"(collection, json_extract(data, {_field_path(field)}))"
+            )
+        self._connection.commit()
+
+
+class LocalCollection(object):
+    def document(self, doc_id):
+        return LocalDocumentReference(self._client, self.id, doc_id)
+
+    def where(self, field, op, value):
+        return LocalQuery(self._client, self.id).where(field, op, value)
+
+    def select(self, field_paths):
+        return LocalQuery(self._client, self.id).select(field_paths)
+
+    def limit(self, count):
+        return LocalQuery(self._client, self.id).limit(count)
+
+    def stream(self):
+        return LocalQuery(self._client, self.id).stream()
+
+    def __init__(self, client, name):
+        self._client = client
+        self.id = name
+
+
+class LocalQuery(object):
+    """
+    An immutable query; where, select and limit return a new query.
+    """
+
+    def where(self, field, op, value):
+        return LocalQuery(
+            self._client,
+            self._collection,
+            self._filters + [(field, op, value)],
+            self._fields,
+            self._limit,
+        )
+
+    def select(self, field_paths):
+        return LocalQuery(
+            self._client,
+            self._collection,
+            self._filters,
+            list(field_paths),
+            self._limit,
+        )
+
+    def limit(self, count):
+        return LocalQuery(
+            self._client, self._collection, self._filters, self._fields, count
+        )
+
+    def stream(self):
+        for doc_id, data in self._client._query(
+            self._collection, self._filters, self._limit
+        ):
+            reference = LocalDocumentReference(self._client, self._collection, doc_id)
+            yield LocalDocumentSnapshot(reference, data, self._fields)
+
+    def get(self):
+        return list(self.stream())
+
+    def __init__(self, client, collection, filters=None, fields=None, limit=None):
+        self._client = client
+        self._collection = collection
+        self._filters = filters or []
+        self._fields = fields
+        self._limit = limit
+
+
+class LocalDocumentReference(object):
+    @property
+    def path(self):
+        return f"{self._collection}/{self.id}"
+
+    def get(self, field_paths=None):
+        data = self._client._read(self._collection, self.id)
+        return LocalDocumentSnapshot(self, data, field_paths)
+
+    def set(self, data, merge=False):
+        self._client._apply([("set", self._collection, self.id, data, merge)])
+
+    def update(self, data):
+        self._client._apply([("update", self._collection, self.id, data, False)])
+
+    def delete(self):
+        self._client._apply([("delete", self._collection, self.id, None, False)])
+
+    def __init__(self, client, collection, doc_id):
+        self._client = client
+        self._collection = collection
+        self.id = doc_id
+
+
+class LocalDocumentSnapshot(object):
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        if self._fields is None:
+            return self._data
+        return {key: self._data[key] for key in self._fields if key in self._data}
+
+    def get(self, field):
+        return self.to_dict().get(field)
+
+    def __init__(self, reference, data, fields=None):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+        self._fields = fields
+
+
+class LocalBatch(object):
+    """
+    Write batch that applies all its writes in one SQLite transaction.
+    """
+
+    def set(self, reference, data, merge=False):
+        self._operations.append(
+            ("set", reference._collection, reference.id, data, merge)
+        )
+
+    def update(self, reference, data):
+        self._operations.append(
+            ("update", reference._collection, reference.id, data, False)
+        )
+
+    def delete(self, reference):
+        self._operations.append(
+            ("delete", reference._collection, reference.id, None, False)
+        )
+
+    def commit(self):
+        self._client._apply(self._operations)
+        self._operations = []
+
+    def __init__(self, client):
+        self._client = client
+        self._operations = []
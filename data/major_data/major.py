@@ -1,19 +1,37 @@
+import json
 import os
 import sys
-import firebase_admin
-from firebase_admin import credentials
-from firebase_admin import firestore
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from service import *
+from storage import get_db
 
-if not firebase_admin._apps:
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../.."))
-    key_path = os.path.join(base_dir, "secret-keys/serviceAccountKey.json")
-    cred = credentials.Certificate(key_path)
-    firebase_admin.initialize_app(cred)
+db = get_db()
 
-db = firestore.client()
+SPEC_ROUTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "requirements")
+
+COLLEGE_NAMES = {"CAS": "Arts and Sciences"}
+
+# the requirement documents list every course of a rule whatever its credits,
+# and a min_level rule up to the 5000 level, as the queries of service.py do;
+# a spec sets min_credit and max_level to change that
+COMMIT_MIN_CREDIT = 0
+
+COMMIT_MAX_LEVEL = 5
+
+# the keys of a spec requirement that are not fields of its document
+SPEC_KEYS = (
+    "subject",
+    "level",
+    "min_level",
+    "max_level",
+    "min_credit",
+    "excluded",
+    "included",
+    "score",
+    "reqTag",
+    "reqTagDescr",
+)
 
 
 def add_major(major_data):
@@ -28,114 +46,65 @@ def add_requirement(req_data):
     print(f"Added requirement: {req_data['id']}")
 
 
-def commit_ARTH():
-    major = {
-        "id": "ARTH",
-        "name": "History of Art",
-        "colleges": [{"id": "CAS", "name": "Arts and Sciences"}],
-        "requiredCourses": 10,
-        "basicRequirements": [
-            {
-                "college": "CAS",
-                "requirements": [
-                    "ARTH_req1",
-                    "ARTH_req2",
-                    "ARTH_req3",
-                    "ARTH_req4",
-                    "ARTH_req5",
-                ],
-            }
-        ],
-        "init": [
-            "ARTH1100",
-            "ARTH2000",
-            "ARTH1178",
-            "ARTH1154",
-            "ARTH2750",
-            "ARTH4101",
-        ],
-    }
-    add_major(major)
+def get_spec_courses(req):
+    """
+    return the courses of a level, subject or credit requirement of a spec
+    """
+    min_credit = req.get("min_credit", COMMIT_MIN_CREDIT)
+    excluded = req.get("excluded", [])
+    included = req.get("included", [])
+    if req["type"] == "subject":
+        return get_courses_by_subject(req["subject"], min_credit, excluded, included)
+    if "level" in req:
+        return get_courses_by_subject_level(
+            req["subject"], req["level"], min_credit, excluded, included
+        )
+    return get_courses_by_subject_min_level(
+        req["subject"],
+        req["min_level"],
+        req.get("max_level", COMMIT_MAX_LEVEL),
+        min_credit,
+        excluded,
+        included,
+    )
 
-    req1 = {
-        "id": "ARTH_req1",
-        "type": "C",
-        "major": "ARTH",
-        "name": "Core Courses",
-        "tag": "ARTH Core",
-        "tagDescr": "This is a core course of Art History major",
-        "descr": [
-            "The History of Art major requires the completion of all three courses listed below.",
-            "Students must receive a grade of B or higher in ARTH 1100.",
-            "If students have not taken ARTH 1100 by the spring of sophomore year, they must complete a 4000-level tutorial course and receive a grade of B or higher in order to qualify for the major.",
-            "A grade of B- or higher is required of all other courses to receive credit toward the major.",
-        ],
-        "number": 3,
-        "courseGrps": [
-            {"id": 1, "courses": ["ARTH1100"]},
-            {"id": 2, "courses": ["ARTH2000"]},
-            {"id": 3, "courses": ["ARTH4101"]},
-        ],
-    }
-    add_requirement(req1)
 
-    req2_courses = get_courses_by_subject_level("ARTH", 2, excluded=["ARTH2000"])
-    req2 = {
-        "id": "ARTH_req2",
-        "type": "E",
-        "major": "ARTH",
-        "name": "2000 Level",
-        "tag": "2000 ARTH",
-        "tagDescr": "This is a 2000 level Art History course.",
-        "descr": ["Take at least one ARTH course at the 2000-level."],
-        "number": 1,
-        "courses": req2_courses,
-    }
-    add_requirement(req2)
+def commit_spec(major_id, college):
+    """
+    add a major and its requirements from its spec in SPEC_ROUTE, such as
+    requirements/ARTH-CAS.json
 
-    req3_courses = get_courses_by_subject_level("ARTH", 3)
-    req3 = {
-        "id": "ARTH_req3",
-        "type": "E",
-        "major": "ARTH",
-        "name": "3000 Level",
-        "tag": "3000 ARTH",
-        "tagDescr": "This is a 3000 level Art History course.",
-        "descr": ["Take at least one ARTH course at the 3000-level."],
-        "number": 1,
-        "courses": req3_courses,
+    Requirements of type level, subject and credit are committed as type E
+    with the courses their rule selects. The reqTag and reqTagDescr of a
+    requirement, when it has them, are the tag and tagDescr of its document.
+    """
+    with open(os.path.join(SPEC_ROUTE, f"{major_id}-{college}.json"), "r") as f:
+        spec = json.load(f)
+    req_ids = [req["id"] for req in spec["requirements"]]
+    major = {
+        "id": major_id,
+        "name": spec.get("name", major_id),
+        "colleges": [{"id": college, "name": COLLEGE_NAMES.get(college, college)}],
+        "requiredCourses": spec.get("requiredCourses"),
+        "basicRequirements": [{"college": college, "requirements": req_ids}],
+        "init": spec.get("init", []),
     }
-    add_requirement(req3)
+    add_major(major)
 
-    req4_courses = get_courses_by_subject_level("ARTH", 4, excluded=["ARTH4101"])
-    req4 = {
-        "id": "ARTH_req4",
-        "type": "E",
-        "major": "ARTH",
-        "name": "4000 Level",
-        "tag": "4000 ARTH",
-        "tagDescr": "This is a 4000 level Art History course.",
-        "descr": ["Take at least one ARTH course at the 4000-level."],
-        "number": 2,
-        "courses": req4_courses,
-    }
-    add_requirement(req4)
+    for req in spec["requirements"]:
+        req_data = {key: value for key, value in req.items() if key not in SPEC_KEYS}
+        req_data["major"] = major_id
+        if "reqTag" in req:
+            req_data["tag"] = req["reqTag"]
+            req_data["tagDescr"] = req["reqTagDescr"]
+        if req["type"] not in ("C", "E"):
+            req_data["type"] = "E"
+            req_data["courses"] = get_spec_courses(req)
+        add_requirement(req_data)
 
-    req5_courses = get_courses_by_subject_min_level(
-        "ARTH", 3, excluded=["ARTH2000", "ARTH4101"]
-    )
-    req5 = {
-        "id": "ARTH_req5",
-        "type": "E",
-        "major": "ARTH",
-        "name": "Electives",
-        "tag": "ARTH Electives",
-        "tagDescr": "This can be counted as an elective for Art History major.",
-        "descr": ["Take three additional ARTH electives at the 3000-level or higher."],
-        "number": 3,
-        "courses": req5_courses,
-    }
-    add_requirement(req5)
+
+def commit_ARTH():
+    commit_spec("ARTH", "CAS")
 
 
 def commit_INFO():
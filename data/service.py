@@ -1,12 +1,14 @@
-import os
+import time
+from storage import get_db
 
-from firebase_admin import credentials, firestore, initialize_app
+# Firestore by default; set STORAGE_BACKEND=sqlite or memory to run offline
+db = get_db()
 
-base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-key_path = os.path.join(base_dir, "secret-keys\serviceAccountKey.json")
-cred = credentials.Certificate(key_path)
-initialize_app(cred)
-db = firestore.client()
+# seconds a course query result is reused; requirements repeat the same queries
+QUERY_TTL = 600
+
+# (subject, min_level, max_level, min_credit) -> (time fetched, course IDs)
+_query_cache = {}
 
 
 def get_course(course_id):
@@ -17,23 +19,12 @@ def get_course(course_id):
 
 
 def get_courses_by_subject(subject, min_credit=0, excluded=[], included=[]):
-    courses_ref = db.collection("courses")
-    query = courses_ref.where("sbj", "==", subject)
-    results = query.stream()
-    course_ids = []
-    for doc in results:
-        doc_data = doc.to_dict()
-        if doc.id in excluded:
-            continue
-        qualified = False
-        for credit in doc_data["creditsTotal"]:
-            if credit >= min_credit:
-                qualified = True
-                break
-        if qualified:
-            course_ids.append(doc.id)
-        course_ids = course_ids + included
-    return course_ids
+    course_ids = [
+        course_id
+        for course_id in query_course_ids(subject, min_credit=min_credit)
+        if course_id not in excluded
+    ]
+    return course_ids + included
 
 
 def get_courses_by_subject_level(
@@ -44,40 +35,72 @@ def get_courses_by_subject_level(
     Returns:
         list: A list of course IDs (strings) matching the criteria.
     """
-    courses_ref = db.collection("courses")
-    query = courses_ref.where("sbj", "==", subject).where("lvl", "==", level)
-    results = query.stream()
-
-    course_ids = []
-    for doc in results:
-        if doc.id in excluded:
-            continue
-        doc_data = doc.to_dict()
-        qualified = False
-        for credit in doc_data["creditsTotal"]:
-            if credit >= min_credit:
-                qualified = True
-                break
-        if qualified:
-            course_ids.append(doc.id)
-    course_ids = course_ids + included
-    return course_ids
+    course_ids = [
+        course_id
+        for course_id in query_course_ids(subject, level, level, min_credit)
+        if course_id not in excluded
+    ]
+    return course_ids + included
 
 
 def get_courses_by_subject_min_level(
     subject, min_level, max_level=5, min_credit=0, excluded=[], included=[]
 ):
-    course_ids = []
-    for level in range(min_level, max_level + 1):
-        courses = get_courses_by_subject_level(subject, level, min_credit, excluded)
-        course_ids.extend(courses)
-
+    course_ids = [
+        course_id
+        for course_id in query_course_ids(subject, min_level, max_level, min_credit)
+        if course_id not in excluded
+    ]
     for course_id in included:
         if course_id not in course_ids:
             course_ids.append(course_id)
     return course_ids
 
 
+def query_course_ids(subject, min_level=None, max_level=None, min_credit=0):
+    """
+    Returns the IDs of the courses of a subject within a level range that can
+    be taken for at least min_credit credits, ordered by level and then ID.
+
+    The courses are read with one query that only fetches lvl and
+    creditsTotal, and the result is cached for QUERY_TTL seconds by
+    (subject, min_level, max_level, min_credit). A level bound of None is
+    not applied.
+    """
+    key = (subject, min_level, max_level, min_credit)
+    now = time.monotonic()
+    cached = _query_cache.get(key)
+    if cached is not None and now - cached[0] < QUERY_TTL:
+        return cached[1]
+
+    query = db.collection("courses").where("sbj", "==", subject)
+    if min_level is not None:
+        query = query.where("lvl", ">=", min_level)
+    if max_level is not None:
+        query = query.where("lvl", "<=", max_level)
+    courses = []
+    for doc in query.select(["lvl", "creditsTotal"]).stream():
+        doc_data = doc.to_dict()
+        credits = doc_data.get("creditsTotal", [])
+        if any(credit >= min_credit for credit in credits):
+            courses.append((doc_data.get("lvl", 0), doc.id))
+    if min_level is not None or max_level is not None:
+        courses.sort()
+    else:
+        courses.sort(key=lambda course: course[1])
+
+    course_ids = tuple(course_id for _, course_id in courses)
+    _query_cache[key] = (now, course_ids)
+    return course_ids
+
+
+def clear_query_cache():
+    """
+    Forgets every cached query, for example after new courses are uploaded.
+    """
+    _query_cache.clear()
+
+
 def main():
     print(
         get_courses_by_subject_min_level("ARTH", 3, excluded=["ARTH2000", "ARTH4101"])
@@ -0,0 +1,98 @@
+import os
+import threading
+
+# "firestore" (default), "sqlite" or "memory"
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "firestore")
+
+# the SQLite file used by the sqlite backend
+STORAGE_PATH = os.environ.get(
+    "STORAGE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_store.sqlite"),
+)
+
+# the service account key, one level outside the project directory
+KEY_PATH = os.environ.get(
+    "SERVICE_ACCOUNT_KEY",
+    os.path.join(
+        os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")),
+        "secret-keys",
+        "serviceAccountKey.json",
+    ),
+)
+
+# writes per batch when copying between clients
+COPY_BATCH_SIZE = 400
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """
+    return the database client shared by the data layer in this process
+
+    The backend is chosen with the STORAGE_BACKEND environment variable.
+    Firestore credentials are only loaded when the firestore backend is
+    used, so the local backends work without a key or a network.
+    """
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = open_db(STORAGE_BACKEND)
+    return _db
+
+
+def open_db(backend, path=STORAGE_PATH):
+    """
+    return a new client of a backend
+
+    Parameter backend: the kind of storage
+    Precondition: backend is "firestore", "sqlite" or "memory"
+    """
+    if backend == "firestore":
+        import firebase_admin
+        from firebase_admin import credentials, firestore
+
+        if not firebase_admin._apps:
+            firebase_admin.initialize_app(credentials.Certificate(KEY_PATH))
+        return firestore.client()
+    if backend == "sqlite":
+        from localStore import LocalClient
+
+        return LocalClient(path)
+    if backend == "memory":
+        from localStore import LocalClient
+
+        return LocalClient(":memory:")
+    raise ValueError(f"Unknown storage backend {backend}")
+
+
+def set_db(db):
+    """
+    use db as the shared client, for example a LocalClient in tests
+    """
+    global _db
+    with _db_lock:
+        _db = db
+
+
+def copy_collections(source, target, collections):
+    """
+    copy every document of the collections from one client to another, for
+    example a Firestore snapshot into a local SQLite file
+
+    Parameter collections: the names of the collections to copy
+    Precondition: collections is a list of str
+    """
+    for name in collections:
+        batch = target.batch()
+        count = 0
+        for doc in source.collection(name).stream():
+            batch.set(target.collection(name).document(doc.id), doc.to_dict())
+            count += 1
+            if count % COPY_BATCH_SIZE == 0:
+                batch.commit()
+                batch = target.batch()
+        batch.commit()
+        print(f"Copied {count} {name} documents")
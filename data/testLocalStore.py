@@ -0,0 +1,146 @@
+import unittest
+import localStore
+
+
+class TestLocalClient(unittest.TestCase):
+    def setUp(self):
+        self.db = localStore.LocalClient(":memory:")
+        self.courses = self.db.collection("courses")
+        self.courses.document("CS1110").set(
+            {"sbj": "CS", "lvl": 1, "ttl": "Intro", "smst": ["FA24", "SP25"]}
+        )
+        self.courses.document("CS2110").set(
+            {"sbj": "CS", "lvl": 2, "ttl": "OOP", "smst": ["SP25"]}
+        )
+        self.courses.document("MATH1920").set(
+            {"sbj": "MATH", "lvl": 1, "ttl": "Calc", "smst": ["FA24"]}
+        )
+
+    def tearDown(self):
+        self.db.close()
+
+    def ids(self, query):
+        return [doc.id for doc in query.stream()]
+
+    def test_get_set(self):
+        """
+        a document is read back as written, and a missing one does not exist
+        """
+        doc = self.courses.document("CS1110").get()
+        self.assertTrue(doc.exists)
+        self.assertEqual(doc.get("ttl"), "Intro")
+        missing = self.courses.document("CS9999").get()
+        self.assertFalse(missing.exists)
+        self.assertIsNone(missing.to_dict())
+
+    def test_update(self):
+        """
+        update sets nested fields by dotted path and needs the document
+        """
+        reference = self.courses.document("CS1110")
+        reference.update({"ttl": "Intro to CS", "meta.source": "roster"})
+        data = reference.get().to_dict()
+        self.assertEqual(data["ttl"], "Intro to CS")
+        self.assertEqual(data["meta"], {"source": "roster"})
+        with self.assertRaises(localStore.NotFound):
+            self.courses.document("CS9999").update({"ttl": "None"})
+
+    def test_merge(self):
+        """
+        set with merge keeps the fields it does not write, nested too
+        """
+        reference = self.courses.document("CS2110")
+        reference.set({"meta": {"a": 1, "b": 2}}, merge=True)
+        reference.set({"meta": {"b": 3}, "lvl": 3}, merge=True)
+        data = reference.get().to_dict()
+        self.assertEqual(data["meta"], {"a": 1, "b": 3})
+        self.assertEqual(data["lvl"], 3)
+        self.assertEqual(data["ttl"], "OOP")
+        reference.set({"ttl": "Replaced"})
+        self.assertEqual(reference.get().to_dict(), {"ttl": "Replaced"})
+
+    def test_where(self):
+        """
+        where clauses filter with every operator and can be chained
+        """
+        self.assertEqual(
+            self.ids(self.courses.where("sbj", "==", "CS")), ["CS1110", "CS2110"]
+        )
+        self.assertEqual(self.ids(self.courses.where("lvl", ">", 1)), ["CS2110"])
+        self.assertEqual(
+            self.ids(self.courses.where("sbj", "!=", "CS")), ["MATH1920"]
+        )
+        self.assertEqual(
+            self.ids(self.courses.where("smst", "array_contains", "FA24")),
+            ["CS1110", "MATH1920"],
+        )
+        self.assertEqual(
+            self.ids(self.courses.where("sbj", "in", ["MATH", "PHYS"])),
+            ["MATH1920"],
+        )
+        query = self.courses.where("sbj", "==", "CS").where("lvl", "<=", 1)
+        self.assertEqual(self.ids(query), ["CS1110"])
+
+    def test_where_field_name(self):
+        """
+        a field that is not a plain name is rejected instead of becoming SQL
+        """
+        with self.assertRaises(ValueError):
+            self.courses.where("sbj') OR 1=1 --", "==", "CS").get()
+
+    def test_where_uses_index(self):
+        """
+        a where clause on an indexed field is answered with its expression
+        index
+        """
+        statements = []
+        self.db._connection.set_trace_callback(statements.append)
+        self.courses.where("sbj", "==", "CS").get()
+        self.db._connection.set_trace_callback(None)
+        plan = self.db._connection.execute(
+            "EXPLAIN QUERY PLAN " + statements[-1]
+        ).fetchall()
+        self.assertIn("documents_sbj", " ".join(row[-1] for row in plan))
+
+    def test_select_limit(self):
+        """
+        select keeps only the selected fields and limit the first documents
+        """
+        docs = self.courses.select(["ttl"]).limit(2).get()
+        self.assertEqual([doc.id for doc in docs], ["CS1110", "CS2110"])
+        self.assertEqual(docs[0].to_dict(), {"ttl": "Intro"})
+        self.assertEqual(len(self.courses.where("sbj", "==", "CS").limit(1).get()), 1)
+
+    def test_get_all(self):
+        """
+        get_all reads every reference, with the selected fields
+        """
+        references = [self.courses.document(c) for c in ("MATH1920", "CS9999")]
+        docs = list(self.db.get_all(references, field_paths=["sbj"]))
+        self.assertEqual(docs[0].to_dict(), {"sbj": "MATH"})
+        self.assertFalse(docs[1].exists)
+
+    def test_batch(self):
+        """
+        a batch applies its writes together on commit, and none of them if
+        one fails
+        """
+        batch = self.db.batch()
+        batch.set(self.courses.document("CS3110"), {"sbj": "CS", "lvl": 3})
+        batch.update(self.courses.document("CS1110"), {"lvl": 0})
+        batch.delete(self.courses.document("MATH1920"))
+        self.assertFalse(self.courses.document("CS3110").get().exists)
+        batch.commit()
+        self.assertEqual(self.ids(self.courses), ["CS1110", "CS2110", "CS3110"])
+        self.assertEqual(self.courses.document("CS1110").get().get("lvl"), 0)
+
+        batch = self.db.batch()
+        batch.delete(self.courses.document("CS2110"))
+        batch.update(self.courses.document("CS9999"), {"lvl": 9})
+        with self.assertRaises(localStore.NotFound):
+            batch.commit()
+        self.assertTrue(self.courses.document("CS2110").get().exists)
+
+
+if __name__ == "__main__":
+    unittest.main()
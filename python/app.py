@@ -3,86 +3,64 @@ Author: Raymond Xu
 Start Date: January 3, 2025
 """
 
-from flask import Flask, session, request, jsonify, redirect, url_for, render_template
+from flask import (
+    Flask,
+    g,
+    session,
+    request,
+    jsonify,
+    redirect,
+    url_for,
+    render_template,
+)
 from flask_cors import CORS
 import json
 import re
 import special
+import audit
 import parseMajor
+import dataStore
+import eligibility
+import gradPlan
+import majorFile
+import offering
+import prereqGraph
+import requirementSpec
+import schedule
+import searchIndex
 from course import *
 from constants import *
 import os
+import uuid
 
 app = Flask(__name__)
 app.secret_key = "some_random_secret_key"
 CORS(app, origins=["http://localhost:5173"])
 
-course_data_am = {}
-course_data_nz = {}
-SP_session = {}
-FA_session = {}
-SU_session = {}
-WI_session = {}
-college_data = {}
 major1_data = {}
 major2_data = {}
 
 CURRENT = 2025
 LATEST = 2030
 
+# parsed once per process; reloaded only when the data files change
+DATA_STORE = dataStore.get_store()
+
 
 @app.before_request
 def load_data():
-    load_course_data()
-    load_college_data()
-    load_instructor_data()
-
-
-# helper for load data
-def load_course_data():
-    global course_data_am
-    global course_data_nz
-    global SP_session
-    global FA_session
-    global WI_session
-    global SU_session
-
-    filepath = os.path.join(COURSE_DATA_ROUTE, "combined_am.json")
-    with open(filepath, "r") as file:
-        course_data_am = json.load(file)
-
-    filepath = os.path.join(COURSE_DATA_ROUTE, "combined_nz.json")
-    with open(filepath, "r") as file:
-        course_data_nz = json.load(file)
-
-    filepath = os.path.join(SESSION_DATA_ROUTE, "SP_session.json")
-    with open(filepath, "r") as file:
-        SP_session = json.load(file)
-
-    filepath = os.path.join(SESSION_DATA_ROUTE, "FA_session.json")
-    with open(filepath, "r") as file:
-        FA_session = json.load(file)
-
-    filepath = os.path.join(SESSION_DATA_ROUTE, "SU_session.json")
-    with open(filepath, "r") as file:
-        SU_session = json.load(file)
-
-    filepath = os.path.join(SESSION_DATA_ROUTE, "WI_session.json")
-    with open(filepath, "r") as file:
-        WI_session = json.load(file)
+    g.data = DATA_STORE.get()
 
 
-# helper for load data
-def load_college_data():
-    global college_data
-    with open("data/college_data/college.json", "r") as file:
-        college_data = json.load(file)
-
-
-def load_instructor_data():
-    global instructor_data
-    with open("data/instructor_data/instructor_rate.json", "r") as file:
-        instructor_data = json.load(file)
+def get_eligibility_state():
+    """
+    return the EligibilityState of the current session, keyed by a random
+    session id so the satisfied clauses survive between requests
+    """
+    if "sid" not in session:
+        session["sid"] = uuid.uuid4().hex
+    courses_taken = session.get("courses_taken") or []
+    return eligibility.get_state(session["sid"], courses_taken, g.data)
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -170,45 +148,18 @@ def select_courses():
 
 @app.route("/search-courses", methods=["GET"])
 def search_courses():
-    query = request.args.get("query", "").upper()
-    if not query:
+    query = request.args.get("query", "")
+    if not query.strip():
         return jsonify([])
-    matching_courses = []
-    if query.isalpha():
-        for subject in course_data:
-            if query in subject:
-                count = 0
-                for course_code, course_info in course_data[subject].items():
-                    matching_courses.append(
-                        {"course_code": course_code, "title": course_info["Title"]}
-                    )
-                    count += 1
-                    if count == 8:
-                        return jsonify(matching_courses)
-        return jsonify(matching_courses)
-    else:
-        query_subject = course.get_subject(query)
-        if query_subject in course_data:
-            for course_code, course_info in course_data[query_subject].items():
-                if query in course_code:
-                    matching_courses.append(
-                        {"course_code": course_code, "title": course_info["Title"]}
-                    )
-            return jsonify(matching_courses[:8])
-    return jsonify([])
+    limit = request.args.get("limit", searchIndex.DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, 50))
+    return jsonify(searchIndex.get_index(g.data).search(query, limit))
 
 
 @app.route("/api/course/<course_code>", methods=["GET"])
 def display_course(course_code):
-
-    if course_code[0] in A_TO_M:
-        course_created = Course.create(
-            course_code, course_data_am, SP_session, FA_session, SU_session, WI_session
-        )
-    else:
-        course_created = Course.create(
-            course_code, course_data_nz, SP_session, FA_session, SU_session, WI_session
-        )
+    data = g.data
+    course_created = get_course(course_code, data)
 
     session = course_created.get_session()
     credits = course_created.get_credits(session)
@@ -223,10 +174,12 @@ def display_course(course_code):
         "outcomes": course_created.get_outcomes(),
         "permission": course_created.get_permission(),
         "credits": credits,
+        "semester_provided": offering.get_index(data).describe(course_code),
+        "next_offered": offering.get_index(data).get_next(course_code),
     }
     semesters = course_created.get_semester_offered()
     crt_instr_dict = course_created.get_instructors(semesters[0])
-    crt_quality = course_created.get_quality(crt_instr_dict, instructor_data)
+    crt_quality = course_created.get_quality(crt_instr_dict, data.instructor_data)
     recent_semester = semesters[0]
     distributions = course_created.get_distribution()
     prereq = course_created.get_prereq()
@@ -255,58 +208,135 @@ def display_course(course_code):
     # )
 
 
-@app.route("/<major_displayed>-<college>", methods=["GET"])
-def display_major(major_displayed, college):
-    courses_taken = session["courses_taken"]
-    major1 = session["major1"]
-    major2 = session["major2"]
-    major_d_data = load_major_data(major_displayed)
-    minor1 = session["minor1"]
-    # minor2 = session["minor2"]
-    # minor3 = session["minor3"]
-    session["number_int"] = 0
-    session["number_list"] = [0]
-    if major2:
-        if major1 == major_displayed:
-            major_left = major2
-        if major2 == major_displayed:
-            major_left = major1
-        major_l_data = load_major_data(major_left)
-    else:
-        major_left = None
-        major_l_data = None
-    minor1_data = load_minor_data(minor1) if minor1 else None
-    sections = parseMajor.parse_major(
-        course_data,
-        courses_taken,
-        college,
-        major_displayed,
-        major_d_data,
-        major_left,
-        major_l_data,
-        minor1,
-        minor1_data,
+@app.route("/api/course/<course_code>/unlocks", methods=["GET"])
+def display_unlocks(course_code):
+    graph = prereqGraph.get_graph(g.data)
+    if not graph.contains(course_code):
+        return jsonify({"error": f"Unknown course {course_code}"}), 404
+
+    unlocks = [
+        {"course_code": code, "type": edge_type}
+        for code, edge_type in graph.get_unlock_types(course_code)
+    ]
+    return jsonify(
+        {
+            "course_code": course_code,
+            "unlocks": unlocks,
+            "all_unlocks": graph.get_all_unlocks(course_code),
+        }
+    )
+
+
+@app.route("/api/course/<course_code>/prereqs", methods=["GET"])
+def display_prereqs(course_code):
+    graph = prereqGraph.get_graph(g.data)
+    if not graph.contains(course_code):
+        return jsonify({"error": f"Unknown course {course_code}"}), 404
+
+    return jsonify(
+        {
+            "course_code": course_code,
+            "prereqs": graph.get_prereqs(course_code),
+            "chain": graph.get_chain(course_code),
+        }
+    )
+
+
+@app.route("/api/plan", methods=["GET"])
+def display_plan():
+    college = session.get("college")
+    majors = {}
+    for major in session.get("majors") or []:
+        major = major.split("-")[0]
+        if os.path.exists(f"data/major_data/{major}.json"):
+            major_data = load_major_data(major)
+            majors[major] = majorFile.get_major_requirements(major_data, college)
+    if not majors:
+        return jsonify({"error": "No major with requirements selected"}), 400
+
+    start = request.args.get("start")
+    if start is not None and not gradPlan.START_PATTERN.fullmatch(start):
+        return jsonify({"error": "The start must be a semester such as FA25"}), 400
+    cap = request.args.get("cap", gradPlan.DEFAULT_CREDIT_CAP, type=int)
+    cap = max(1, min(cap, 30))
+    return jsonify(
+        gradPlan.plan_graduation(
+            majors,
+            session.get("courses_taken") or [],
+            g.data,
+            start=start,
+            cap=cap,
+        )
+    )
+
+
+@app.route("/api/schedule", methods=["GET"])
+def display_schedule():
+    course_codes = [code for code in request.args.get("courses", "").split(",") if code]
+    if not course_codes:
+        return jsonify({"error": "No course provided"}), 400
+    invalid = [
+        code for code in course_codes if not majorFile.COURSE_PATTERN.fullmatch(code)
+    ]
+    if invalid:
+        return jsonify({"error": f"Invalid course codes: {', '.join(invalid)}"}), 400
+    if len(course_codes) > schedule.MAX_COURSES:
+        return (
+            jsonify({"error": f"At most {schedule.MAX_COURSES} courses at once"}),
+            400,
+        )
+    semester = request.args.get("semester", LAST_SEMESTER)
+    if not schedule.SEMESTER_PATTERN.fullmatch(semester):
+        return jsonify({"error": "The semester must be such as SP25"}), 400
+    try:
+        preferences = schedule.Preferences(
+            earliest=request.args.get("earliest", "08:00AM"),
+            latest=request.args.get("latest", "06:00PM"),
+            avoid_days=request.args.get("avoid", ""),
+        )
+    except ValueError:
+        return jsonify({"error": "The times must be such as 09:05AM"}), 400
+    limit = request.args.get("limit", schedule.DEFAULT_LIMIT, type=int)
+    limit = max(1, min(limit, 20))
+    return jsonify(
+        schedule.plan_schedules(course_codes, semester, g.data, preferences, limit)
     )
 
-    simple_sections = {}
-    searchable_sections = {}
 
-    for section_name, info in sections.items():
-        if isinstance(info["Courses"], list):
-            simple_sections[section_name] = info
-        else:
-            searchable_sections[section_name] = info
+@app.route("/api/audit", methods=["GET"])
+def display_audit():
+    college = session.get("college")
+    audits = []
+    for major in session.get("majors") or []:
+        major = major.split("-")[0]
+        if os.path.exists(os.path.join(audit.MAJOR_DATA_ROUTE, f"{major}.json")):
+            audits.append(audit.get_audit(g.data, major, college))
+    if not audits:
+        return jsonify({"error": "No major with requirements selected"}), 400
+
+    share = request.args.get("share", "1") != "0"
+    courses_taken = session.get("courses_taken") or []
+    return jsonify(audit.audit_majors(audits, courses_taken, share))
+
+
+@app.route("/<major_displayed>-<college>", methods=["GET"])
+def display_major(major_displayed, college):
+    compiled = requirementSpec.get_major(g.data, major_displayed, college)
+    if compiled is None:
+        return (
+            jsonify({"error": f"No requirements for {major_displayed}-{college}"}),
+            404,
+        )
+    simple_sections, searchable_sections = parseMajor.get_sections(compiled)
 
     return render_template(
         "display-major.html",
-        course_data=course_data,
-        courses_taken=session["courses_taken"],
+        course_data={**g.data.course_data_am, **g.data.course_data_nz},
+        courses_taken=session.get("courses_taken") or [],
         major=major_displayed,
         college=college,
         simple_sections=simple_sections,
         searchable_sections=searchable_sections,
-        number=session["number_int"],
-        number_list=session["number_list"],
     )
 
 
@@ -328,10 +358,12 @@ def add_course_taken():
     #     print(session['courses_taken'])
     # return jsonify(session['courses_taken'])
 
+    state = get_eligibility_state()
     courses_taken = session["courses_taken"][:]
     if course_code not in courses_taken:
         courses_taken.append(course_code)
         session["courses_taken"] = courses_taken
+        state.add(course_code)
         print(session["courses_taken"])
     return jsonify(session["courses_taken"])
 
@@ -348,11 +380,13 @@ def remove_course_taken():
     if "courses_taken" not in session:
         session["courses_taken"] = []
 
+    state = get_eligibility_state()
     courses_taken = session["courses_taken"][:]
     # Remove the course from session['courses_taken'] if it exists
     if course_code in session["courses_taken"]:
         courses_taken.remove(course_code)
         session["courses_taken"] = courses_taken
+        state.remove(course_code)
 
     # Return the updated list of courses
     return jsonify(session["courses_taken"])
@@ -366,8 +400,7 @@ def check_eligibility():
     if not course_code:
         return jsonify({"error": "No course provided"}), 400
 
-    courses_taken = session.get("courses_taken", [])
-    is_eligible, _ = course.check_eligibility(course_data, courses_taken, course_code)
+    is_eligible = get_eligibility_state().is_eligible(course_code)
 
     return jsonify({"course": course_code, "is_eligible": is_eligible})
 
@@ -390,9 +423,7 @@ def get_recent_semester(course_code):
 
 @app.template_filter("is_eligible")
 def is_eligible(course_code):
-    courses_taken = session["courses_taken"]
-    check, list = course.check_eligibility(course_data, courses_taken, course_code)
-    return check
+    return get_eligibility_state().is_eligible(course_code)
 
 
 def is_group_taken(group, courses_taken):
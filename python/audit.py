@@ -0,0 +1,293 @@
+import json
+import os
+import re
+import catalogIndex
+import course
+import majorFile
+import matching
+from constants import *
+
+MAJOR_DATA_ROUTE = "data/major_data/"
+
+
+class Requirement(object):
+    """
+    One requirement of a major: number courses among the ones it accepts.
+
+    A course is accepted if it is one of courses, or, for a requirement with
+    a rule, if it matches the subject, numbering pattern, level and credits
+    of the rule and is not excluded. A requirement with double_count may use
+    courses that other requirements of the major use too; every other course
+    counts for one requirement only.
+    """
+
+    def accepts(self, course_code, index):
+        """
+        return true if course_code can count for this requirement
+
+        Parameter index: the catalog
+        Precondition: index is a catalogIndex.CatalogIndex
+        """
+        accepted = self._accepted.get(course_code)
+        if accepted is None:
+            accepted = self._accepts(course_code, index)
+            self._accepted[course_code] = accepted
+        return accepted
+
+    def _accepts(self, course_code, index):
+        if course_code in self.courses:
+            return True
+        if not self.rule or course_code in self.excluded:
+            return False
+        if self.pattern and not self.pattern.fullmatch(course_code):
+            return False
+        subject = course.get_subject(course_code)
+        if self.subject and subject != self.subject:
+            return False
+        if self.other_than and subject == self.other_than:
+            return False
+        level = index.get_level(course_code)
+        if level is None or level < self.min_level:
+            return False
+        return (index.get_max_credit(course_code) or 0) >= self.min_credit
+
+    def __init__(self, group, number, courses=(), double_count=False):
+        """
+        Parameter group: the name of the requirement group
+        Precondition: group is a str
+
+        Parameter number: the number of courses required
+        Precondition: number is an int > 0
+
+        Parameter courses: the courses accepted, in the order of the data
+        Precondition: courses is a list of course codes
+        """
+        self.group = group
+        self.number = number
+        self.alternatives = list(courses)
+        self.courses = frozenset(courses)
+        self.double_count = double_count
+        self.rule = False
+        self.pattern = None
+        self.subject = None
+        self.other_than = None
+        self.min_level = 1
+        self.min_credit = 0
+        self.excluded = frozenset()
+        self._accepted = {}
+
+
+def parse_requirements(major, requirements):
+    """
+    return the list of Requirements of the requirement groups of a major, in
+    the formats read by gradPlan.parse_requirements
+
+    A group may set "double_count" to let its courses count for other
+    groups too. Groups without a number, such as free electives, are left
+    out.
+    """
+    result = []
+    if isinstance(requirements, dict):
+        groups = requirements.items()
+    else:
+        groups = [(req.get("name", req.get("id")), req) for req in requirements]
+
+    for name, group in groups:
+        if isinstance(group, list):
+            for alternatives in group:
+                if isinstance(alternatives, str):
+                    alternatives = [alternatives]
+                codes = majorFile.get_codes(alternatives)
+                result.append(Requirement(name, 1, codes))
+            continue
+        if not isinstance(group, dict) or not group.get("number"):
+            continue
+        number = group["number"]
+        double_count = group.get("double_count", False)
+        if "courseGrps" in group:
+            course_groups = [
+                majorFile.get_codes(grp["courses"]) for grp in group["courseGrps"]
+            ]
+            if number >= len(course_groups):
+                for codes in course_groups:
+                    result.append(Requirement(name, 1, codes, double_count))
+                continue
+            codes = [code for codes in course_groups for code in codes]
+            result.append(Requirement(name, number, codes, double_count))
+            continue
+        if "courses" in group:
+            codes = majorFile.get_codes(group["courses"])
+            result.append(Requirement(name, number, codes, double_count))
+            continue
+
+        included = majorFile.get_codes(group.get("included", []))
+        requirement = Requirement(name, number, included, double_count)
+        requirement.rule = True
+        requirement.excluded = frozenset(group.get("excluded", []))
+        requirement.min_level = group.get("min_level", 1)
+        requirement.min_credit = group.get("min_credit", 0)
+        requirement_format = group.get("format", "level")
+        subject = group.get("subject", major)
+        if "X" in requirement_format:
+            requirement.pattern = re.compile(requirement_format.replace("X", "[0-9]"))
+            requirement.subject = re.match(r"[A-Z]+", requirement_format).group(0)
+        elif requirement_format != "level":
+            continue
+        elif subject == "any but same":
+            requirement.other_than = major
+        elif subject != "any":
+            requirement.subject = subject
+        result.append(requirement)
+    return result
+
+
+def assign(requirements, courses, index):
+    """
+    return a list with the courses assigned to every requirement, so that
+    the most requirement slots are filled
+
+    A requirement of number n is n slots, and every slot and course is a
+    node of a bipartite graph with an edge when the requirement accepts the
+    course. A maximum matching (Hopcroft-Karp) fills the most slots; unlike
+    taking courses in order, it moves a course such as CS3700 out of a group
+    where another course can take its place. Requirements with double_count
+    are matched on their own, so they don't take courses from the others.
+
+    Parameter courses: the courses taken
+    Precondition: courses is a sorted list of course codes without repeats
+    """
+    assigned = [[] for _ in requirements]
+    exclusive = [i for i, req in enumerate(requirements) if not req.double_count]
+    batches = [exclusive] + [
+        [i] for i, req in enumerate(requirements) if req.double_count
+    ]
+    for batch in batches:
+        edges = {
+            i: [
+                v
+                for v, course_code in enumerate(courses)
+                if requirements[i].accepts(course_code, index)
+            ]
+            for i in batch
+        }
+        # the slots with the fewest courses first, so the greedy pass of the
+        # matching already gets most of them right
+        slots = []
+        for i in sorted(batch, key=lambda i: (len(edges[i]), i)):
+            slots.extend([i] * min(requirements[i].number, len(edges[i])))
+        adjacency = [edges[i] for i in slots]
+        matched = matching.hopcroft_karp(adjacency, len(courses))
+        for slot, v in enumerate(matched):
+            if v != matching.UNMATCHED:
+                assigned[slots[slot]].append(courses[v])
+    for courses_assigned in assigned:
+        courses_assigned.sort()
+    return assigned
+
+
+class RequirementAudit(object):
+    """
+    The requirements of one major in one college, checked against the
+    courses taken by a maximum bipartite matching. The requirements are
+    parsed once per catalog snapshot and remember which courses they accept,
+    so an audit after every change of courses_taken only rebuilds the graph
+    of the courses taken.
+    """
+
+    def audit(self, courses_taken):
+        """
+        return a dictionary with, for every requirement group, the number of
+        courses required, the courses that count for it, the number still
+        missing and the alternatives of the missing courses of a list; and
+        the courses taken that count for no group
+        """
+        courses = sorted(set(courses_taken))
+        return self.report(assign(self.requirements, courses, self._index), courses)
+
+    def report(self, assigned, courses):
+        """
+        return the audit dictionary of the courses assigned to every
+        requirement by assign
+        """
+        groups = {}
+        used = set()
+        for requirement, courses_assigned in zip(self.requirements, assigned):
+            group = groups.setdefault(
+                requirement.group,
+                {"required": 0, "courses": [], "remaining": 0, "missing": []},
+            )
+            group["required"] += requirement.number
+            group["courses"].extend(courses_assigned)
+            remaining = requirement.number - len(courses_assigned)
+            group["remaining"] += remaining
+            if remaining and not requirement.rule:
+                group["missing"].append(requirement.alternatives)
+            used.update(courses_assigned)
+        for group in groups.values():
+            group["fulfilled"] = group["remaining"] == 0
+        return {
+            "major": self.major,
+            "groups": groups,
+            "fulfilled": all(group["fulfilled"] for group in groups.values()),
+            "unused": [code for code in courses if code not in used],
+        }
+
+    def __init__(self, major, requirements, data):
+        """
+        Parameter major: the subject of the major, such as "CS"
+        Precondition: major is a str
+
+        Parameter requirements: the requirement groups of the major
+        Precondition: see parse_requirements
+
+        Parameter data: the catalog
+        Precondition: data is a dataStore.Snapshot
+        """
+        self.major = major
+        self.requirements = parse_requirements(major, requirements)
+        self._index = catalogIndex.get_index(data)
+
+
+def get_audit(data, major, college):
+    """
+    return the RequirementAudit of a major in a college, building it from
+    its file in MAJOR_DATA_ROUTE on first use with a catalog snapshot
+    """
+
+    def build(data):
+        with open(os.path.join(MAJOR_DATA_ROUTE, f"{major}.json"), "r") as file:
+            major_data = json.load(file)
+        requirements = majorFile.get_major_requirements(major_data, college)
+        return RequirementAudit(major, requirements, data)
+
+    return data.derive(f"requirementAudit:{major}-{college}", build)
+
+
+def audit_majors(audits, courses_taken, share=True):
+    """
+    return a dictionary with the audit of every major
+
+    Parameter audits: the RequirementAudit of every major
+    Precondition: audits is a list of RequirementAudits
+
+    Parameter share: whether a course may count for several majors; if not,
+    the requirements of every major are matched together
+    Precondition: share is a bool
+    """
+    if share:
+        return {audit.major: audit.audit(courses_taken) for audit in audits}
+    courses = sorted(set(courses_taken))
+    requirements = [req for audit in audits for req in audit.requirements]
+    index = audits[0]._index if audits else None
+    assigned = assign(requirements, courses, index)
+    result = {}
+    start = 0
+    for audit in audits:
+        end = start + len(audit.requirements)
+        result[audit.major] = audit.report(assigned[start:end], courses)
+        start = end
+    # a course that counts for another major is not unused
+    used = {code for courses_assigned in assigned for code in courses_assigned}
+    for report in result.values():
+        report["unused"] = [code for code in courses if code not in used]
+    return result
@@ -0,0 +1,320 @@
+import argparse
+import cProfile
+import heapq
+import json
+import os
+import pstats
+import random
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "data"))
+
+import course
+from constants import MAJORS, MINORS
+
+DEFAULT_SESSIONS = 50
+DEFAULT_REQUESTS = 2000
+DEFAULT_WARMUP = 50
+DEFAULT_SLOWEST = 5
+
+# how often each route is hit relative to the others
+ROUTE_WEIGHTS = {
+    "course": 5,
+    "search": 4,
+    "eligibility": 4,
+    "major": 1,
+    "audit": 1,
+    "plan": 1,
+}
+
+# the routes that need a major in the session
+MAJOR_ROUTES = ("major", "audit", "plan")
+
+# a synthetic student has taken between these many courses
+MIN_TAKEN = 0
+MAX_TAKEN = 40
+
+
+def all_course_codes(data):
+    """
+    return every course code of the catalog in data
+    """
+    codes = []
+    for course_data in (data.course_data_am, data.course_data_nz):
+        for subject in course_data:
+            codes.extend(course_data[subject])
+    return sorted(codes)
+
+
+def available_majors():
+    """
+    return the (major, college) pairs in MAJORS that have a requirement file
+    """
+    majors = []
+    for key in MAJORS:
+        major, college = key.split("-")
+        if os.path.exists(os.path.join(ROOT, "data", "major_data", f"{major}.json")):
+            majors.append((major, college))
+    return majors
+
+
+def available_minors():
+    """
+    return the minors in MINORS that have a requirement file
+    """
+    minors = []
+    for key in MINORS:
+        minor = key.split("-")[0]
+        if os.path.exists(os.path.join(ROOT, "data", "minor_data", f"{minor}.json")):
+            minors.append(minor)
+    return minors
+
+
+def build_population(count, codes, rng):
+    """
+    return count synthetic sessions with varied majors, minors and courses
+    taken
+
+    Lower level courses are taken more often than upper level ones, like
+    the transcripts of real students.
+    """
+    majors = available_majors()
+    minors = available_minors()
+    weights = [1.0 / max(int(course.get_number(code)[0]), 1) for code in codes]
+    population = []
+    for _ in range(count):
+        major, college = rng.choice(majors) if majors else (None, None)
+        second = [other for other, c in majors if c == college and other != major]
+        major2 = rng.choice(second) if second and rng.random() < 0.2 else None
+        minor = rng.choice(minors) if minors and rng.random() < 0.3 else None
+        taken = set(rng.choices(codes, weights, k=rng.randint(MIN_TAKEN, MAX_TAKEN)))
+        population.append(
+            {
+                "college": college,
+                "majors": [m for m in (major, major2) if m],
+                "minors": [minor] if minor else [],
+                "courses_taken": sorted(taken),
+            }
+        )
+    return population
+
+
+def build_request(route, profile, codes, rng):
+    """
+    return the (method, url, json body) of one request to route
+    """
+    code = rng.choice(codes)
+    if route == "course":
+        return "GET", f"/api/course/{code}", None
+    if route == "search":
+        subject = course.get_subject(code)
+        if rng.random() < 0.5:
+            query = subject[: rng.randint(1, len(subject))]
+        else:
+            query = code[: len(subject) + rng.randint(1, 3)]
+        return "GET", f"/search-courses?query={query}", None
+    if route == "eligibility":
+        return "POST", "/check_eligibility", {"course": code}
+    if route == "major":
+        return "GET", f"/{profile['majors'][0]}-{profile['college']}", None
+    return "GET", f"/api/{route}", None
+
+
+def percentile(sorted_values, fraction):
+    """
+    return the nearest-rank percentile of a sorted list
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class Harness(object):
+    """
+    Drives app.test_client() with a population of sessions and records the
+    latency of every request by route.
+
+    Every synthetic student has its own client, so its cookie session (and
+    the server-side state keyed by it) persists across its requests. A
+    response with an error status stops the run, so the latencies never
+    measure an error path. With profile set, each request runs under
+    cProfile and the profiles of the slowest requests are kept; the
+    latencies then include the profiler overhead.
+    """
+
+    def run(self, count, warmup=DEFAULT_WARMUP):
+        """
+        send warmup unrecorded requests, then count recorded ones, and return
+        the wall time of the recorded ones in seconds
+        """
+        for _ in range(warmup):
+            self._send(record=False)
+        start = time.perf_counter()
+        for _ in range(count):
+            self._send(record=True)
+        self.seconds = time.perf_counter() - start
+        return self.seconds
+
+    def get_report(self):
+        """
+        return a dictionary with the count, requests per second and
+        p50/p95/p99 latency in milliseconds of every route
+
+        The requests per second of a route are its requests over the wall
+        time of the whole run, so the routes add up to the overall
+        throughput.
+        """
+        report = {}
+        for route, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            report[route] = {
+                "requests": len(ordered),
+                "requests_per_sec": (
+                    len(ordered) / self.seconds if self.seconds else 0.0
+                ),
+                "p50_ms": percentile(ordered, 0.50) * 1000,
+                "p95_ms": percentile(ordered, 0.95) * 1000,
+                "p99_ms": percentile(ordered, 0.99) * 1000,
+            }
+        return report
+
+    def dump_profiles(self, directory):
+        """
+        write the profile of every kept slow request to directory and print
+        the functions with the most cumulative time
+        """
+        os.makedirs(directory, exist_ok=True)
+        slowest = sorted(self._slowest, reverse=True)
+        for rank, (elapsed, _, method, url, profiler) in enumerate(slowest, 1):
+            path = os.path.join(directory, f"slow_{rank}.prof")
+            profiler.dump_stats(path)
+            print(f"\n#{rank} {method} {url} {elapsed * 1000:.1f} ms -> {path}")
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(10)
+
+    def _send(self, record):
+        index = self.rng.randrange(len(self.population))
+        profile = self.population[index]
+        route = self.rng.choices(self.routes, self.weights)[0]
+        if route in MAJOR_ROUTES and not profile["majors"]:
+            route = "course"
+        method, url, body = build_request(route, profile, self.codes, self.rng)
+        client = self._get_client(index)
+
+        profiler = cProfile.Profile() if self.slowest and record else None
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        response = client.open(url, method=method, json=body)
+        if profiler:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise RuntimeError(f"{method} {url} returned {response.status_code}")
+        if not record:
+            return
+
+        self.latencies.setdefault(route, []).append(elapsed)
+        if profiler:
+            self._sequence += 1
+            entry = (elapsed, self._sequence, method, url, profiler)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+
+    def _get_client(self, index):
+        if index not in self._clients:
+            client = self._app.test_client()
+            with client.session_transaction() as session:
+                session.update(self.population[index])
+            self._clients[index] = client
+        return self._clients[index]
+
+    def __init__(
+        self,
+        app,
+        store,
+        sessions=DEFAULT_SESSIONS,
+        seed=0,
+        slowest=0,
+        route_weights=ROUTE_WEIGHTS,
+    ):
+        """
+        Parameter app: the application
+        Precondition: app is the Flask app of app.py
+
+        Parameter store: the data of the application
+        Precondition: store is a dataStore.DataStore
+        """
+        self._app = app
+        self.rng = random.Random(seed)
+        self.codes = all_course_codes(store.get())
+        self.population = build_population(sessions, self.codes, self.rng)
+        self.routes = list(route_weights)
+        self.weights = [route_weights[route] for route in self.routes]
+        self.slowest = slowest
+        self.latencies = {}
+        self.seconds = 0.0
+        self._clients = {}
+        self._slowest = []
+        self._sequence = 0
+
+
+def print_report(report, seconds):
+    print(
+        f"{'route':<14}{'requests':>10}{'req/s':>10}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+    total = 0
+    for route, result in report.items():
+        total += result["requests"]
+        print(
+            f"{route:<14}{result['requests']:>10}"
+            f"{result['requests_per_sec']:>10.0f}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+        )
+    print(f"{total} requests in {seconds:.2f}s, {total / seconds:.0f} req/s overall")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure the request latency of the Flask app under load"
+    )
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS)
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--profile",
+        type=int,
+        nargs="?",
+        const=DEFAULT_SLOWEST,
+        default=0,
+        metavar="N",
+        help="profile every request and keep the N slowest",
+    )
+    parser.add_argument("--profile-dir", default="profiles")
+    parser.add_argument("--save", help="write the report to this json file")
+    args = parser.parse_args()
+
+    # the app reads its data files relative to the project root
+    os.chdir(ROOT)
+    import app
+
+    harness = Harness(app.app, app.DATA_STORE, args.sessions, args.seed, args.profile)
+    seconds = harness.run(args.requests, args.warmup)
+    report = harness.get_report()
+    print_report(report, seconds)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.profile:
+        harness.dump_profiles(args.profile_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+from course import *
+
+
+class CatalogIndex(object):
+    """
+    Subject / level / credit index of one catalog snapshot.
+
+    For every subject it keeps the course codes of each level in catalog
+    order, and for every course its level and the max credit of its most
+    recent session. Level requirements such as "ARTH 3000+ with at least 3
+    credits excluding ARTH4101" become unions and differences of frozensets
+    instead of building a Course object for every course in the subject.
+    """
+
+    def get_level(self, course_code):
+        """
+        return the level of course_code, or None if it is not in the catalog
+        """
+        return self._levels.get(course_code)
+
+    def get_max_credit(self, course_code):
+        """
+        return the max credit of course_code, or None if it is unknown or not
+        provided in the current year
+        """
+        return self._max_credits.get(course_code)
+
+    def get_malformed(self):
+        """
+        return the codes of the catalog that are not course codes, such as
+        "CS" or "CS11100", in catalog order
+        """
+        return self._malformed
+
+    def contains(self, course_code):
+        return course_code in self._levels
+
+    def get_courses(self, subject, level, min_credit=0):
+        """
+        return a frozenset of the courses of a subject at exactly one level
+        whose max credit is at least min_credit
+
+        Parameter level: the level of the courses
+        Precondition: level is an int in [1,9]
+        """
+        key = (subject, level, min_credit)
+        result = self._credit_sets.get(key)
+        if result is None:
+            result = frozenset(
+                course_code
+                for course_code in self._by_level.get((subject, level), ())
+                if self._max_credits.get(course_code)
+                and self._max_credits[course_code] >= min_credit
+            )
+            self._credit_sets[key] = result
+        return result
+
+    def select(
+        self, subject, min_level, max_level=9, min_credit=3, excluded=[], included=[]
+    ):
+        """
+        return a list of the courses of a subject whose level is between
+        min_level and max_level (inclusive) and whose max credit is at least
+        min_credit, in catalog order, followed by the included courses
+
+        Parameter excluded: courses that must not be returned
+        Precondition: excluded is a list of course codes
+
+        Parameter included: courses that are appended to the result
+        Precondition: included is a list of course codes
+        """
+        matched = set()
+        for level in range(min_level, max_level + 1):
+            matched |= self.get_courses(subject, level, min_credit)
+        matched -= set(excluded)
+        result = sorted(matched, key=self._position.__getitem__)
+        return result + included
+
+    def matches(self, course_code, subject, min_level, min_credit=3, excluded=[]):
+        """
+        return true if course_code is a course of subject at min_level or above
+        with a max credit of at least min_credit, and it is not excluded
+        """
+        if course_code in excluded:
+            return False
+        level = self._levels.get(course_code)
+        if level is None or level < min_level:
+            return False
+        if get_subject(course_code) != subject:
+            return False
+        max_credit = self._max_credits.get(course_code)
+        return bool(max_credit) and max_credit >= min_credit
+
+    def __init__(self, data):
+        """
+        Parameter data: the catalog to index
+        Precondition: data is a dataStore.Snapshot
+        """
+        self._levels = {}
+        self._max_credits = {}
+        self._position = {}
+        self._by_level = {}
+        self._credit_sets = {}
+        self._malformed = []
+        sessions = data.get_sessions()
+        for course_data in (data.course_data_am, data.course_data_nz):
+            for subject, courses in course_data.items():
+                for course_code in courses:
+                    try:
+                        course_created = Course.create(
+                            course_code, course_data, *sessions
+                        )
+                    except ValueError:
+                        self._malformed.append(course_code)
+                        continue
+                    level = course_created.get_level()
+                    self._levels[course_code] = level
+                    self._position[course_code] = len(self._position)
+                    self._by_level.setdefault((subject, level), []).append(course_code)
+                    max_credit = course_created.get_max_credit(
+                        course_created.get_session()
+                    )
+                    if max_credit is not None:
+                        self._max_credits[course_code] = max_credit
+        for key in self._by_level:
+            self._by_level[key] = tuple(self._by_level[key])
+
+
+def get_index(data):
+    """
+    return the CatalogIndex of a catalog snapshot, building it on first use
+    """
+    return data.derive("catalogIndex", CatalogIndex)
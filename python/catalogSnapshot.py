@@ -0,0 +1,148 @@
+import os
+import sys
+import json
+import pickle
+import struct
+from constants import *
+
+SNAPSHOT_PATH = os.path.join(COURSE_DATA_ROUTE, "catalog.snap")
+
+MAGIC = b"CEXSNAP\x00"
+FORMAT_VERSION = 1
+# magic, format version, header length
+PREFIX = struct.Struct("<8sII")
+
+# strings at most this long are interned: course codes, subjects, semesters,
+# distribution tags, component names. Longer text is almost always unique.
+INTERN_MAX_LEN = 32
+
+CATALOG_FILES = {
+    "course_data_am": os.path.join(COURSE_DATA_ROUTE, "combined_am.json"),
+    "course_data_nz": os.path.join(COURSE_DATA_ROUTE, "combined_nz.json"),
+    "SP_session": os.path.join(SESSION_DATA_ROUTE, "SP_session.json"),
+    "FA_session": os.path.join(SESSION_DATA_ROUTE, "FA_session.json"),
+    "SU_session": os.path.join(SESSION_DATA_ROUTE, "SU_session.json"),
+    "WI_session": os.path.join(SESSION_DATA_ROUTE, "WI_session.json"),
+}
+
+
+def source_stamps(files):
+    """
+    return a dictionary with the [mtime, size] of every source json file, or
+    None for a file that does not exist
+
+    Parameter files: a dictionary that maps data names to json paths
+    """
+    result = {}
+    for name, path in files.items():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            result[name] = None
+            continue
+        result[name] = [stat.st_mtime_ns, stat.st_size]
+    return result
+
+
+class CatalogUnpickler(pickle.Unpickler):
+    """
+    Unpickler that refuses every global, so a snapshot can only hold the
+    dicts, lists, strings and numbers of the catalog and loading one cannot
+    run code.
+    """
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"A snapshot cannot refer to {module}.{name}")
+
+
+def intern_strings(obj, table):
+    """
+    return obj with every short string replaced by one shared copy
+
+    Parameter table: the strings interned so far, mapped to themselves
+    Precondition: table is a dictionary
+    """
+    if isinstance(obj, str):
+        if len(obj) > INTERN_MAX_LEN:
+            return obj
+        return table.setdefault(obj, obj)
+    if isinstance(obj, dict):
+        return {
+            intern_strings(key, table): intern_strings(value, table)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, list):
+        return [intern_strings(item, table) for item in obj]
+    return obj
+
+
+def build_snapshot(output_path=SNAPSHOT_PATH, files=CATALOG_FILES):
+    """
+    compile the course and session json files into one binary snapshot
+
+    The file is a fixed prefix, a json header recording the source files it
+    was built from, and a pickle of the catalog. Because repeated strings
+    are interned first, pickle stores each course code, subject or tag once
+    and every reference to it unpickles to the same object.
+
+    Parameter files: a dictionary that maps data names to json paths
+    Precondition: every file of files exists
+    """
+    table = {}
+    catalog = {}
+    for name, path in files.items():
+        with open(path, "r") as file:
+            catalog[name] = intern_strings(json.load(file), table)
+
+    header = json.dumps(
+        {"sources": source_stamps(files), "strings": len(table)}
+    ).encode("utf-8")
+    payload = pickle.dumps(catalog, protocol=pickle.HIGHEST_PROTOCOL)
+
+    # write next to the target and rename so readers never see half a file
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(PREFIX.pack(MAGIC, FORMAT_VERSION, len(header)))
+        file.write(header)
+        file.write(payload)
+    os.replace(tmp_path, output_path)
+    print(
+        f"Wrote {output_path}: {len(table)} interned strings, "
+        f"{os.path.getsize(output_path)} bytes"
+    )
+
+
+def load_snapshot(path=SNAPSHOT_PATH, files=CATALOG_FILES):
+    """
+    return the catalog dictionary stored in the snapshot at path, or None if
+    there is no usable snapshot: it is missing, of another format,
+    unreadable, or older than a json file it was built from. A json file that is missing does not
+    make the snapshot stale, so the snapshot can be deployed on its own.
+
+    Loading is faster than parsing the json files, and the interned strings
+    keep the catalog smaller in memory. The catalog is still unpickled into
+    new objects of this process; workers forked afterwards do not keep
+    sharing its pages, since reference counting writes to them.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as file:
+        prefix = file.read(PREFIX.size)
+        if len(prefix) != PREFIX.size:
+            return None
+        magic, version, header_len = PREFIX.unpack(prefix)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            return None
+        try:
+            header = json.loads(file.read(header_len))
+            for name, stamp in source_stamps(files).items():
+                if stamp is not None and stamp != header["sources"].get(name):
+                    return None
+            return CatalogUnpickler(file).load()
+        except (ValueError, EOFError, pickle.UnpicklingError):
+            # a truncated or tampered file is ignored like a missing one
+            return None
+
+
+if __name__ == "__main__":
+    build_snapshot(*sys.argv[1:2])
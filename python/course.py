@@ -4,7 +4,13 @@ Start Date: December 20, 2024
 """
 
 import re
+import threading
+from collections import OrderedDict
 import special
+import offering
+import matching
+import prereqGraph
+import schedule
 from constants import *
 from group import *
 from instructor import *
@@ -79,6 +85,12 @@ class Course(object):
     def get_semester_offered(self):
         return self._semester
 
+    def get_offering(self):
+        """
+        return the offering mask of the course, see offering.encode
+        """
+        return self._offering
+
     def get_description(self):
         return self._coursedata["dsrpn"]
 
@@ -152,19 +164,131 @@ class Course(object):
             return True
         return False
 
+    def get_season_session(self, semester):
+        """
+        return the enroll groups of the course in the latest schedule of the
+        season of semester, or None if it is not provided in that season
+        """
+        plan_season = semester[:2]
+        if plan_season == "SP":
+            return self._spsession
+        if plan_season == "FA":
+            return self._fasession
+        if plan_season == "SU":
+            return self._susession
+        if plan_season == "WI":
+            return self._wisession
+        return None
+
+    def semester_provided(self, next_semester):
+        """
+        Return a str showing which semester the course is likely provided
+
+
+        For case the schedule of next semester is released:
+
+        If the course is listed in the schedule, return "Provided in
+        {next_semester}".
+
+        If the course is not listed in the schedule, and it is not provided for
+        three years, return "Not provided for three years"
+
+        If the course is not listed in the schedule, while it's only provided in
+        the "opposite semester" in past three years, return "Likely provided in
+        {next_next_semester}". For example, if the next_semester is "SP25" and
+        the course is only provided in fall semesters in the last three years,
+        return "Likely provided in FA25"
+
+        If the course is not listed in the schedule, while it specifies that it
+        will be provided in the "opposite semester" in its course description,
+        return "Likely provided in {next_next_semester}"
+
+        Else, return "Not provided in {next_semester}"
+
+
+        For case the schedule of next semester is NOT yet released:
+
+        If the course is provided in every fall and spring semester in the past
+        three years, return "Likely provided in {next_semester}."
+
+        If the course is only provided in every fall semester in the past three
+        years, return "Likely provided in {next_fall_semester}." Same for spring.
+
+        If the course is not provided for three years, return "Not provided for
+        three years".
+
+        Else, return "Unknown".
+
+        Parameter next_semester: the next semester of current time
+        Precondition: a str in form of season + year, such as "SP25". Season
+        must be FA or SP.
+        """
+        when = self._coursedata.get("when")
+        return offering.describe(self.get_offering(), next_semester, when)
+
+    def lec_time_overlap(self, another_course, semester):
+        """
+        Return True if there is an overlap in lecture time between self and
+        another_course in the given semester, return False otherwise
+
+        When a course offers several lectures, the lectures overlap only if no
+        lecture of self fits with a lecture of another_course.
+
+        Parameter another_course: the course to compare with
+        Precondition: another_course is a Course object that is provided in the
+        given semester
+
+        Parameter semester: the semester of comparison
+        Precondition: semester is a str such as "SP25" whose season has both self
+        and another_course
+        """
+        lectures = []
+        for course_created in (self, another_course):
+            session_info = course_created.get_season_session(semester) or {}
+            sections = []
+            for group in session_info.values():
+                sections.extend(schedule.get_sections(group).get("LEC", []))
+            if not sections:
+                return False
+            lectures.append(sections)
+        return all(
+            mine.conflicts(theirs) for mine in lectures[0] for theirs in lectures[1]
+        )
+
+    def get_score(self):
+        return self._score
+
+    def get_tags(self):
+        return self._tags
+
     def add_score(self, score):
         self._score += score
 
     def add_tag(self, tag, description):
+        if self._frozen:
+            raise AttributeError("a shared Course cannot be tagged, use an overlay")
         self._tags[tag] = description
 
+    def freeze(self):
+        """
+        make the course read-only so that it can be shared between requests
+        """
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError("a shared Course cannot be modified, use an overlay")
+        object.__setattr__(self, name, value)
+
     def __init__(
         self, course_code, course_data, SP_session, FA_session, SU_session, WI_session
     ):
+        self._frozen = False
         self._code = course_code
         self._subject = re.match(r"[A-Z]+", course_code).group(0)
         self._coursedata = course_data[self._subject][course_code]
         self._semester = self._coursedata["smst"]
+        self._offering = offering.encode(self._semester)
         self._score = 0
         self._tags = {}
 
@@ -345,6 +469,113 @@ class UnknownCourse(Course):
         )
 
 
+class CourseOverlay(object):
+    """
+    Per-user view of a shared Course. The score and tags live on the overlay,
+    every other attribute is read from the underlying Course.
+    """
+
+    def get_course(self):
+        return self._course
+
+    def get_score(self):
+        return self._score
+
+    def get_tags(self):
+        return self._tags
+
+    def add_score(self, score):
+        self._score += score
+
+    def add_tag(self, tag, description):
+        self._tags[tag] = description
+
+    def __getattr__(self, name):
+        return getattr(self._course, name)
+
+    def __init__(self, course):
+        self._course = course
+        self._score = 0
+        self._tags = {}
+
+
+class CourseCache(object):
+    """
+    Bounded LRU of shared, read-only Course objects keyed by the catalog
+    version and the course code. The whole cache is dropped as soon as a
+    lookup comes in with a new catalog version.
+    """
+
+    def get(self, course_code, data):
+        """
+        return the shared Course object of course_code
+
+        Parameter data: the catalog to build the course from
+        Precondition: data is a dataStore.Snapshot
+        """
+        version = data.get_version()
+        key = (version, course_code)
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            course = self._courses.get(key)
+            if course is not None:
+                self._courses.move_to_end(key)
+                self._hits += 1
+                return course
+            self._misses += 1
+
+        course = Course.create(
+            course_code, data.get_course_data(course_code), *data.get_sessions()
+        )
+        course.freeze()
+        with self._lock:
+            if version == self._version:
+                self._courses[key] = course
+                if len(self._courses) > self._max_size:
+                    self._courses.popitem(last=False)
+        return course
+
+    def invalidate(self):
+        """
+        drop every cached course, for example after the catalog reloads
+        """
+        with self._lock:
+            self._clear()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._courses),
+            }
+
+    def _clear(self):
+        self._courses.clear()
+        self._version = None
+
+    def __init__(self, max_size=8192):
+        self._max_size = max_size
+        self._courses = OrderedDict()
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+
+COURSE_CACHE = CourseCache()
+
+
+def get_course(course_code, data):
+    """
+    return the shared, read-only Course object of course_code in data. Wrap
+    it in a CourseOverlay to attach a score or tags.
+    """
+    return COURSE_CACHE.get(course_code, data)
+
+
 def contain_course(course_data, course_code):
     subject = get_subject(course_code)
     if subject in course_data and course_code in course_data[subject]:
@@ -444,15 +675,19 @@ def get_pre_coreq(course_data, course_code):
         return None
 
 
-def get_all_prereq(self):
+def get_all_prereq(course_code, data):
     """
     Return a list of Course objects in topological order.
 
-    For example, if self is CS3110 and its prereq is CS2110, the method
+    For example, if course_code is CS3110 and its prereq is CS2110, the method
     will check the prereq of CS2110 (which is CS1110) and return
     [CS1110, CS2110, CS3110]
+
+    Parameter data: the catalog to look the courses up in
+    Precondition: data is a dataStore.Snapshot
     """
-    pass
+    chain = prereqGraph.get_graph(data).get_chain(course_code)
+    return [get_course(code, data) for code in chain]
 
 
 def get_distribution(course_data, course_code):
@@ -574,19 +809,31 @@ def course_taken(course_data, courses_taken, course_code):
 
 
 def fulfilled_2dlist(courses_taken, requirement):
+    """
+    return a list of the courses taken that fulfill the most sublists of
+    requirement, each course fulfilling a different sublist, in the order of
+    courses_taken and without repeats
+
+    A course that is in several sublists is matched to the one that lets the
+    other courses fulfill the most sublists, whatever the order of
+    courses_taken.
+
+    Parameter courses_taken: courses that have already been taken
+    Precondition: a list of course codes
+    """
     if not requirement:
         return []
 
-    result = []
-    used_sublists = set()  # Track which sublists have been fulfilled
-
-    for course_code in courses_taken:
-        for i, sublist in enumerate(requirement):
-            if i not in used_sublists and course_code in sublist:
-                result.append(course_code)
-                used_sublists.add(i)  # Mark this sublist as fulfilled
-                break  # Stop checking other sublists for this course_code
-    return result
+    courses = sorted(set(courses_taken))
+    adjacency = [
+        [v for v, course_code in enumerate(courses) if course_code in sublist]
+        for sublist in requirement
+    ]
+    matched = matching.hopcroft_karp(adjacency, len(courses))
+    used = {courses[v] for v in matched if v != matching.UNMATCHED}
+    return [
+        course_code for course_code in dict.fromkeys(courses_taken) if course_code in used
+    ]
 
 
 # helper for check_eligibility
@@ -630,64 +877,3 @@ def is_mps(course_data, course_code):
             return True
     return False
 
-
-def semester_provided(self, next_semester):
-    """
-    Return a str showing which semester the course is likely provided
-
-
-    For case the schedule of next semester is released:
-
-    If the course is listed in the schedule, return "Provided in
-    {next_semester}".
-
-    If the course is not listed in the schedule, and it is not provided for
-    three years, return "Not provided for three years"
-
-    If the course is not listed in the schedule, while it's only provided in
-    the "opposite semester" in past three years, return "Likely provided in
-    {next_next_semester}". For example, if the next_semester is "SP25" and
-    the course is only provided in fall semesters in the last three years,
-    return "Likely provided in FA25"
-
-    If the course is not listed in the schedule, while it specifies that it
-    will be provided in the "opposite semester" in its course description,
-    return "Likely provided in {next_next_semester}"
-
-    Else, return "Not provided in {next_semester}"
-
-
-    For case the schedule of next semester is NOT yet released:
-
-    If the course is provided in every fall and spring semester in the past
-    three years, return "Likely provided in {next_semester}."
-
-    If the course is only provided in every fall semester in the past three
-    years, return "Likely provided in {next_fall_semester}." Same for spring.
-
-    If the course is not provided for three years, return "Not provided for
-    three years".
-
-    Else, return "Unknown".
-
-    Parameter next_semester: the next semester of current time
-    Precondition: a str in form of season + year, such as "SP25". Season
-    must be FA or SP.
-    """
-    pass
-
-
-def lec_time_overlap(self, another_course, semester):
-    """
-    Return True if there is an overlap in lecture time between self and
-    another_course in the given semester, return False otherwise
-
-    Parameter another_course: the course to compare with
-    Precondition: another_course is a Course object that is provided in the
-    given semester
-
-    Parameter semester: the semester of comparison
-    Precondition: semester is a Semester object that has both self and
-    another_course
-    """
-    pass
@@ -0,0 +1,175 @@
+import os
+import json
+import threading
+import time
+import catalogSnapshot
+from constants import *
+
+COLLEGE_DATA_PATH = "data/college_data/college.json"
+INSTRUCTOR_DATA_PATH = "data/instructor_data/instructor_rate.json"
+
+# optional file whose content is bumped by the data pipeline after a refresh
+VERSION_PATH = os.path.join(COURSE_DATA_ROUTE, "VERSION")
+
+DATA_FILES = dict(catalogSnapshot.CATALOG_FILES)
+DATA_FILES["college_data"] = COLLEGE_DATA_PATH
+DATA_FILES["instructor_data"] = INSTRUCTOR_DATA_PATH
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    return the DataStore shared by every module in this process
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = DataStore()
+    return _store
+
+
+class Snapshot(object):
+    """
+    All the course, session, college and instructor data loaded at one point
+    in time. A snapshot is never modified after it is created, so a request
+    that holds one keeps seeing consistent data even if the store reloads.
+    """
+
+    def get_version(self):
+        return self._version
+
+    def get_course_data(self, course_code):
+        """
+        return the half of the catalog (A-M or N-Z) that contains course_code
+        """
+        if course_code[0] in A_TO_M:
+            return self.course_data_am
+        return self.course_data_nz
+
+    def get_sessions(self):
+        return self.SP_session, self.FA_session, self.SU_session, self.WI_session
+
+    def derive(self, name, builder):
+        """
+        return builder(self), computed only once for this snapshot
+
+        Use this for indexes and other structures derived from the catalog:
+        they are rebuilt automatically when the store swaps in a new snapshot.
+
+        Parameter name: the key the derived structure is stored under
+        Precondition: name is a str
+
+        Parameter builder: the function that builds it from the snapshot
+        Precondition: builder is a function that takes a Snapshot
+        """
+        if name not in self._derived:
+            with self._derive_lock:
+                if name not in self._derived:
+                    self._derived[name] = builder(self)
+        return self._derived[name]
+
+    def __init__(self, version, data):
+        object.__setattr__(self, "_version", version)
+        object.__setattr__(self, "_derived", {})
+        object.__setattr__(self, "_derive_lock", threading.RLock())
+        for name in DATA_FILES:
+            object.__setattr__(self, name, data[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("a data snapshot cannot be modified")
+
+
+class DataStore(object):
+    """
+    Process-level holder of the current Snapshot.
+
+    The data files are parsed once when the store is created, using the
+    compiled catalog snapshot for the course and session data when it is up
+    to date. get() only stats the files (at most once every check_interval
+    seconds) and reloads when an mtime or the VERSION stamp changed. A
+    reload builds a complete new Snapshot before swapping it in, so readers
+    never see a partial one.
+    """
+
+    def get(self):
+        """
+        return the current Snapshot, reloading it first if the files changed
+        """
+        now = time.monotonic()
+        if now - self._checked_at >= self._check_interval:
+            self._checked_at = now
+            if self.stamp() != self._snapshot.get_version():
+                self.reload()
+        return self._snapshot
+
+    def reload(self, force=False):
+        """
+        parse every data file again and swap in the new Snapshot
+
+        Parameter force: reload even if the version stamp did not change
+        Precondition: force is a bool
+        """
+        with self._lock:
+            version = self.stamp()
+            if (
+                not force
+                and self._snapshot is not None
+                and version == self._snapshot.get_version()
+            ):
+                # another thread reloaded while we were waiting for the lock
+                return self._snapshot
+            data = {}
+            if self._snapshot_path:
+                catalog_files = {
+                    name: self._files[name] for name in catalogSnapshot.CATALOG_FILES
+                }
+                catalog = catalogSnapshot.load_snapshot(
+                    self._snapshot_path, catalog_files
+                )
+                if catalog:
+                    data.update(catalog)
+            for name, path in self._files.items():
+                if name in data:
+                    continue
+                with open(path, "r") as file:
+                    data[name] = json.load(file)
+            self._snapshot = Snapshot(version, data)
+            return self._snapshot
+
+    def stamp(self):
+        """
+        return a tuple that changes whenever one of the data files changes
+        """
+        mtimes = []
+        for path in self._files.values():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                # a catalog file may only be in the compiled snapshot
+                mtimes.append(None)
+                continue
+            mtimes.append((stat.st_mtime_ns, stat.st_size))
+        version_text = None
+        if os.path.exists(self._version_path):
+            with open(self._version_path, "r") as file:
+                version_text = file.read().strip()
+        return (version_text, tuple(mtimes))
+
+    def __init__(
+        self,
+        files=DATA_FILES,
+        version_path=VERSION_PATH,
+        snapshot_path=catalogSnapshot.SNAPSHOT_PATH,
+        check_interval=1.0,
+    ):
+        self._files = dict(files)
+        self._version_path = version_path
+        self._snapshot_path = snapshot_path
+        self._check_interval = check_interval
+        self._checked_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self.reload(force=True)
@@ -0,0 +1,266 @@
+import threading
+from collections import OrderedDict
+import course
+import prereqGraph
+import special
+
+
+class EligibilityEngine(object):
+    """
+    The prerequisite clauses of every course in one catalog snapshot, with a
+    reverse index from each course to the clauses that mention it.
+
+    A course is eligible under the same rules as course.check_eligibility:
+    every prerequisite clause and every "prerequisite or corequisite" clause
+    has a course that was taken, and every corequisite group has a course
+    whose own prerequisites are met. Special courses are still decided by
+    special.special_eligibility.
+
+    Clause k of a course is bit k of its mask: the prerequisite clauses come
+    first, then the prerequisite-or-corequisite clauses. A user's state only
+    stores the masks, so taking or dropping a course touches the courses
+    whose clauses mention it, not the whole catalog.
+    """
+
+    def get_clauses(self, course_code):
+        """
+        return the list of clauses (frozensets of course codes) of a course
+        """
+        return self._clauses.get(course_code, [])
+
+    def get_full_mask(self, course_code):
+        return self._full.get(course_code, 0)
+
+    def get_prereq_mask(self, course_code):
+        """
+        return the mask of the prerequisite clauses listed on the course itself,
+        which decide whether it can be taken as a corequisite. Prerequisites
+        borrowed from a combined course are not part of it.
+        """
+        return self._prereq_full.get(course_code, 0)
+
+    def get_coreq_groups(self, course_code):
+        return self._coreq_groups.get(course_code, [])
+
+    def get_mentions(self, course_code):
+        """
+        return a list of (course, bit) for every clause that mentions course_code
+        """
+        return self._mentions.get(course_code, [])
+
+    def get_coreq_dependents(self, course_code):
+        """
+        return the courses that have course_code in one of their corequisite
+        groups. Their eligibility depends on the prerequisites of course_code.
+        """
+        return self._coreq_dependents.get(course_code, ())
+
+    def is_special(self, course_code):
+        return course_code in self._special
+
+    def new_state(self, courses_taken):
+        return EligibilityState(self, courses_taken)
+
+    def _add_course(self, course_data, course_code):
+        if course.course_is_special(course_code):
+            self._special.add(course_code)
+        # parse_requisites reads both the short keys of the roster pipeline
+        # and the old "Prerequisites" keys
+        course_info = course_data[course.get_subject(course_code)][course_code]
+        prereq, coreq, preco = prereqGraph.parse_requisites(course_info)
+        combined = course_info.get("Combined Course")
+
+        clauses = [frozenset(clause) for clause in prereq]
+        self._prereq_full[course_code] = (1 << len(clauses)) - 1
+        if combined and (not prereq) and course.get_level(course_code) > 4:
+            if course.contain_course(course_data, combined[0]):
+                combined_subject = course.get_subject(combined[0])
+                combined_info = course_data[combined_subject][combined[0]]
+                prereq = prereqGraph.parse_requisites(combined_info)[0]
+                clauses = [frozenset(clause) for clause in prereq]
+        clauses += [frozenset(clause) for clause in preco]
+        self._clauses[course_code] = clauses
+        self._full[course_code] = (1 << len(clauses)) - 1
+        for bit, clause in enumerate(clauses):
+            for mentioned in clause:
+                self._mentions.setdefault(mentioned, []).append(
+                    (course_code, 1 << bit)
+                )
+
+        groups = [group for group in coreq if group]
+        if groups:
+            self._coreq_groups[course_code] = groups
+            for group in groups:
+                for coreq_course in group:
+                    self._coreq_dependents.setdefault(coreq_course, set()).add(
+                        course_code
+                    )
+
+    def __init__(self, data):
+        """
+        Parameter data: the catalog to compile
+        Precondition: data is a dataStore.Snapshot
+        """
+        self._clauses = {}
+        self._full = {}
+        self._prereq_full = {}
+        self._coreq_groups = {}
+        self._mentions = {}
+        self._coreq_dependents = {}
+        self._special = set()
+        for course_data in (data.course_data_am, data.course_data_nz):
+            for subject in course_data:
+                for course_code in course_data[subject]:
+                    self._add_course(course_data, course_code)
+
+
+class EligibilityState(object):
+    """
+    The satisfied-clause masks of one user. Eligibility is computed on
+    demand and cached until a change to courses_taken touches the course.
+    """
+
+    def get_courses_taken(self):
+        return self._taken
+
+    def is_eligible(self, course_code):
+        """
+        return true if the course is eligible to take
+        """
+        if self._engine.is_special(course_code):
+            return special.special_eligibility(sorted(self._taken), course_code)[0]
+        eligible = self._eligible.get(course_code)
+        if eligible is None:
+            eligible = self._compute(course_code)
+            self._eligible[course_code] = eligible
+        return eligible
+
+    def prereq_met(self, course_code):
+        """
+        return true if every prerequisite clause of the course is satisfied
+        """
+        prereq_mask = self._engine.get_prereq_mask(course_code)
+        return self._masks.get(course_code, 0) & prereq_mask == prereq_mask
+
+    def missing(self, course_code):
+        """
+        return a 2d list of the clauses of the course that are not satisfied
+        """
+        mask = self._masks.get(course_code, 0)
+        result = []
+        for bit, clause in enumerate(self._engine.get_clauses(course_code)):
+            if not mask & (1 << bit):
+                result.append(sorted(clause))
+        return result
+
+    def add(self, course_code):
+        """
+        mark course_code as taken and return a dictionary that maps every
+        course whose eligibility changed to its new eligibility
+        """
+        if course_code in self._taken:
+            return {}
+        self._taken.add(course_code)
+        affected = set()
+        for target, bit in self._engine.get_mentions(course_code):
+            self._masks[target] = self._masks.get(target, 0) | bit
+            affected.add(target)
+        return self._refresh(affected)
+
+    def remove(self, course_code):
+        """
+        mark course_code as not taken and return a dictionary that maps every
+        course whose eligibility changed to its new eligibility
+        """
+        if course_code not in self._taken:
+            return {}
+        self._taken.discard(course_code)
+        affected = set()
+        for target, bit in self._engine.get_mentions(course_code):
+            clause = self._engine.get_clauses(target)[bit.bit_length() - 1]
+            if clause.isdisjoint(self._taken):
+                self._masks[target] = self._masks.get(target, 0) & ~bit
+                affected.add(target)
+        return self._refresh(affected)
+
+    def _compute(self, course_code):
+        engine = self._engine
+        full = engine.get_full_mask(course_code)
+        if self._masks.get(course_code, 0) & full != full:
+            return False
+        for group in engine.get_coreq_groups(course_code):
+            if not any(self.prereq_met(coreq_course) for coreq_course in group):
+                return False
+        return True
+
+    def _refresh(self, affected):
+        # a change in the prerequisites of a course also changes the
+        # eligibility of the courses that list it as a corequisite
+        for course_code in list(affected):
+            affected.update(self._engine.get_coreq_dependents(course_code))
+        changed = {}
+        for course_code in affected:
+            before = self._eligible.pop(course_code, None)
+            if before is None:
+                continue
+            after = self.is_eligible(course_code)
+            if after != before:
+                changed[course_code] = after
+        return changed
+
+    def __init__(self, engine, courses_taken):
+        self._engine = engine
+        self._taken = set()
+        self._masks = {}
+        self._eligible = {}
+        for course_code in courses_taken:
+            self.add(course_code)
+
+
+def get_engine(data):
+    """
+    return the EligibilityEngine of a catalog snapshot, building it on first use
+    """
+    return data.derive("eligibilityEngine", EligibilityEngine)
+
+
+class StateCache(object):
+    """
+    Bounded LRU of EligibilityState objects keyed by a user session id. A
+    state is rebuilt when the catalog version or the courses taken stored in
+    the session no longer match it.
+    """
+
+    def get(self, session_id, courses_taken, data):
+        version = data.get_version()
+        with self._lock:
+            entry = self._states.get(session_id)
+            if entry is not None:
+                self._states.move_to_end(session_id)
+        if entry is not None:
+            entry_version, state = entry
+            if entry_version == version and state.get_courses_taken() == set(
+                courses_taken
+            ):
+                return state
+        state = get_engine(data).new_state(courses_taken)
+        with self._lock:
+            self._states[session_id] = (version, state)
+            if len(self._states) > self._max_size:
+                self._states.popitem(last=False)
+        return state
+
+    def __init__(self, max_size=4096):
+        self._max_size = max_size
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+
+STATE_CACHE = StateCache()
+
+
+def get_state(session_id, courses_taken, data):
+    """
+    return the EligibilityState of a user session
+    """
+    return STATE_CACHE.get(session_id, courses_taken, data)
@@ -0,0 +1,701 @@
+import math
+import re
+import time
+import catalogIndex
+import course
+import majorFile
+import offering
+import prereqGraph
+from constants import *
+
+DEFAULT_CREDIT_CAP = 18
+
+# credits of a course whose credits are unknown, and of an elective that any
+# course can fill
+DEFAULT_CREDITS = 3
+
+# the longest plan searched, six years of fall and spring semesters
+MAX_SEMESTERS = 12
+
+# seconds the search for the fewest semesters may take before settling for a
+# plan that may not be the shortest, so an unlucky combination cannot stall
+# a request
+DEFAULT_BUDGET = 0.15
+
+PLAN_SEASONS = offering.REGULAR_SEASONS
+
+# the semesters a plan can start with
+START_PATTERN = re.compile(r"(FA|SP)[0-9]{2}")
+
+
+class Slot(object):
+    """
+    One course a major needs: any one of candidates, or any course at all
+    when candidates is None.
+    """
+
+    def __init__(self, major, name, candidates):
+        self.major = major
+        self.name = name
+        self.candidates = candidates
+
+
+def parse_requirements(major, requirements, index):
+    """
+    return the list of Slots of the requirement groups of a major
+
+    The groups are either a college of data/major_data/*.json, that maps each
+    name to a list of lists of alternatives or to a dictionary with a number
+    of courses to take, or a list of requirement documents from major.py,
+    with a number and either courseGrps or courses.
+
+    Parameter major: the subject of the major, such as "CS"
+    Precondition: major is a str
+
+    Parameter index: the catalog
+    Precondition: index is a catalogIndex.CatalogIndex
+    """
+    slots = []
+    if isinstance(requirements, dict):
+        groups = requirements.items()
+    else:
+        groups = [(req.get("name", req.get("id")), req) for req in requirements]
+
+    for name, group in groups:
+        if isinstance(group, list):
+            for alternatives in group:
+                if isinstance(alternatives, str):
+                    alternatives = [alternatives]
+                slots.append(Slot(major, name, majorFile.get_codes(alternatives)))
+            continue
+        if not isinstance(group, dict) or not group.get("number"):
+            continue
+        number = group["number"]
+        if "courseGrps" in group:
+            course_groups = [
+                majorFile.get_codes(grp["courses"]) for grp in group["courseGrps"]
+            ]
+            if number >= len(course_groups):
+                for candidates in course_groups:
+                    slots.append(Slot(major, name, candidates))
+                continue
+            candidates = [code for grp in course_groups for code in grp]
+        elif "courses" in group:
+            candidates = majorFile.get_codes(group["courses"])
+        else:
+            candidates = select_candidates(major, group, index)
+        for _ in range(number):
+            slots.append(Slot(major, name, candidates))
+    return slots
+
+
+def select_candidates(major, group, index):
+    """
+    return the courses of a level or numbering requirement such as "CS 4000+"
+    or "CS4XX1", or None if any course is accepted
+    """
+    included = majorFile.get_codes(group.get("included", []))
+    excluded = group.get("excluded", [])
+    requirement_format = group.get("format", "level")
+    if "X" in requirement_format:
+        pattern = re.compile(requirement_format.replace("X", "[0-9]"))
+        subject = re.match(r"[A-Z]+", requirement_format).group(0)
+        level = int(requirement_format[len(subject)])
+        matched = [
+            code
+            for code in index.select(subject, level, level, min_credit=0)
+            if pattern.fullmatch(code) and code not in excluded
+        ]
+        return matched + [code for code in included if code not in matched]
+    subject = group.get("subject", major)
+    if requirement_format != "level" or subject.startswith("any"):
+        return None
+    return index.select(
+        subject,
+        group.get("min_level", 1),
+        min_credit=group.get("min_credit", 0),
+        excluded=excluded,
+        included=included,
+    )
+
+
+class GraduationPlanner(object):
+    """
+    Semester by semester plan of the courses left for one or more majors.
+
+    Every slot of a major is filled by a course taken already or by the
+    candidate that can be taken the earliest. Prerequisites that are not
+    met are added the same way, one alternative per clause. The earliest
+    semester of a course follows the longest prerequisite chain under it,
+    skipping semesters of the wrong season, so the last of them, and the
+    credits left over the credit cap, bound the number of semesters from
+    below.
+
+    The plan is then searched with that many semesters, then one more and
+    so on. A state is the semester and the bitmask of the planned courses
+    already done. Every semester takes a maximal set of the courses that
+    can be taken, the ones that must be taken by their latest semester
+    first; a set that is not maximal is never better, since taking a course
+    earlier only frees later semesters. States that failed are memoized.
+    """
+
+    def plan(self, budget=DEFAULT_BUDGET):
+        """
+        return a dictionary with the lower bound on the number of semesters
+        left, the plan, the course used for every requirement, the
+        requirements that no course can satisfy, and whether the plan is
+        known to have the fewest semesters
+
+        Parameter budget: seconds the search may take before it settles for
+        a greedy plan
+        Precondition: budget is a positive number
+        """
+        deadline = time.perf_counter() + budget
+        semesters = None
+        # every number of semesters below bound has no plan
+        bound = MAX_SEMESTERS
+        for count in range(self.min_semesters, MAX_SEMESTERS + 1):
+            semesters, complete = self._search(count, deadline)
+            if semesters is not None:
+                bound = count
+                break
+            if not complete:
+                bound = count
+                semesters = self._greedy()
+                break
+        return {
+            "min_semesters": self.min_semesters,
+            "semesters": [
+                {
+                    "semester": self._semesters[term],
+                    "courses": [self._codes[i] for i in chosen],
+                    "credits": sum(self._credits[i] for i in chosen),
+                }
+                for term, chosen in enumerate(semesters or [])
+            ],
+            "requirements": self.requirements,
+            "unmet": self.unmet,
+            "credits": sum(self._credits),
+            "optimal": semesters is not None and len(semesters) <= bound,
+        }
+
+    def _search(self, count, deadline):
+        """
+        return (the list of the sets of planned courses of count semesters or
+        None if there is none, False if the deadline passed first)
+        """
+        latest = self._get_latest(count)
+        if latest is None:
+            return None, True
+        full = (1 << len(self._codes)) - 1
+        # the first semester from which a set of done courses failed; starting
+        # later can only be worse, since a semester may be left empty
+        failed = {}
+        chosen_sets = []
+        timed_out = [False]
+        order = sorted(
+            range(len(self._codes)), key=lambda i: (latest[i], -self._credits[i])
+        )
+
+        def search(term, done):
+            if done == full:
+                return True
+            if term == count or failed.get(done, count) <= term:
+                return False
+            if deadline is not None and time.perf_counter() > deadline:
+                timed_out[0] = True
+                return False
+            left = [i for i in order if not done >> i & 1]
+            if not self._can_fit(term, left, latest) or not self._can_finish(
+                term, done, latest
+            ):
+                failed[done] = term
+                return False
+            season = self._seasons[term % 2]
+            available = [
+                i
+                for i in left
+                if season in self._offered[i]
+                and self._before[i] & done == self._before[i]
+            ]
+            for chosen in self._packings(available, latest, term, done):
+                chosen_sets.append(chosen)
+                mask = 0
+                for i in chosen:
+                    mask |= 1 << i
+                if search(term + 1, done | mask):
+                    return True
+                chosen_sets.pop()
+                if timed_out[0]:
+                    return False
+            failed[done] = term
+            return False
+
+        if search(0, 0):
+            return chosen_sets, True
+        return None, not timed_out[0]
+
+    def _greedy(self):
+        """
+        return the list of the sets of planned courses of a plan that takes,
+        every semester, the courses that can be taken in priority order while
+        they fit the credit cap, or None if that needs more than MAX_SEMESTERS
+        semesters
+
+        It is one pass over the courses per semester, so plan stays within
+        its budget when the search runs out of it.
+        """
+        latest = self._get_latest(MAX_SEMESTERS)
+        if latest is None:
+            return None
+        full = (1 << len(self._codes)) - 1
+        order = sorted(
+            range(len(self._codes)), key=lambda i: (latest[i], -self._credits[i])
+        )
+        done = 0
+        semesters = []
+        for term in range(MAX_SEMESTERS):
+            if done == full:
+                break
+            season = self._seasons[term % 2]
+            chosen = []
+            credits = 0
+            for i in order:
+                if (
+                    not done >> i & 1
+                    and season in self._offered[i]
+                    and self._before[i] & done == self._before[i]
+                    and credits + self._credits[i] <= self.cap
+                ):
+                    chosen.append(i)
+                    credits += self._credits[i]
+            chosen = self._keep_met_coreqs(chosen, done)
+            for i in chosen:
+                done |= 1 << i
+            semesters.append(chosen)
+        return semesters if done == full else None
+
+    def _can_fit(self, term, left, latest):
+        """
+        return true if the credits of the courses left that are due by each
+        semester fit the semesters from term until then, and so do the credits
+        of the ones offered in one season only in the semesters of that season
+
+        Parameter left: the courses left
+        Precondition: left is a list of indexes sorted by latest semester
+        """
+        totals = {}
+        for i in left:
+            deadline = latest[i]
+            for season in (None,) + tuple(self._offered[i]) * (
+                len(self._offered[i]) == 1
+            ):
+                totals[season] = totals.get(season, 0) + self._credits[i]
+                if season is None:
+                    semesters = deadline - term + 1
+                else:
+                    first = term if self._seasons[term % 2] == season else term + 1
+                    semesters = max(0, (deadline - first) // 2 + 1)
+                if totals[season] > self.cap * semesters:
+                    return False
+        return True
+
+    def _can_finish(self, term, done, latest):
+        """
+        return true if every course left can still be taken by its latest
+        semester, following the chains of the courses left from term
+        """
+        reach = [term] * len(self._codes)
+        for i in range(len(self._codes)):
+            if done >> i & 1:
+                continue
+            earliest = term
+            for j in self._requires_before[i]:
+                if not done >> j & 1:
+                    earliest = max(earliest, reach[j] + 1)
+            for j in self._requires_with[i]:
+                if not done >> j & 1:
+                    earliest = max(earliest, reach[j])
+            # every planned course is offered in a season of the plan
+            if self._seasons[earliest % 2] not in self._offered[i]:
+                earliest += 1
+            if earliest > latest[i]:
+                return False
+            reach[i] = earliest
+        return True
+
+    def _packings(self, available, latest, term, done):
+        """
+        yield the maximal sets of available courses within the credit cap that
+        take every course whose latest semester is term, in priority order
+        """
+        chosen = []
+        # the credits of available[position:]
+        rest = [0] * (len(available) + 1)
+        for position in range(len(available) - 1, -1, -1):
+            rest[position] = rest[position + 1] + self._credits[available[position]]
+
+        def pack(position, credits, smallest_left_out):
+            # a course left out that fits whatever else is taken makes every
+            # set of this branch not maximal
+            if self.cap - credits - rest[position] >= smallest_left_out:
+                return
+            if position == len(available):
+                result = self._drop_unmet_coreqs(chosen, done, latest, term)
+                if result is None:
+                    return
+                # skip sets another course still fits in; they are never better
+                left = self.cap - sum(self._credits[i] for i in result)
+                if any(
+                    i not in result
+                    and self._credits[i] <= left
+                    and self._with[i] & done == self._with[i]
+                    for i in available
+                ):
+                    return
+                yield result
+                return
+            i = available[position]
+            if credits + self._credits[i] <= self.cap:
+                chosen.append(i)
+                yield from pack(
+                    position + 1, credits + self._credits[i], smallest_left_out
+                )
+                chosen.pop()
+            # leaving a course out is only maximal if the rest does not all fit
+            fits = credits + rest[position] <= self.cap
+            with_done = self._with[i] & done == self._with[i]
+            if latest[i] > term and not (fits and with_done):
+                if with_done:
+                    smallest_left_out = min(smallest_left_out, self._credits[i])
+                yield from pack(position + 1, credits, smallest_left_out)
+
+        yield from pack(0, 0, math.inf)
+
+    def _drop_unmet_coreqs(self, chosen, done, latest, term):
+        """
+        return chosen without the courses whose corequisites are neither done
+        nor in chosen, or None if that drops a course due in term
+        """
+        result = self._keep_met_coreqs(chosen, done)
+        if any(latest[i] == term for i in chosen if i not in result):
+            return None
+        return result
+
+    def _keep_met_coreqs(self, chosen, done):
+        """
+        return chosen without the courses whose corequisites are neither done
+        nor in chosen
+        """
+        result = list(chosen)
+        changed = True
+        while changed:
+            mask = done
+            for i in result:
+                mask |= 1 << i
+            kept = [i for i in result if self._with[i] & mask == self._with[i]]
+            changed = len(kept) != len(result)
+            result = kept
+        return result
+
+    def _get_latest(self, count):
+        """
+        return the latest semester of every planned course with count
+        semesters, or None if a course cannot fit
+        """
+        latest = [count - 1] * len(self._codes)
+        # dependents come after their prerequisites
+        for i in reversed(range(len(self._codes))):
+            term = latest[i]
+            while term >= 0 and self._seasons[term % 2] not in self._offered[i]:
+                term -= 1
+            if term < self._earliest[i]:
+                return None
+            latest[i] = term
+            for j in self._requires_before[i]:
+                latest[j] = min(latest[j], term - 1)
+            for j in self._requires_with[i]:
+                latest[j] = min(latest[j], term)
+        return latest
+
+    def _get_info(self, course_code):
+        course_data = self._data.get_course_data(course_code)
+        return course_data.get(course.get_subject(course_code), {}).get(course_code)
+
+    def _get_offered(self, course_code):
+        """
+        return the set of seasons of PLAN_SEASONS course_code is likely
+        offered in, from its recent offering history; a course without one
+        may be offered in any season
+        """
+        return self._offering.get_seasons(course_code) or set(PLAN_SEASONS)
+
+    def _get_clauses(self, course_code):
+        """
+        return the (clauses before, clauses with) of course_code: the clauses
+        that must be done in an earlier semester, and the ones that may be
+        done in the same semester
+        """
+        course_info = self._get_info(course_code)
+        if not course_info:
+            return [], []
+        prereq, coreq, preco = prereqGraph.parse_requisites(course_info)
+        return prereq, coreq + preco
+
+    def _first_offered(self, offered, term):
+        """
+        return the first semester from term of a season in offered, or None if
+        neither season of the plan is in offered
+        """
+        for first in (term, term + 1):
+            if self._seasons[first % 2] in offered:
+                return first
+        return None
+
+    def _estimate(self, course_code):
+        """
+        return the earliest semester course_code can be taken, through the
+        alternatives of every clause that can be taken the earliest
+        """
+        if course_code in self.courses_taken:
+            return -1
+        term = self._estimates.get(course_code)
+        if term is not None:
+            return term
+        # a cycle in the catalog is broken at the course that closes it
+        self._estimates[course_code] = 0
+        before, together = self._get_clauses(course_code)
+        term = 0
+        for clause in before:
+            if clause:
+                term = max(term, min(self._estimate(code) for code in clause) + 1)
+        for clause in together:
+            if clause:
+                term = max(term, min(self._estimate(code) for code in clause))
+        if term < math.inf:
+            term = self._first_offered(self._get_offered(course_code), term)
+        if term is None:
+            term = math.inf
+        self._estimates[course_code] = term
+        return term
+
+    def _rank(self, course_code):
+        # chosen courses count for every major, then the earliest, then fewest credits
+        return (
+            course_code not in self._chosen,
+            self._estimate(course_code),
+            self._get_credits(course_code),
+            course_code,
+        )
+
+    def _get_credits(self, course_code):
+        credits = self._index.get_max_credit(course_code) or DEFAULT_CREDITS
+        return min(credits, self.cap)
+
+    def _fill_slots(self, slots):
+        """
+        assign a course to every slot, a course taken already when possible,
+        and record the chosen courses that are not taken
+        """
+        by_major = {}
+        for slot in slots:
+            by_major.setdefault(slot.major, []).append(slot)
+        for major, major_slots in by_major.items():
+            used = set()
+            requirements = self.requirements.setdefault(major, {})
+            free = []
+            # the most constrained slots are filled first
+            major_slots.sort(
+                key=lambda slot: (
+                    math.inf if slot.candidates is None else len(slot.candidates)
+                )
+            )
+            for slot in major_slots:
+                if slot.candidates is None:
+                    free.append(slot)
+                    continue
+                taken = [
+                    c
+                    for c in slot.candidates
+                    if c in self.courses_taken and c not in used
+                ]
+                if taken:
+                    code = taken[0]
+                else:
+                    left = [c for c in slot.candidates if c not in used]
+                    if not left:
+                        self.unmet.append({"major": major, "requirement": slot.name})
+                        continue
+                    code = min(left, key=self._rank)
+                    self._chosen.add(code)
+                used.add(code)
+                requirements.setdefault(slot.name, []).append(code)
+            # any course taken and not used yet fills an open elective
+            spare = sorted(c for c in self.courses_taken if c not in used)
+            for slot in free:
+                if spare:
+                    code = spare.pop(0)
+                else:
+                    number = len(requirements.get(slot.name, [])) + 1
+                    code = f"{major} {slot.name} {number}"
+                    self._placeholders.add(code)
+                    self._chosen.add(code)
+                used.add(code)
+                requirements.setdefault(slot.name, []).append(code)
+
+    def _add_prereqs(self):
+        """
+        add the courses needed by the clauses of chosen courses that are not
+        met, and return the list of planned courses in topological order
+        """
+        order = []
+        visited = set()
+
+        def visit(course_code):
+            if course_code in visited or course_code in self.courses_taken:
+                return
+            visited.add(course_code)
+            self._requires[course_code] = []
+            if course_code not in self._placeholders:
+                before, together = self._get_clauses(course_code)
+                for clause in before + together:
+                    if not clause or any(c in self.courses_taken for c in clause):
+                        continue
+                    planned = [c for c in clause if c in self._chosen]
+                    required = planned[0] if planned else min(clause, key=self._rank)
+                    self._chosen.add(required)
+                    self._requires[course_code].append(required)
+                    visit(required)
+            order.append(course_code)
+
+        for course_code in sorted(self._chosen):
+            visit(course_code)
+        return order
+
+    def _drop_unplannable(self, order):
+        """
+        return order without the courses offered in neither season of the
+        plan and the courses that require them, and record the requirements
+        they filled as unmet
+        """
+        dropped = set()
+        for course_code in order:
+            if any(required in dropped for required in self._requires[course_code]):
+                dropped.add(course_code)
+            elif course_code not in self._placeholders:
+                if self._first_offered(self._get_offered(course_code), 0) is None:
+                    dropped.add(course_code)
+        if not dropped:
+            return order
+        for major, requirements in self.requirements.items():
+            for name, codes in requirements.items():
+                for course_code in codes:
+                    if course_code in dropped:
+                        self.unmet.append({"major": major, "requirement": name})
+                codes[:] = [code for code in codes if code not in dropped]
+        return [course_code for course_code in order if course_code not in dropped]
+
+    def __init__(
+        self,
+        majors,
+        courses_taken,
+        data,
+        start=None,
+        cap=DEFAULT_CREDIT_CAP,
+    ):
+        """
+        Parameter majors: the requirement groups of every major, by subject
+        Precondition: majors is a dictionary such as {"CS": requirements};
+        see parse_requirements
+
+        Parameter courses_taken: the courses taken already
+        Precondition: courses_taken is a list of course codes
+
+        Parameter data: the catalog
+        Precondition: data is a dataStore.Snapshot
+
+        Parameter start: the first semester to plan, the semester after
+        LAST_SEMESTER by default
+        Precondition: start is a str such as "FA25" of a fall or spring
+
+        Parameter cap: the most credits of one semester
+        Precondition: cap is a positive int
+        """
+        self._data = data
+        self._index = catalogIndex.get_index(data)
+        self._offering = offering.get_index(data)
+        self.courses_taken = set(courses_taken)
+        self.cap = cap
+        start = start or offering.next_semester(LAST_SEMESTER)
+        self._seasons = [start[:2], "SP" if start[:2] == "FA" else "FA"]
+        self._semesters = [start]
+        for _ in range(MAX_SEMESTERS - 1):
+            self._semesters.append(offering.next_semester(self._semesters[-1]))
+        self._estimates = {}
+        self._chosen = set()
+        self._placeholders = set()
+        self._requires = {}
+        self.requirements = {}
+        self.unmet = []
+
+        slots = []
+        for major, requirements in majors.items():
+            slots.extend(parse_requirements(major, requirements, self._index))
+        self._fill_slots(slots)
+
+        # the planned courses are bits of a mask, numbered in topological order
+        self._codes = self._drop_unplannable(self._add_prereqs())
+        ids = {code: i for i, code in enumerate(self._codes)}
+        self._credits = []
+        self._offered = []
+        self._before = []
+        self._with = []
+        self._earliest = []
+        for i, code in enumerate(self._codes):
+            if code in self._placeholders:
+                self._credits.append(DEFAULT_CREDITS)
+                self._offered.append(set(PLAN_SEASONS))
+            else:
+                self._credits.append(self._get_credits(code))
+                self._offered.append(self._get_offered(code))
+            before = []
+            if code not in self._placeholders:
+                before = self._get_clauses(code)[0]
+            before_mask = 0
+            with_mask = 0
+            for required in self._requires[code]:
+                if any(required in clause for clause in before):
+                    before_mask |= 1 << ids[required]
+                else:
+                    with_mask |= 1 << ids[required]
+            # a cycle in the catalog is broken at the course that closes it
+            self._before.append(before_mask & ((1 << i) - 1))
+            self._with.append(with_mask & ((1 << i) - 1))
+        self._requires_before = [
+            [j for j in range(i) if self._before[i] >> j & 1]
+            for i in range(len(self._codes))
+        ]
+        self._requires_with = [
+            [j for j in range(i) if self._with[i] >> j & 1]
+            for i in range(len(self._codes))
+        ]
+
+        # the earliest semester of every planned course, over the chosen chain
+        for i, code in enumerate(self._codes):
+            term = 0
+            for j in self._requires_before[i]:
+                term = max(term, self._earliest[j] + 1)
+            for j in self._requires_with[i]:
+                term = max(term, self._earliest[j])
+            self._earliest.append(self._first_offered(self._offered[i], term))
+
+        chain = max(self._earliest) + 1 if self._earliest else 0
+        credits = math.ceil(sum(self._credits) / cap)
+        self.min_semesters = max(chain, credits)
+
+
+def plan_graduation(majors, courses_taken, data, start=None, cap=DEFAULT_CREDIT_CAP):
+    """
+    return the graduation plan of GraduationPlanner.plan for majors
+    """
+    return GraduationPlanner(majors, courses_taken, data, start, cap).plan()
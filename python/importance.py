@@ -2,54 +2,144 @@
 Author: Raymond Xu
 Date: January 7, 2025
 """
-import level
+import numpy as np
 import course
+import eligibility
 import minorImportance
-
-def rank_importance(major_data,course_data,courses,courses_taken,college,
+import requirementSpec
+
+TAKEN_SCORE = -20000
+ELIGIBLE_SCORE = 10000
+
+# the A&S distribution categories and their tag descriptions
+CAS_DISTRIBUTIONS = [
+    ("ALC-AS","This can be counted as an Arts, Literature, and Culture course in A&S."),
+    ("BIO-AS","This can be counted as a Biological Sciences course in A&S."),
+    ("ETM-AS","This can be counted as a Ethics and Mind course in A&S."),
+    ("GLC-AS","This can be counted as a Global Citizenship course in A&S."),
+    ("HST-AS","This can be counted as a Historical Analysis course in A&S."),
+    ("PHS-AS","This can be counted as a Physical Sciences course in A&S."),
+    ("SCD-AS","This can be counted as a Social Difference course in A&S."),
+    ("SSC-AS","This can be counted as a Social Sciences course in A&S."),
+    ("SDS-AS","This can be counted as a Statistics and Data Science course in A&S."),
+    ("SMR-AS","This can be counted as a Symbolic and Mathematical Reasoning course in A&S."),
+]
+
+def rank_importance(major_data,data,courses,courses_taken,college,
 major_displayed,major_left=None,major_l_data=None,minor1=None,minor1_data=None,minor2=None,minor2_data=None,minor3=None,minor3_data=None):
     """
     return a sorted dictionary of courses based on the courses taken
+
+    Parameter data: the catalog to rank from
+    Precondition: data is a dataStore.Snapshot
+    """
+    return rank_importance_batch(major_data,data,courses,courses_taken,
+    college,major_displayed,major_left,major_l_data,minor1,minor1_data,minor2,
+    minor2_data,minor3,minor3_data)
+
+def rank_importance_batch(major_data,data,courses,courses_taken,college,
+major_displayed,major_left=None,major_l_data=None,minor1=None,minor1_data=None,minor2=None,minor2_data=None,minor3=None,minor3_data=None):
+    """
+    return the same sorted dictionary as ranking each course with
+    individual_rank, computed for the whole candidate list at once
+
+    Every feature (taken, eligible, each distribution category, each major
+    and minor requirement) becomes one column of a count matrix, so the
+    elective lists are computed once per call instead of once per course.
+    The scores are the matrix times the weight vector.
     """
-    result = {}
-    for course in courses:
-        score,tags = individual_rank(major_data,course_data,course,courses_taken,
-        college,major_displayed,major_left,major_l_data,minor1,minor1_data,
-        minor2,minor2_data,minor3,minor3_data)
-        result[course] = (score,tags)
-    ranked_courses = dict(sorted(result.items(),key=lambda item: item[1][0],
-    reverse=True))
+    candidates = list(dict.fromkeys(courses))
+    if not candidates:
+        return {}
+
+    # (features, whether their tags are shown) in the order individual_rank
+    # combines the tags
+    feature_lists = [(college_features(data,college,candidates),True),
+    (major_features(data,major_data,college,major_displayed),False)]
+    if major_left:
+        feature_lists.append((major_features(data,major_l_data,college,
+        major_left),True))
+    if minor1:
+        feature_lists.append((minorImportance.minor_features(data,
+        minor1_data,college,minor1),True))
+    features = []
+    shown = []
+    for feature_list,show_tags in feature_lists:
+        features.extend(feature_list)
+        shown.extend([show_tags] * len(feature_list))
+
+    matrix = np.zeros((len(candidates),len(features) + 2),dtype=np.int64)
+    weights = np.array([TAKEN_SCORE,ELIGIBLE_SCORE] +
+    [feature[2] for feature in features],dtype=np.int64)
+    matrix[:,0],matrix[:,1] = status_columns(data,candidates,courses_taken)
+    for column,feature in enumerate(features,2):
+        counts = feature[3]
+        matrix[:,column] = [counts.get(course_code,0) for course_code in candidates]
+
+    scores = matrix @ weights
+    # a stable sort keeps the candidate order among equal scores, like sorted()
+    order = np.argsort(-scores,kind="stable")
+    tagged = matrix[:,2:] > 0
+    ranked_courses = {}
+    for row in order:
+        tags = {}
+        for column in np.flatnonzero(tagged[row]):
+            if shown[column]:
+                tags[features[column][0]] = features[column][1]
+        ranked_courses[candidates[row]] = (int(scores[row]),tags)
     return ranked_courses
 
+# helper for rank_importance_batch
+def status_columns(data,candidates,courses_taken):
+    """
+    return two lists with whether each candidate was taken (itself or a
+    combined course) and whether it is eligible to take
+
+    Eligibility comes from one EligibilityState of the courses taken, so each
+    candidate is a check of its clause masks instead of a scan of its
+    prerequisites.
+    """
+    taken = set(courses_taken)
+    state = eligibility.get_engine(data).new_state(taken)
+    taken_column = []
+    for course_code in candidates:
+        courses = data.get_course_data(course_code).get(
+        course.get_subject(course_code),{})
+        combined = courses.get(course_code,{}).get("Combined Course") or []
+        taken_column.append(course_code in taken or not taken.isdisjoint(combined))
+    eligible_column = [state.is_eligible(course_code) for course_code in candidates]
+    return taken_column,eligible_column
+
 #helper for rank_importance
-def individual_rank(major_data,course_data,course_code,courses_taken,college,
+def individual_rank(major_data,data,course_code,courses_taken,college,
 major_displayed,major_left=None,major_l_data=None,minor1=None,minor1_data=None,
 minor2=None,minor2_data=None,minor3=None,minor3_data=None):
     """
     return the score and tags of a course based on major(s) and courses taken
     """
     score = 0
+    course_data = {**data.course_data_am,**data.course_data_nz}
 
     course_taken = course.course_taken(course_data,courses_taken,course_code)
     if course_taken:
-        score -= 20000
+        score += TAKEN_SCORE
 
     is_eligible,_ = course.check_eligibility(course_data,courses_taken,
     course_code)
     if is_eligible:
-        score += 10000
-    college_score,tags_college = college_importance(course_data,college,course_code)
-    major_d_score,tags_d = major_importance(course_data,major_data,college,
+        score += ELIGIBLE_SCORE
+    college_score,tags_college = college_importance(data,college,course_code)
+    major_d_score,tags_d = major_importance(data,major_data,college,
     major_displayed,course_code)
     if major_left:
-        major_l_score,tags_l = major_importance(course_data,major_l_data,college,
+        major_l_score,tags_l = major_importance(data,major_l_data,college,
         major_left,course_code)
     else:
         major_l_score = 0
         tags_l = {}
     tags = combine_dictionaries(tags_college,tags_l)
     if minor1:
-        minor1_score,tags_minor1 = minorImportance.minor_importance(course_data,
+        minor1_score,tags_minor1 = minorImportance.minor_importance(data,
         minor1_data,college,minor1,course_code)
     else:
         minor1_score = 0
@@ -68,169 +158,94 @@ def combine_dictionaries(dict1,dict2):
         dict1[key] = dict2[key]
     return dict1
 
-def college_importance(course_data,college,course_code):
-    if college == "A&S":
-        return importance_CAS(course_data,course_code)
-
-def importance_CAS(course_data,course_code):
-    score = 0
-    tags = {}
-    distr = course.get_distribution(course_data,course_code)
-    if distr:
-        if "ALC-AS" in distr:
-            score += 10
-            tags["ALC-AS"] = (f"This can be counted as an Arts, Literature, and "
-            f"Culture course in A&S.")
-        if "BIO-AS" in distr:
-            score += 10
-            tags["BIO-AS"] = (f"This can be counted as a Biological Sciences "
-            f"course in A&S.")
-        if "ETM-AS" in distr:
-            score += 10
-            tags["ETM-AS"] = (f"This can be counted as a Ethics and Mind "
-            f"course in A&S.")
-        if "GLC-AS" in distr:
-            score += 10
-            tags["GLC-AS"] = (f"This can be counted as a Global Citizenship "
-            f"course in A&S.")
-        if "HST-AS" in distr:
-            score += 10
-            tags["HST-AS"] = (f"This can be counted as a Historical Analysis "
-            f"course in A&S.")
-        if "PHS-AS" in distr:
-            score += 10
-            tags["PHS-AS"] = (f"This can be counted as a Physical Sciences "
-            f"course in A&S.")
-        if "SCD-AS" in distr:
-            score += 10
-            tags["SCD-AS"] = (f"This can be counted as a Social Difference "
-            f"course in A&S.")
-        if "SSC-AS" in distr:
-            score += 10
-            tags["SSC-AS"] = (f"This can be counted as a Social Sciences "
-            f"course in A&S.")
-        if "SDS-AS" in distr:
-            score += 10
-            tags["SDS-AS"] = (f"This can be counted as a Statistics and Data Science "
-            f"course in A&S.")
-        if "SMR-AS" in distr:
-            score += 10
-            tags["SMR-AS"] = (f"This can be counted as a Symbolic and "
-            f"Mathematical Reasoning course in A&S.")
-    return score,tags
+def make_feature(tag,description,score,courses=None,groups=None):
+    """
+    return a feature as a tuple (tag, description, score, counts)
 
-def major_importance(course_data,major_data,college,major,course_code):
-    if college == 'A&S':
-        if major == 'ARTH':
-            return importance_ARTH_CAS(course_data,major_data,course_code)
-        if major == 'ECON':
-            return importance_ECON_CAS(course_data,major_data,course_code)
-        if major == 'CS':
-            return importance_CS_CAS(course_data,major_data,course_code)
-        if major == 'INFO':
-            return importance_INFO_CAS(course_data,major_data,course_code)
-
-def importance_ARTH_CAS(course_data,major_data,course_code):
+    A course gets the tag and the score once if it is in courses, and once
+    for every group in groups that contains it. counts maps each such course
+    to the number of times it gets the score.
+    """
+    counts = {}
+    if courses:
+        for course_code in courses:
+            counts[course_code] = 1
+    if groups:
+        for group in groups:
+            for course_code in set(group):
+                counts[course_code] = counts.get(course_code,0) + 1
+    return (tag,description,score,counts)
+
+def score_features(features,course_code):
+    """
+    return the score and tags a course gets from a list of features
+    """
     score = 0
     tags = {}
-    for core_group in major_data["A&S"]["Core Courses"]:
-        if course_code in core_group:
-            score += 10
-            tags['ARTH Core'] = "This is a core course of Art History major"
-
-    if course_code in level.data_only_level(course_data,major_data,"A&S","ARTH",
-    '2000 Level'):
-        score += 5
-        tags['ARTH 2000'] = "This is a 2000 level Art History course."
-
-    if course_code in level.data_only_level(course_data,major_data,"A&S","ARTH",
-    '3000 Level'):
-        score += 5
-        tags['ARTH 3000'] = "This is a 3000 level Art History course."
-
-    if course_code in level.data_only_level(course_data,major_data,"A&S","ARTH",
-    '4000 Level'):
-        score += 5
-        tags['ARTH 4000'] = "This is a 4000 level Art History course."
-
-    if course_code in level.data_level("ARTH",major_data,course_data,"A&S",
-    '3000+'):
-        score += 5
-        tags['ARTH 3000+'] = "This is a 3000+ Art History course."
-
+    for tag,description,feature_score,counts in features:
+        count = counts.get(course_code,0)
+        if count:
+            score += feature_score * count
+            tags[tag] = description
     return score,tags
 
-def importance_ECON_CAS(course_data,major_data,course_code):
-    score = 0
-    tags = {}
-
-    for basic_group in major_data["A&S"]["Basics"]:
-        if course_code in basic_group:
-            score += 10
-            tags["ECON Basics"] = "This is a basic course required by Economics major."
-
-    for core_group in major_data["A&S"]["Core Courses"]:
-        if course_code in core_group:
-            score += 10
-            tags["ECON Core"] = "This is a core course required by Economics major."
+def college_features(data,college,courses):
+    """
+    return the college distribution features of the courses
+    """
+    if college != "A&S":
+        return []
+    distributions = {}
+    for course_code in courses:
+        distributions[course_code] = course.get_distribution(
+        data.get_course_data(course_code),course_code) or []
+    features = []
+    for distr,description in CAS_DISTRIBUTIONS:
+        matched = [course_code for course_code in courses
+        if distr in distributions[course_code]]
+        features.append(make_feature(distr,description,10,courses=matched))
+    return features
+
+def get_compiled_major(data,major_data,college,major):
+    """
+    return the requirementSpec.CompiledMajor of a major for the catalog
+    snapshot data
 
-    electives = level.data_level("ECON",major_data,course_data,"A&S","Electives")
-    if course_code in electives:
-        score += 5
-        tags["ECON Electives"] = "This can be counted as an elective for CS major."
+    A major without a spec file or a major file is compiled from major_data,
+    without caching. A major with neither raises a ValueError.
+    """
+    compiled = requirementSpec.get_major(data,major,college)
+    if compiled is None and major_data:
+        spec = requirementSpec.spec_from_major_data(major,major_data,college)
+        requirementSpec.validate(spec)
+        compiled = requirementSpec.CompiledMajor(spec,data)
+    if compiled is None:
+        raise ValueError(f"{major} has no requirement spec in {college}")
+    return compiled
+
+def major_features(data,major_data,college,major):
+    """
+    return the requirement features of a major
+    """
+    return get_compiled_major(data,major_data,college,major).get_features()
 
-    return score,tags
+def college_importance(data,college,course_code):
+    if college == "A&S":
+        return importance_CAS(data,course_code)
 
-def importance_CS_CAS(course_data,major_data,course_code,introductory=False,
-core=False,math=False,cs_electives=False,practicum=False):
+def importance_CAS(data,course_code):
     score = 0
     tags = {}
-
-    if introductory == False:
-        for introductory_requirement in major_data["A&S"]['Introductory Programming']:
-            if course_code in introductory_requirement:
-                score += 10
-                tags['Introductory CS'] = "This is a introductory programming course."
-
-    if core == False:
-        for core_requirement in major_data["A&S"]['Core Courses']:
-            if course_code in core_requirement:
+    distr = course.get_distribution(data.get_course_data(course_code),course_code)
+    if distr:
+        for category,description in CAS_DISTRIBUTIONS:
+            if category in distr:
                 score += 10
-                tags['CS Core'] = "This is a core course of CS major."
-
-    if cs_electives == False:
-        min_level = major_data["A&S"]["CS Electives"]["min_level"]
-        if level.data_match_level(course_data,major_data,course_code,'A&S','CS',"CS Electives"):
-            score += 5
-            tags[f"{str(min_level)}000+ CS"] = (f"This can be counted as a "
-            f"{str(min_level)}000+ CS course")
-
+                tags[category] = description
     return score,tags
 
-def importance_INFO_CAS(course_data,major_data,course_code):
-    score = 0
-    tags = {}
-    for core_group in major_data["A&S"]["Core Courses"]:
-        if course_code in core_group:
-            score += 10
-            tags['INFO Core'] = "This is a core course of INFO major"
-
-    for cs_group in major_data["A&S"]["Programming Requirements"]:
-        if course_code in cs_group:
-            score += 5
-            tags['INFO Programming'] = "This is can fulfill a programming requirement of INFO major"
-
-    for math_group in major_data["A&S"]["Math Requirements"]:
-        if course_code in math_group:
-            score += 5
-            tags['INFO Math'] = "This is can fulfill a math requirement of INFO major"
-
-    if course_code in major_data["A&S"]["Statistics"]["included"]:
-        score += 5
-        tags['INFO Stats'] = "This is can fulfill a statistics requirement of INFO major"
-
-    if course_code in level.data_level('INFO',major_data,course_data,'A&S','Electives'):
-        score += 5
-        tags['INFO Electives'] = "This is can be an elective of INFO major"
-
-    return score,tags
+def major_importance(data,major_data,college,major,course_code):
+    """
+    return the score and tags of a course from the requirements of a major
+    """
+    return get_compiled_major(data,major_data,college,major).score(course_code)
@@ -4,107 +4,47 @@ Start Date: January 10, 2025
 """
 
 from course import *
-import os
-import json
+import catalogIndex
 
-filepath = os.path.join(COURSE_DATA_ROUTE, "combined_am.json")
-with open(filepath, "r") as file:
-    course_data_am = json.load(file)
-
-filepath = os.path.join(COURSE_DATA_ROUTE, "combined_nz.json")
-with open(filepath, "r") as file:
-    course_data_nz = json.load(file)
-
-filepath = os.path.join(SESSION_DATA_ROUTE, "SP_session.json")
-with open(filepath, "r") as file:
-    SP_session = json.load(file)
-
-filepath = os.path.join(SESSION_DATA_ROUTE, "FA_session.json")
-with open(filepath, "r") as file:
-    FA_session = json.load(file)
-
-filepath = os.path.join(SESSION_DATA_ROUTE, "SU_session.json")
-with open(filepath, "r") as file:
-    SU_session = json.load(file)
-
-filepath = os.path.join(SESSION_DATA_ROUTE, "WI_session.json")
-with open(filepath, "r") as file:
-    WI_session = json.load(file)
 
+def only_level(data, subject, level, min_credit=3, excluded=[], included=[]):
+    """
+    return a list with the courses of a subject at exactly one level
 
-def only_level(course_data, subject, level, min_credit=3, excluded=[], included=[]):
-    result = []
-    for course_code in course_data[subject]:
-        if course_code[0] in A_TO_M:
-            course_created = Course.create(
-                course_code,
-                course_data_am,
-                SP_session,
-                FA_session,
-                SU_session,
-                WI_session,
-            )
-        else:
-            course_created = Course.create(
-                course_code,
-                course_data_nz,
-                SP_session,
-                FA_session,
-                SU_session,
-                WI_session,
-            )
-        if (not course_code in excluded) and (course_created.get_level() == level):
-            session = course_created.get_session()
-            max_crd = course_created.get_max_credit(session)
-            if max_crd and max_crd >= min_credit:
-                result.append(course_code)
-    result = result + included
+    Parameter data: the catalog to select from
+    Precondition: data is a dataStore.Snapshot
+    """
+    index = catalogIndex.get_index(data)
+    result = index.select(
+        subject, level, level, min_credit, excluded=excluded, included=included
+    )
     return result
 
 
 # helper for level_required,
-def level(course_data, subject, min_level, min_credit=3, excluded=[], included=[]):
+def level(data, subject, min_level, min_credit=3, excluded=[], included=[]):
     """
     return a list with all courses that meet the level requirement in a subject
     """
-    result = []
-    for course_code in course_data[subject]:
-        if match_level(course_code, subject, min_level, min_credit, excluded):
-            result.append(course_code)
-    result = result + included
-    return result
+    index = catalogIndex.get_index(data)
+    return index.select(
+        subject, min_level, min_credit=min_credit, excluded=excluded, included=included
+    )
 
 
 # helper for app.level, app.level_taken
 # helper for majorImportance.match_level_requirement
-def match_level(course_code, subject, min_level, min_credit=3, excluded=[]):
+def match_level(data, course_code, subject, min_level, min_credit=3, excluded=[]):
     """
     return true if the course match the level requirement of a subject
     """
-    if course_code in excluded:
-        return False
-    if course_code[0] in A_TO_M:
-        course_created = Course.create(
-            course_code, course_data_am, SP_session, FA_session, SU_session, WI_session
-        )
-    else:
-        course_created = Course.create(
-            course_code, course_data_nz, SP_session, FA_session, SU_session, WI_session
-        )
-    if (
-        course_created.get_subject() == subject
-        and course_created.get_level() >= min_level
-    ):
-        session = course_created.get_session()
-        max_crd = course_created.get_max_credit(session)
-        if max_crd and (max_crd >= min_credit):
-            return True
-    return False
-
-
-def find_CS4XX1(course_data):
+    index = catalogIndex.get_index(data)
+    return index.matches(course_code, subject, min_level, min_credit, excluded)
+
+
+def find_CS4XX1(data):
     result = []
-    for course_code in course_data["CS"]:
+    for course_code in data.course_data_am.get("CS", {}):
         if course_code[2] == "4" and course_code[-1] == "1":
             result.append(course_code)
     return result
@@ -139,12 +79,12 @@ def find_CS4XX1(course_data):
 #     return fulfilled, not_fulfilled
 
 
-# def data_level(subject, major_data, course_data, college, category):
-#     min_level = major_data[college][category]["min_level"]
-#     included = major_data[college][category]["included"]
-#     excluded = major_data[college][category]["excluded"]
-#     min_credit = major_data[college][category]["min_credit"]
-#     return level(course_data, subject, min_level, min_credit, excluded, included)
+def data_level(subject, major_data, data, college, category):
+    min_level = major_data[college][category]["min_level"]
+    included = major_data[college][category]["included"]
+    excluded = major_data[college][category]["excluded"]
+    min_credit = major_data[college][category]["min_credit"]
+    return level(data, subject, min_level, min_credit, excluded, included)
 
 
 # # helper for level_required
@@ -163,22 +103,22 @@ def find_CS4XX1(course_data):
 #     return result
 
 
-# def data_match_level(course_data, major_data, course_code, college, subject, category):
-#     """
-#     return true if the course match the level requirement of a subject
-#     """
-#     min_level = major_data[college][category]["min_level"]
-#     included = major_data[college][category]["included"]
-#     excluded = major_data[college][category]["excluded"]
-#     min_credit = major_data[college][category]["min_credit"]
-#     return match_level(
-#         course_data, course_code, subject, min_level, min_credit, excluded, included
-#     )
-
-
-# def data_only_level(course_data, major_data, college, subject, category):
-#     level = major_data[college][category]["level"]
-#     included = major_data[college][category]["included"]
-#     excluded = major_data[college][category]["excluded"]
-#     min_credit = major_data[college][category]["min_credit"]
-#     return only_level(course_data, subject, level, min_credit, excluded, included)
+def data_match_level(data, major_data, course_code, college, subject, category):
+    """
+    return true if the course match the level requirement of a subject
+    """
+    min_level = major_data[college][category]["min_level"]
+    included = major_data[college][category]["included"]
+    excluded = major_data[college][category]["excluded"]
+    min_credit = major_data[college][category]["min_credit"]
+    if course_code in included:
+        return True
+    return match_level(data, course_code, subject, min_level, min_credit, excluded)
+
+
+def data_only_level(data, major_data, college, subject, category):
+    level = major_data[college][category]["level"]
+    included = major_data[college][category]["included"]
+    excluded = major_data[college][category]["excluded"]
+    min_credit = major_data[college][category]["min_credit"]
+    return only_level(data, subject, level, min_credit, excluded, included)
@@ -0,0 +1,21 @@
+import re
+
+# the college keys of data/major_data/*.json
+COLLEGE_KEYS = {"CAS": "A&S"}
+
+COURSE_PATTERN = re.compile(r"[A-Z]+[0-9]{4}")
+
+
+def get_major_requirements(major_data, college):
+    """
+    return the requirement groups of a major file such as CS.json for college
+    """
+    return major_data.get(COLLEGE_KEYS.get(college, college)) or {}
+
+
+def get_codes(courses):
+    """
+    return the course codes of a list of courses of a major file, without the
+    entries such as "Equivalent" that are not courses
+    """
+    return [code for code in courses if COURSE_PATTERN.fullmatch(code)]
@@ -0,0 +1,68 @@
+from collections import deque
+
+UNMATCHED = -1
+
+
+def hopcroft_karp(adjacency, right_count):
+    """
+    return a list with the right node matched to every left node of a
+    maximum matching, UNMATCHED for the left nodes left out
+
+    Each phase finds the shortest augmenting paths with one breadth-first
+    search from the free left nodes, then augments a maximal set of disjoint
+    ones with depth-first searches along the layers, so the matching is
+    maximum after O(sqrt(V)) phases. Left nodes are tried in order and their
+    edges in order, so the same input always gives the same matching.
+
+    Parameter adjacency: the right nodes of every left node
+    Precondition: adjacency is a list of lists of ints in [0, right_count)
+
+    Parameter right_count: the number of right nodes
+    Precondition: right_count is an int >= 0
+    """
+    left_count = len(adjacency)
+    match_left = [UNMATCHED] * left_count
+    match_right = [UNMATCHED] * right_count
+
+    # a greedy pass first; the phases only fix what it missed
+    for u in range(left_count):
+        for v in adjacency[u]:
+            if match_right[v] == UNMATCHED:
+                match_left[u] = v
+                match_right[v] = u
+                break
+
+    while True:
+        layer = [UNMATCHED] * left_count
+        queue = deque()
+        for u in range(left_count):
+            if match_left[u] == UNMATCHED:
+                layer[u] = 0
+                queue.append(u)
+        found = False
+        while queue:
+            u = queue.popleft()
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == UNMATCHED:
+                    found = True
+                elif layer[w] == UNMATCHED:
+                    layer[w] = layer[u] + 1
+                    queue.append(w)
+        if not found:
+            return match_left
+
+        def augment(u):
+            for v in adjacency[u]:
+                w = match_right[v]
+                if w == UNMATCHED or (layer[w] == layer[u] + 1 and augment(w)):
+                    match_left[u] = v
+                    match_right[v] = u
+                    return True
+            # a dead end is not searched again in this phase
+            layer[u] = UNMATCHED
+            return False
+
+        for u in range(left_count):
+            if match_left[u] == UNMATCHED:
+                augment(u)
@@ -3,34 +3,39 @@ Author: Raymond Xu
 Date: January 24, 2025
 """
 
-def minor_importance(course_data,minor_data,college,minor,course_code):
-    if minor == "AI":
-        return importance_AI(course_data,minor_data,course_code)
-
-def importance_AI(course_data,minor_data,course_code):
-    score = 0
-    tags = {}
-
-    if course_code in minor_data["Machine Learning"]["included"]:
-        score += 8
-        tags["AI ML"] = "This can be counted as a Machine Learning course for AI minor."
-
-    for reasoning_group in minor_data["Reasoning"]:
-        if course_code in reasoning_group:
-            score += 8
-            tags["AI Reasoning"] = "This can be counted as an AI Reasoning course for AI minor."
+import importance
 
-    for interaction_group in minor_data["Human-AI Interaction"]:
-        if course_code in interaction_group:
-            score += 8
-            tags["AI Interaction"] = "This can be counted as a Human-AI Interaction course for AI minor."
-
-    if course_code in minor_data["Ethics, Governance & Policy"]["included"]:
-        score += 8
-        tags["AI Ethics"] = "This can be counted as an Ethics, Governance & Policy course for AI minor."
-
-    if course_code in minor_data["Electives"]["included"]:
-        score += 8
-        tags["AI Electives"] = "This can be counted as a Elective course for AI minor."
+def minor_importance(data,minor_data,college,minor,course_code):
+    if minor == "AI":
+        return importance_AI(data,minor_data,course_code)
 
-    return score,tags
+def minor_features(data,minor_data,college,minor):
+    """
+    return the requirement features of a minor, or [] if it is not supported
+    """
+    if minor == "AI":
+        return features_AI(data,minor_data)
+    return []
+
+def importance_AI(data,minor_data,course_code):
+    return importance.score_features(features_AI(data,minor_data),
+    course_code)
+
+def features_AI(data,minor_data):
+    return [
+        importance.make_feature("AI ML",
+        "This can be counted as a Machine Learning course for AI minor.",8,
+        courses=minor_data["Machine Learning"]["included"]),
+        importance.make_feature("AI Reasoning",
+        "This can be counted as an AI Reasoning course for AI minor.",8,
+        groups=minor_data["Reasoning"]),
+        importance.make_feature("AI Interaction",
+        "This can be counted as a Human-AI Interaction course for AI minor.",8,
+        groups=minor_data["Human-AI Interaction"]),
+        importance.make_feature("AI Ethics",
+        "This can be counted as an Ethics, Governance & Policy course for AI minor.",
+        8,courses=minor_data["Ethics, Governance & Policy"]["included"]),
+        importance.make_feature("AI Electives",
+        "This can be counted as a Elective course for AI minor.",8,
+        courses=minor_data["Electives"]["included"]),
+    ]
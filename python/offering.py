@@ -0,0 +1,237 @@
+from constants import *
+
+# bit k of an offering mask is set when the course was offered in
+# ALL_SEMESTERS[k], so the most recent semester is bit 0
+SEMESTER_BITS = {semester: 1 << k for k, semester in enumerate(ALL_SEMESTERS)}
+
+# the semesters of the last three years
+RECENT_MASK = sum(SEMESTER_BITS[semester] for semester in ALL_SEMESTERS[:12])
+
+SEASON_NAMES = {"FA": "Fall", "SP": "Spring", "SU": "Summer", "WI": "Winter"}
+
+# the bits of every semester of a season
+SEASON_MASKS = {
+    season: sum(
+        bit for semester, bit in SEMESTER_BITS.items() if semester[:2] == season
+    )
+    for season in SEASON_NAMES
+}
+
+# the bits of the semesters of a season, the most recent year first
+SEASON_BITS = {
+    season: [bit for semester, bit in SEMESTER_BITS.items() if semester[:2] == season]
+    for season in SEASON_NAMES
+}
+
+REGULAR_SEASONS = ["FA", "SP"]
+
+# the order of the seasons within a year
+SEASON_ORDER = {"WI": 0, "SP": 1, "SU": 2, "FA": 3}
+
+
+def encode(semesters):
+    """
+    return the offering mask of a list of semesters such as ["SP25", "FA24"];
+    semesters older than ALL_SEMESTERS are left out
+    """
+    mask = 0
+    for semester in semesters or []:
+        mask |= SEMESTER_BITS.get(semester, 0)
+    return mask
+
+
+def semester_key(semester):
+    return int(semester[2:]), SEASON_ORDER[semester[:2]]
+
+
+def next_semester(semester):
+    """
+    return the fall or spring semester after semester, such as "FA25" after
+    "SP25" and "SP26" after "FA25"
+    """
+    year = int(semester[2:])
+    if semester[:2] == "FA":
+        return f"SP{year + 1:02d}"
+    return f"FA{year:02d}"
+
+
+def next_season(semester, season):
+    """
+    return the first semester of a regular season from semester on, such as
+    "FA25" for "SP25" and "FA"
+    """
+    if semester[:2] != season:
+        semester = next_semester(semester)
+    if semester[:2] != season:
+        semester = next_semester(semester)
+    return semester
+
+
+def every_year(mask, season):
+    """
+    return true if the course was offered in the season in each of the last
+    three years
+    """
+    season_mask = SEASON_MASKS[season] & RECENT_MASK
+    return mask & season_mask == season_mask
+
+
+def get_seasons(mask):
+    """
+    return the set of regular seasons the course was offered in during the
+    last three years
+    """
+    return {
+        season
+        for season in REGULAR_SEASONS
+        if mask & SEASON_MASKS[season] & RECENT_MASK
+    }
+
+
+def get_period(mask, season):
+    """
+    return the number of years between offerings of the course in a season, 1
+    or 2, or None if the recent offerings are not periodic
+    """
+    years = [bool(mask & bit) for bit in SEASON_BITS[season]]
+    if all(years[:3]):
+        return 1
+    if len(years) >= 4 and years[0] == years[2] != years[1] == years[3]:
+        return 2
+    return None
+
+
+def predict_next(mask, after=LAST_SEMESTER):
+    """
+    return the first fall or spring semester after after that the course is
+    likely offered in, from the periodicity of its offerings, or None if
+    there is no pattern
+    """
+    predictions = []
+    for season in REGULAR_SEASONS:
+        period = get_period(mask, season)
+        if period is None:
+            continue
+        semester = next_season(next_semester(after), season)
+        if period == 2:
+            last = next(
+                s for s in ALL_SEMESTERS if s[:2] == season and mask & SEMESTER_BITS[s]
+            )
+            if (int(semester[2:]) - int(last[2:])) % 2:
+                semester = f"{season}{int(semester[2:]) + 1:02d}"
+        predictions.append(semester)
+    if not predictions:
+        return None
+    return min(predictions, key=semester_key)
+
+
+def describe(mask, next_semester_code, when=None):
+    """
+    return a str showing which semester the course is likely provided, by the
+    rules of course.semester_provided
+
+    Parameter mask: the offering mask of the course
+    Precondition: mask is an int from encode
+
+    Parameter next_semester_code: the next semester of current time
+    Precondition: a str such as "SP25" whose season is FA or SP
+
+    Parameter when: the words of the roster "when offered" text
+    Precondition: when is a list of str such as ["Fall", "Spring"], or None
+    """
+    season = next_semester_code[:2]
+    opposite = "SP" if season == "FA" else "FA"
+    recent = mask & RECENT_MASK
+    if next_semester_code in SEMESTER_BITS:
+        # the schedule of the next semester is released
+        if mask & SEMESTER_BITS[next_semester_code]:
+            return f"Provided in {next_semester_code}"
+        if not recent:
+            return "Not provided for three years"
+        following = next_semester(next_semester_code)
+        only_opposite = recent & SEASON_MASKS[opposite] and not (
+            recent & SEASON_MASKS[season]
+        )
+        if only_opposite or (when and SEASON_NAMES[opposite] in when):
+            return f"Likely provided in {following}"
+        return f"Not provided in {next_semester_code}"
+
+    if not recent:
+        return "Not provided for three years"
+    fall = every_year(mask, "FA")
+    spring = every_year(mask, "SP")
+    if fall and spring:
+        return f"Likely provided in {next_semester_code}"
+    if fall and not recent & SEASON_MASKS["SP"]:
+        return f"Likely provided in {next_season(next_semester_code, 'FA')}"
+    if spring and not recent & SEASON_MASKS["FA"]:
+        return f"Likely provided in {next_season(next_semester_code, 'SP')}"
+    return "Unknown"
+
+
+class OfferingIndex(object):
+    """
+    Offering history of every course of one catalog snapshot.
+
+    The smst list of each course is encoded once as a bitmask over
+    ALL_SEMESTERS, and its recent seasons and next likely semester are
+    derived from the mask when the snapshot is first used, so a lookup is a
+    dictionary access instead of a scan of the list.
+    """
+
+    def get_mask(self, course_code):
+        return self._masks.get(course_code, 0)
+
+    def get_seasons(self, course_code):
+        """
+        return the frozenset of fall and spring seasons course_code was offered
+        in during the last three years
+        """
+        return self._seasons.get(course_code, frozenset())
+
+    def get_next(self, course_code):
+        """
+        return the first semester after LAST_SEMESTER that course_code is
+        likely offered in, or None if that can't be predicted
+        """
+        return self._next.get(course_code)
+
+    def describe(self, course_code, next_semester_code=None):
+        """
+        return the semester_provided text of course_code, for the semester
+        after LAST_SEMESTER by default
+        """
+        if next_semester_code is None:
+            return self._descriptions.get(course_code, "Not provided for three years")
+        mask = self._masks.get(course_code, 0)
+        return describe(mask, next_semester_code, self._when.get(course_code))
+
+    def __init__(self, data):
+        """
+        Parameter data: the catalog to index
+        Precondition: data is a dataStore.Snapshot
+        """
+        self._masks = {}
+        self._seasons = {}
+        self._next = {}
+        self._when = {}
+        self._descriptions = {}
+        upcoming = next_semester(LAST_SEMESTER)
+        for course_data in (data.course_data_am, data.course_data_nz):
+            for courses in course_data.values():
+                for course_code, course_info in courses.items():
+                    mask = encode(course_info.get("smst"))
+                    when = course_info.get("when")
+                    self._masks[course_code] = mask
+                    self._seasons[course_code] = frozenset(get_seasons(mask))
+                    self._next[course_code] = predict_next(mask)
+                    if when:
+                        self._when[course_code] = when
+                    self._descriptions[course_code] = describe(mask, upcoming, when)
+
+
+def get_index(data):
+    """
+    return the OfferingIndex of a catalog snapshot, building it on first use
+    """
+    return data.derive("offering", OfferingIndex)
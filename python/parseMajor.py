@@ -5,65 +5,21 @@ Date: January 10, 2025
 
 from level import *
 import importance
+import requirementSpec
 import course
+import dataStore
 import os
 import json
 from constants import *
 
 
 def parse_major(major):
-    filepath = os.path.join(COURSE_DATA_ROUTE, "combined_am.json")
-    with open(filepath, "r") as file:
-        course_data_am = json.load(file)
-
-    filepath = os.path.join(COURSE_DATA_ROUTE, "combined_nz.json")
-    with open(filepath, "r") as file:
-        course_data_nz = json.load(file)
-
-    if major == "ARTH-CAS":
-        return parse_ARTH_CAS(course_data_am)
-        # if major_displayed == "ECON":
-        #     return parse_ECON_CAS(
-        #         course_data,
-        #         courses_taken,
-        #         major_d_data,
-        #         major_left,
-        #         major_l_data,
-        #         minor1,
-        #         minor1_data,
-        #         minor2,
-        #         minor2_data,
-        #         minor3,
-        #         minor3_data,
-        #     )
-        # if major_displayed == "CS":
-        #     return parse_CS_CAS(
-        #         course_data,
-        #         courses_taken,
-        #         major_d_data,
-        #         major_left,
-        #         major_l_data,
-        #         minor1,
-        #         minor1_data,
-        #         minor2,
-        #         minor2_data,
-        #         minor3,
-        #         minor3_data,
-        #     )
-        # if major_displayed == "INFO":
-        #     return parse_INFO_CAS(
-        #         course_data,
-        #         courses_taken,
-        #         major_d_data,
-        #         major_left,
-        #         major_l_data,
-        #         minor1,
-        #         minor1_data,
-        #         minor2,
-        #         minor2_data,
-        #         minor3,
-        #         minor3_data,
-        #     )
+    data = dataStore.get_store().get()
+
+    major, college = major.split("-")
+    compiled = requirementSpec.get_major(data, major, college)
+    if compiled is not None:
+        return parse_spec(compiled)
 
 
 def initiate_result():
@@ -82,155 +38,68 @@ def initiate_result():
     }
 
 
-def parse_ARTH_CAS(course_data_am):
+def get_sections(compiled):
+    """
+    return the (simple sections, searchable sections) of display-major.html
+    of a compiled major, by requirement name
+
+    A section of type C lists its course groups. The other sections map each
+    of their courses to its (score, tags) in the major, highest score first.
+
+    Parameter compiled: the major
+    Precondition: compiled is a requirementSpec.CompiledMajor
+    """
+    simple_sections = {}
+    searchable_sections = {}
+    for requirement in compiled.requirements:
+        description = requirement.description
+        if isinstance(description, list):
+            description = " ".join(description)
+        section = {"Description": description, "Number": requirement.number}
+        if requirement.type == "C":
+            section["Courses"] = [list(group) for group in requirement.groups]
+            simple_sections[requirement.name] = section
+            continue
+        scores = {code: compiled.score(code) for code in requirement.groups[0]}
+        section["Courses"] = dict(
+            sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+        )
+        searchable_sections[requirement.name] = section
+    return simple_sections, searchable_sections
+
+
+def parse_spec(compiled):
+    """
+    write the requirements of a compiled major to
+    data/major_data/{major}_{college}.json and return them
+
+    Parameter compiled: the major
+    Precondition: compiled is a requirementSpec.CompiledMajor
+    """
     result = initiate_result()
 
-    result["init"] = ["ARTH1100", "ARTH2000"]
-
-    result["req1"]["tag"] = {"ARTH Core": "This is a core course of Art History major"}
-    result["req1"]["type"] = "A"
-    result["req1"]["description"] = None
-    result["req1"]["number"] = None
-    result["req1"]["courses"] = [["ARTH1100"], ["ARTH2000"], ["ARTH4101"]]
-
-    result["req2"]["tag"] = {"ARTH 2000": "This is a 2000 level Art History course."}
-    result["req2"]["type"] = "B"
-    result["req2"]["description"] = None
-    result["req2"]["number"] = 1
-    courses = only_level(course_data_am, "ARTH", level=2, excluded=["ARTH2000"])
-    result["req2"]["courses"] = courses
-
-    result["req3"]["tag"] = {"ARTH 3000": "This is a 3000 level Art History course."}
-    result["req3"]["type"] = "B"
-    result["req3"]["description"] = None
-    result["req3"]["number"] = 1
-    courses = only_level(course_data_am, "ARTH", level=3)
-    result["req3"]["courses"] = courses
-
-    result["req4"]["tag"] = {"ARTH 4000": "This is a 4000 level Art History course."}
-    result["req4"]["type"] = "B"
-    result["req4"]["description"] = None
-    result["req4"]["number"] = 2
-    courses = only_level(course_data_am, "ARTH", level=4, excluded=["ARTH4101"])
-    result["req4"]["courses"] = courses
-
-    result["req5"]["tag"] = {
-        "ARTH Elective": "This can be counted as an elective for Art History major."
-    }
-    result["req5"]["type"] = "B"
-    result["req5"]["description"] = None
-    result["req5"]["number"] = 3
-    courses = level(
-        course_data_am, "ARTH", min_level=2, excluded=["ARTH2000", "ARTH4101"]
-    )
-    result["req5"]["courses"] = courses
-
-    with open("data/major_data/ARTH_CAS.json", "w") as f:
+    result["init"] = compiled.init
+
+    for n, requirement in enumerate(compiled.requirements, 1):
+        req = result.setdefault(f"req{n}", {})
+        req["tag"] = {}
+        if requirement.tag:
+            req["tag"][requirement.tag] = requirement.tag_description
+        req["description"] = requirement.description
+        req["number"] = requirement.number
+        if requirement.credits is not None:
+            req["credits"] = requirement.credits
+        if requirement.type == "C":
+            req["type"] = "A"
+            req["courses"] = [list(group) for group in requirement.groups]
+        else:
+            req["type"] = "B"
+            req["courses"] = list(requirement.groups[0])
+
+    route = f"data/major_data/{compiled.major}_{compiled.college}.json"
+    with open(route, "w") as f:
         json.dump(result, f, indent=4)
-
-    # data = major_d_data["A&S"]
-    # result = {}
-    # section_names = ["Core Courses", "2000 Level", "3000 Level", "4000 Level", "3000+"]
-    # for section in section_names:
-    #     result[section] = {}
-
-    # taken_fulfilled = []
-
-    # result["Core Courses"]["Courses"] = data["Core Courses"]
-    # result["Core Courses"]["Description"] = None
-    # result["Core Courses"]["Number"] = None
-    # core_taken = course.fulfilled_2dlist(courses_taken, data["Core Courses"])
-    # taken_fulfilled += core_taken
-
-    # level2000 = level.data_only_level(
-    #     course_data, major_d_data, "A&S", "ARTH", "2000 Level"
-    # )
-    # level2000_sorted = importance.rank_importance(
-    #     major_d_data,
-    #     course_data,
-    #     level2000,
-    #     courses_taken,
-    #     "A&S",
-    #     "ARTH",
-    #     major_left,
-    #     major_l_data,
-    #     minor1,
-    #     minor1_data,
-    #     minor2,
-    #     minor2_data,
-    #     minor3,
-    #     minor3_data,
-    # )
-    # result["2000 Level"]["Courses"] = level2000_sorted
-    # result["2000 Level"]["Description"] = None
-    # result["2000 Level"]["Number"] = data["2000 Level"]["number"]
-
-    # level3000 = level.data_only_level(
-    #     course_data, major_d_data, "A&S", "ARTH", "3000 Level"
-    # )
-    # level3000_sorted = importance.rank_importance(
-    #     major_d_data,
-    #     course_data,
-    #     level3000,
-    #     courses_taken,
-    #     "A&S",
-    #     "ARTH",
-    #     major_left,
-    #     major_l_data,
-    #     minor1,
-    #     minor1_data,
-    #     minor2,
-    #     minor2_data,
-    #     minor3,
-    #     minor3_data,
-    # )
-    # result["3000 Level"]["Courses"] = level3000_sorted
-    # result["3000 Level"]["Description"] = None
-    # result["3000 Level"]["Number"] = data["3000 Level"]["number"]
-
-    # level4000 = level.data_only_level(
-    #     course_data, major_d_data, "A&S", "ARTH", "4000 Level"
-    # )
-    # level4000_sorted = importance.rank_importance(
-    #     major_d_data,
-    #     course_data,
-    #     level4000,
-    #     courses_taken,
-    #     "A&S",
-    #     "ARTH",
-    #     major_left,
-    #     major_l_data,
-    #     minor1,
-    #     minor1_data,
-    #     minor2,
-    #     minor2_data,
-    #     minor3,
-    #     minor3_data,
-    # )
-    # result["4000 Level"]["Courses"] = level4000_sorted
-    # result["4000 Level"]["Description"] = None
-    # result["4000 Level"]["Number"] = data["4000 Level"]["number"]
-
-    # level3000_more = level.data_level("ARTH", major_d_data, course_data, "A&S", "3000+")
-    # level3000_more_sorted = importance.rank_importance(
-    #     major_d_data,
-    #     course_data,
-    #     level3000_more,
-    #     courses_taken,
-    #     "A&S",
-    #     "ARTH",
-    #     major_left,
-    #     major_l_data,
-    #     minor1,
-    #     minor1_data,
-    #     minor2,
-    #     minor2_data,
-    #     minor3,
-    #     minor3_data,
-    # )
-    # result["3000+"]["Courses"] = level3000_more_sorted
-    # result["3000+"]["Description"] = None
-    # result["3000+"]["Number"] = data["3000+"]["number"]
+    return result
 
 
 # def parse_ECON_CAS(
@@ -0,0 +1,232 @@
+import json
+from array import array
+
+PREREQ = 0
+COREQ = 1
+PRECO = 2
+
+EDGE_TYPES = ["prereq", "coreq", "preco"]
+
+# old schema keys, used when a course has no parsed prereq/coreq/preco field
+OLD_KEYS = ["Prerequisites", "Corequisites", "Prerequisites or Corequisites"]
+
+
+def parse_requisites(course_info):
+    """
+    return a list [prereq, coreq, preco] where each element is a 2d list of
+    course codes (a list of clauses, any course of a clause satisfies it)
+
+    The roster pipeline stores the parsed fields as json strings under
+    "prereq", "coreq" and "preco"; older catalogs store the lists directly.
+    """
+    result = []
+    for kind, name in enumerate(EDGE_TYPES):
+        value = course_info.get(name)
+        if value is None:
+            value = course_info.get(OLD_KEYS[kind])
+        if isinstance(value, str):
+            value = json.loads(value)
+        clauses = []
+        for clause in value or []:
+            if isinstance(clause, str):
+                clause = [clause]
+            clauses.append([code for code in clause if isinstance(code, str)])
+        result.append(clauses)
+    return result
+
+
+class PrereqGraph(object):
+    """
+    Prerequisite graph of one catalog snapshot.
+
+    Every course is a node numbered in catalog order; courses that only
+    appear inside a requirement get numbers after the catalog courses. An
+    edge u -> v means u appears in a prereq, coreq or preco clause of v.
+    Both directions are stored as offset/target arrays, so the direct
+    prerequisites of node v are targets[offsets[v]:offsets[v + 1]].
+    """
+
+    def get_codes(self):
+        return self._codes
+
+    def contains(self, course_code):
+        return course_code in self._ids
+
+    def get_prereqs(self, course_code, types=(PREREQ, COREQ, PRECO)):
+        """
+        return a list of the courses mentioned in the requirements of course_code
+
+        Parameter types: the kinds of edges to follow
+        Precondition: types is a tuple of PREREQ, COREQ and PRECO
+        """
+        return self._neighbors(
+            course_code,
+            self._forward_offsets,
+            self._forward_targets,
+            self._forward_types,
+            types,
+        )
+
+    def get_unlocks(self, course_code, types=(PREREQ, COREQ, PRECO)):
+        """
+        return a list of the courses whose requirements mention course_code
+        """
+        return self._neighbors(
+            course_code,
+            self._reverse_offsets,
+            self._reverse_targets,
+            self._reverse_types,
+            types,
+        )
+
+    def get_unlock_types(self, course_code):
+        """
+        return a list of (course code, edge type name) for every course whose
+        requirements mention course_code
+        """
+        node = self._ids.get(course_code)
+        if node is None:
+            return []
+        result = []
+        start = self._reverse_offsets[node]
+        end = self._reverse_offsets[node + 1]
+        for edge in range(start, end):
+            result.append(
+                (
+                    self._codes[self._reverse_targets[edge]],
+                    EDGE_TYPES[self._reverse_types[edge]],
+                )
+            )
+        return result
+
+    def get_all_unlocks(self, course_code, types=(PREREQ, PRECO)):
+        """
+        return a list of every course that course_code leads to, directly or
+        through other courses, in breadth-first order
+        """
+        node = self._ids.get(course_code)
+        if node is None:
+            return []
+        seen = {node}
+        queue = [node]
+        for current in queue:
+            start = self._reverse_offsets[current]
+            end = self._reverse_offsets[current + 1]
+            for edge in range(start, end):
+                target = self._reverse_targets[edge]
+                if target not in seen and self._reverse_types[edge] in types:
+                    seen.add(target)
+                    queue.append(target)
+        return [self._codes[target] for target in queue[1:]]
+
+    def get_chain(self, course_code, types=(PREREQ, PRECO)):
+        """
+        return a list of course_code and every course that appears in its
+        requirements, directly or through other courses, in topological
+        order: each course comes after its prerequisites. Every alternative
+        of a clause is included.
+
+        For example, if CS3110 requires CS2110, which requires CS1110, the
+        result is ["CS1110", "CS2110", "CS3110"]. A cycle in the catalog is
+        broken at the edge that closes it.
+        """
+        node = self._ids.get(course_code)
+        if node is None:
+            return [course_code]
+        order = []
+        visited = {node}
+        # iterative depth-first search with (node, next edge) frames
+        stack = [(node, self._forward_offsets[node])]
+        while stack:
+            current, edge = stack[-1]
+            if edge == self._forward_offsets[current + 1]:
+                stack.pop()
+                order.append(self._codes[current])
+                continue
+            stack[-1] = (current, edge + 1)
+            target = self._forward_targets[edge]
+            if target not in visited and self._forward_types[edge] in types:
+                visited.add(target)
+                stack.append((target, self._forward_offsets[target]))
+        return order
+
+    def _neighbors(self, course_code, offsets, targets, edge_types, types):
+        node = self._ids.get(course_code)
+        if node is None:
+            return []
+        result = []
+        for edge in range(offsets[node], offsets[node + 1]):
+            if edge_types[edge] in types:
+                code = self._codes[targets[edge]]
+                if code not in result:
+                    result.append(code)
+        return result
+
+    def _node(self, course_code):
+        node = self._ids.get(course_code)
+        if node is None:
+            node = len(self._codes)
+            self._ids[course_code] = node
+            self._codes.append(course_code)
+        return node
+
+    def _compress(self, edges, count):
+        """
+        return (offsets, targets, types) arrays of edges grouped by source
+        """
+        offsets = array("i", [0] * (count + 1))
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for node in range(count):
+            offsets[node + 1] += offsets[node]
+        targets = array("i", [0] * len(edges))
+        types = array("b", [0] * len(edges))
+        position = array("i", offsets[:-1])
+        for source, target, kind in edges:
+            targets[position[source]] = target
+            types[position[source]] = kind
+            position[source] += 1
+        return offsets, targets, types
+
+    def __init__(self, data):
+        """
+        Parameter data: the catalog to build the graph from
+        Precondition: data is a dataStore.Snapshot
+        """
+        self._codes = []
+        self._ids = {}
+        catalog = []
+        for course_data in (data.course_data_am, data.course_data_nz):
+            for subject in course_data:
+                for course_code, course_info in course_data[subject].items():
+                    self._node(course_code)
+                    catalog.append((course_code, course_info))
+
+        edges = set()
+        for course_code, course_info in catalog:
+            target = self._ids[course_code]
+            for kind, clauses in enumerate(parse_requisites(course_info)):
+                for clause in clauses:
+                    for required in clause:
+                        if required != course_code:
+                            edges.add((self._node(required), target, kind))
+        edges = sorted(edges)
+
+        count = len(self._codes)
+        (
+            self._forward_offsets,
+            self._forward_targets,
+            self._forward_types,
+        ) = self._compress([(v, u, kind) for u, v, kind in edges], count)
+        (
+            self._reverse_offsets,
+            self._reverse_targets,
+            self._reverse_types,
+        ) = self._compress(edges, count)
+
+
+def get_graph(data):
+    """
+    return the PrereqGraph of a catalog snapshot, building it on first use
+    """
+    return data.derive("prereqGraph", PrereqGraph)
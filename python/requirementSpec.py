@@ -0,0 +1,369 @@
+import json
+import os
+import catalogIndex
+import majorFile
+
+SPEC_ROUTE = "data/major_data/requirements/"
+
+MAJOR_DATA_ROUTE = "data/major_data/"
+
+# the types of a requirement: C lists course groups, one course of each, and E
+# lists the courses; level, subject and credit are rules on the catalog
+TYPES = ("C", "E", "level", "subject", "credit")
+
+RULE_TYPES = ("level", "subject", "credit")
+
+DEFAULT_MIN_CREDIT = 3
+
+# the college ids of the spec files for the college names of the major files
+COLLEGE_IDS = {"A&S": "CAS"}
+
+
+def get_spec_path(major, college):
+    college = COLLEGE_IDS.get(college, college)
+    return os.path.join(SPEC_ROUTE, f"{major}-{college}.json")
+
+
+def load_spec(major, college):
+    """
+    return the requirement spec of a major in a college, from its spec file,
+    or else from its major file such as CS.json; None if it has neither
+
+    Parameter college: the college, such as "CAS" or "A&S"
+    Precondition: college is a str
+    """
+    path = get_spec_path(major, college)
+    if os.path.exists(path):
+        with open(path, "r") as file:
+            spec = json.load(file)
+    else:
+        path = os.path.join(MAJOR_DATA_ROUTE, f"{major}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as file:
+            spec = spec_from_major_data(major, json.load(file), college)
+    validate(spec)
+    return spec
+
+
+def spec_from_major_data(major, major_data, college):
+    """
+    return the requirement spec of the groups of a major file such as
+    CS.json, so the file stays the only source of its requirements
+
+    A group of alternative lists becomes type C, and a level group of one
+    subject becomes type level. Groups of any subject or of a numbering
+    pattern such as CS4XX1 are left out; audit and gradPlan read those from
+    the file. The "Features" of the file give the tag, tagDescr and score of
+    a group, by college and group name.
+
+    Parameter college: the college, such as "CAS" or "A&S"
+    Precondition: college is a str
+    """
+    college = COLLEGE_IDS.get(college, college)
+    groups = majorFile.get_major_requirements(major_data, college)
+    features = majorFile.get_major_requirements(major_data.get("Features", {}), college)
+    requirements = []
+    for n, (name, group) in enumerate(groups.items(), 1):
+        requirement = {"id": f"{major}_req{n}", "name": name}
+        if isinstance(group, list):
+            course_groups = []
+            for alternatives in group:
+                if isinstance(alternatives, str):
+                    alternatives = [alternatives]
+                course_groups.append(
+                    {
+                        "id": len(course_groups) + 1,
+                        "courses": majorFile.get_codes(alternatives),
+                    }
+                )
+            requirement["type"] = "C"
+            requirement["number"] = len(course_groups)
+            requirement["courseGrps"] = course_groups
+        elif (
+            isinstance(group, dict)
+            and group.get("number")
+            and group.get("format", "level") == "level"
+            and not group.get("subject", major).startswith("any")
+        ):
+            requirement["type"] = "level"
+            requirement["number"] = group["number"]
+            requirement["subject"] = group.get("subject", major)
+            for key in ("min_level", "min_credit", "included", "excluded"):
+                if key in group:
+                    requirement[key] = group[key]
+            if group.get("description"):
+                requirement["descr"] = [group["description"]]
+        else:
+            continue
+        requirement.update(features.get(name, {}))
+        requirements.append(requirement)
+    return {
+        "major": major,
+        "college": college,
+        "name": major_data.get("Name", major),
+        "requirements": requirements,
+    }
+
+
+def validate(spec):
+    """
+    raise a ValueError if a requirement spec is malformed
+
+    A spec has the major, the college and a list of requirements. Every
+    requirement has an id and one of TYPES:
+    - C has "courseGrps", a list of {"id", "courses"}
+    - E has "courses"
+    - level has a "subject" and a "level", or a "min_level" and an optional
+      "max_level"
+    - subject has a "subject"
+    - credit is a level requirement with "credits", the credits of its
+      courses required
+    The rules may have "min_credit", "excluded" and "included". A
+    requirement with a "score" is a feature of course ranking, and then it
+    needs a "tag" and a "tagDescr". A "reqTag" and a "reqTagDescr" replace
+    them in the requirement document major.py commits.
+    """
+    for key in ("major", "college", "requirements"):
+        if key not in spec:
+            raise ValueError(f"Requirement spec has no {key}")
+    ids = set()
+    for requirement in spec["requirements"]:
+        req_id = requirement.get("id")
+        if req_id is None or req_id in ids:
+            raise ValueError(f"Requirement id {req_id} is missing or repeated")
+        ids.add(req_id)
+        req_type = requirement.get("type")
+        if req_type not in TYPES:
+            raise ValueError(f"Requirement {req_id} has unknown type {req_type}")
+        if req_type == "C" and not requirement.get("courseGrps"):
+            raise ValueError(f"Requirement {req_id} has no courseGrps")
+        if req_type == "E" and "courses" not in requirement:
+            raise ValueError(f"Requirement {req_id} has no courses")
+        if req_type in RULE_TYPES and not requirement.get("subject"):
+            raise ValueError(f"Requirement {req_id} has no subject")
+        if req_type in ("level", "credit") and (
+            "level" not in requirement and "min_level" not in requirement
+        ):
+            raise ValueError(f"Requirement {req_id} has no level")
+        if req_type == "credit" and not requirement.get("credits"):
+            raise ValueError(f"Requirement {req_id} has no credits")
+        if "score" in requirement and not (
+            requirement.get("tag") and requirement.get("tagDescr")
+        ):
+            raise ValueError(f"Requirement {req_id} has a score but no tag")
+        if ("reqTag" in requirement) != ("reqTagDescr" in requirement):
+            raise ValueError(f"Requirement {req_id} needs a reqTag and a reqTagDescr")
+
+
+def get_levels(requirement):
+    """
+    return the lowest and highest level of a rule requirement
+    """
+    if requirement["type"] == "subject":
+        return 1, 9
+    if "level" in requirement:
+        return requirement["level"], requirement["level"]
+    return requirement["min_level"], requirement.get("max_level", 9)
+
+
+def resolve(requirement, index):
+    """
+    return a tuple of the course groups of a requirement; every group is a
+    tuple of courses in catalog order
+
+    A requirement of type C has one group for each of its courseGrps; the
+    other types have a single group.
+
+    Parameter index: the catalog
+    Precondition: index is a catalogIndex.CatalogIndex
+    """
+    req_type = requirement["type"]
+    if req_type == "C":
+        return tuple(tuple(grp["courses"]) for grp in requirement["courseGrps"])
+    if req_type == "E":
+        return (tuple(requirement["courses"]),)
+    min_level, max_level = get_levels(requirement)
+    courses = index.select(
+        requirement["subject"],
+        min_level,
+        max_level,
+        requirement.get("min_credit", DEFAULT_MIN_CREDIT),
+        excluded=requirement.get("excluded", []),
+        included=requirement.get("included", []),
+    )
+    return (tuple(dict.fromkeys(courses)),)
+
+
+class CompiledRequirement(object):
+    """
+    One requirement of a spec with its courses resolved against a catalog
+    snapshot.
+
+    courses is the frozenset of every course that counts for the
+    requirement, and counts maps each of them to the number of its groups
+    that contain it, so the score of a course is a dictionary lookup.
+    """
+
+    def get_fulfilling(self, courses_taken):
+        """
+        return the list of the courses of courses_taken that count for the
+        requirement, without repeats
+        """
+        return [code for code in dict.fromkeys(courses_taken) if code in self.courses]
+
+    def is_met(self, courses_taken):
+        """
+        return true if courses_taken satisfy the requirement
+
+        Type C needs a course of number of its groups, all of them by
+        default; credit needs credits credits of its courses; the other
+        types need number of their courses, one by default.
+        """
+        taken = self.get_fulfilling(courses_taken)
+        if self.type == "credit":
+            return sum(self._credits[code] for code in taken) >= self.credits
+        if self.type == "C":
+            number = self.number or len(self.groups)
+            met = [group for group in self.groups if any(c in taken for c in group)]
+            return len(met) >= number
+        return len(taken) >= (self.number or 1)
+
+    def is_feature(self):
+        """
+        return true if the requirement adds its score and tag to the courses
+        it contains when courses are ranked
+        """
+        return self.score is not None
+
+    def get_feature(self):
+        """
+        return the requirement as a feature of importance.make_feature
+        """
+        return (self.tag, self.tag_description, self.score, self.counts)
+
+    def __init__(self, requirement, index):
+        """
+        Parameter requirement: one requirement of a spec
+        Precondition: requirement passed validate
+
+        Parameter index: the catalog
+        Precondition: index is a catalogIndex.CatalogIndex
+        """
+        self.id = requirement["id"]
+        self.type = requirement["type"]
+        self.name = requirement.get("name", self.id)
+        self.tag = requirement.get("tag")
+        self.tag_description = requirement.get("tagDescr")
+        self.description = requirement.get("descr")
+        self.score = requirement.get("score")
+        self.number = requirement.get("number")
+        self.credits = requirement.get("credits")
+        self.groups = resolve(requirement, index)
+        counts = {}
+        for group in self.groups:
+            for course_code in set(group):
+                counts[course_code] = counts.get(course_code, 0) + 1
+        self.counts = counts
+        self.courses = frozenset(counts)
+        self._credits = {}
+        if self.type == "credit":
+            self._credits = {
+                code: index.get_max_credit(code) or 0 for code in self.courses
+            }
+
+
+class CompiledMajor(object):
+    """
+    The requirements of one major in one college, compiled once per catalog
+    snapshot.
+
+    Every course that counts for a scored requirement has its total score
+    and its tags precomputed, so scoring a course is a lookup instead of
+    building the level lists of the major again.
+    """
+
+    def get_features(self):
+        """
+        return the features of importance.make_feature of the scored
+        requirements, in the order of the spec
+        """
+        return list(self._features)
+
+    def get_unmet(self, courses_taken):
+        """
+        return the list of the CompiledRequirements courses_taken do not
+        satisfy, in the order of the spec
+        """
+        return [
+            requirement
+            for requirement in self.requirements
+            if not requirement.is_met(courses_taken)
+        ]
+
+    def get_requirement(self, req_id):
+        """
+        return the CompiledRequirement with id req_id, or None
+        """
+        return self._by_id.get(req_id)
+
+    def score(self, course_code):
+        """
+        return the score and a new dictionary of the tags course_code gets
+        from the requirements of the major
+        """
+        return self._scores.get(course_code, 0), dict(
+            self._tags.get(course_code, {})
+        )
+
+    def __init__(self, spec, data):
+        """
+        Parameter spec: the requirement spec of the major
+        Precondition: spec passed validate
+
+        Parameter data: the catalog
+        Precondition: data is a dataStore.Snapshot
+        """
+        index = catalogIndex.get_index(data)
+        self.major = spec["major"]
+        self.college = spec["college"]
+        self.name = spec.get("name", self.major)
+        self.init = list(spec.get("init", []))
+        self.requirements = [
+            CompiledRequirement(requirement, index)
+            for requirement in spec["requirements"]
+        ]
+        self._by_id = {requirement.id: requirement for requirement in self.requirements}
+        self._features = tuple(
+            requirement.get_feature()
+            for requirement in self.requirements
+            if requirement.is_feature()
+        )
+        self._scores = {}
+        self._tags = {}
+        for tag, description, score, counts in self._features:
+            for course_code, count in counts.items():
+                self._scores[course_code] = (
+                    self._scores.get(course_code, 0) + score * count
+                )
+                self._tags.setdefault(course_code, {})[tag] = description
+
+
+def get_major(data, major, college):
+    """
+    return the CompiledMajor of a major in a college, compiling its spec of
+    load_spec on first use with a catalog snapshot, or None if the major has
+    no spec
+
+    Parameter college: the college, such as "CAS" or "A&S"
+    Precondition: college is a str
+    """
+    college = COLLEGE_IDS.get(college, college)
+
+    def build(data):
+        spec = load_spec(major, college)
+        if spec is None:
+            return None
+        return CompiledMajor(spec, data)
+
+    return data.derive(f"requirementSpec:{major}-{college}", build)
@@ -0,0 +1,426 @@
+import heapq
+import itertools
+import re
+from array import array
+from datetime import datetime
+from constants import *
+
+MINUTES_PER_DAY = 24 * 60
+
+# roster meeting patterns use one letter per day, and Su for Sunday
+DAY_PATTERN = re.compile(r"Su|[MTWRFS]")
+DAYS = {"M": 0, "T": 1, "W": 2, "R": 3, "F": 4, "S": 5, "Su": 6}
+
+DEFAULT_LIMIT = 5
+
+# the semesters a schedule can be planned for
+SEMESTER_PATTERN = re.compile(r"(SP|FA|SU|WI)[0-9]{2}")
+
+# most courses of one schedule request
+MAX_COURSES = 8
+
+# partial schedules explored before the search returns what it found, so
+# a set of courses that can never fit together cannot stall a request
+MAX_NODES = 20000
+
+# most section combinations kept for one course, best first; a combination
+# that cannot beat the worst one kept is not enumerated, so a course with
+# dozens of labs and discussions cannot blow up the search
+MAX_OPTIONS = 500
+
+
+def parse_time(text):
+    """
+    return the minutes since midnight of a roster time such as "09:05AM"
+    """
+    moment = datetime.strptime(text.strip(), "%I:%M%p")
+    return moment.hour * 60 + moment.minute
+
+
+def parse_date(text):
+    """
+    return the ordinal of a roster date such as "01/21/2025"
+    """
+    return datetime.strptime(text, "%m/%d/%Y").toordinal()
+
+
+def parse_pattern(pattern):
+    """
+    return the weekdays (0 for Monday) of a meeting pattern such as "MWF"; a
+    pattern without days, such as "TBA", returns an empty list
+    """
+    if not pattern:
+        return []
+    return [DAYS[day] for day in DAY_PATTERN.findall(pattern)]
+
+
+class Section(object):
+    """
+    The meeting times of one class section.
+
+    intervals packs four ints per meeting block: the start and end minute
+    counted from Monday 00:00, and the first and last day (as date ordinals)
+    the block runs. mask has bit m set when the section meets at minute m of
+    the week in any part of the term. Sections whose masks don't intersect
+    never conflict, and sections that meet over the same dates conflict when
+    they do, so only sections of courses that run in part of the term have
+    their blocks and dates compared.
+    """
+
+    def conflicts(self, other):
+        if not self.mask & other.mask:
+            return False
+        if self.dates is not None and self.dates == other.dates:
+            # the same minutes of the week over the same days of the term
+            return True
+        mine = self.intervals
+        theirs = other.intervals
+        for i in range(0, len(mine), 4):
+            for j in range(0, len(theirs), 4):
+                if (
+                    mine[i] < theirs[j + 1]
+                    and theirs[j] < mine[i + 1]
+                    and mine[i + 2] <= theirs[j + 3]
+                    and theirs[j + 2] <= mine[i + 3]
+                ):
+                    return True
+        return False
+
+    def get_minutes(self):
+        """
+        return a list of the (start, end) minutes of the week it meets
+        """
+        return [
+            (self.intervals[i], self.intervals[i + 1])
+            for i in range(0, len(self.intervals), 4)
+        ]
+
+    def __init__(self, key, meetings, section_data=None):
+        """
+        Parameter key: the section key, such as "LEC-001"
+        Precondition: key is a str
+
+        Parameter meetings: the meetings of the section, from the session
+        json (tmstart, tmend, ptn, start_dt, end_dt) or from get_meeting
+        (tmstart, tmend, pattern, startDt, endDt)
+        Precondition: meetings is a list of dictionaries
+        """
+        section_data = section_data or {}
+        self.key = key
+        self.component = key.split("-")[0]
+        self.is_open = section_data.get("open", "O") == "O"
+        term_start = parse_date(TERM_START)
+        term_end = parse_date(TERM_END)
+        blocks = []
+        mask = 0
+        for meeting in meetings:
+            start = meeting.get("tmstart")
+            end = meeting.get("tmend")
+            days = parse_pattern(meeting.get("ptn", meeting.get("pattern")))
+            if not start or not end or not days:
+                continue
+            start = parse_time(start)
+            end = parse_time(end)
+            first = meeting.get("start_dt", meeting.get("startDt"))
+            last = meeting.get("end_dt", meeting.get("endDt"))
+            first = parse_date(first) if first else term_start
+            last = parse_date(last) if last else term_end
+            for day in days:
+                offset = day * MINUTES_PER_DAY
+                blocks.append((offset + start, offset + end, first, last))
+                mask |= ((1 << (end - start)) - 1) << (offset + start)
+        blocks.sort()
+        self.intervals = array("i", [value for block in blocks for value in block])
+        self.mask = mask
+        # the date range every block shares, None if they differ
+        ranges = {(first, last) for _, _, first, last in blocks}
+        self.dates = ranges.pop() if len(ranges) == 1 else None
+
+
+class Option(object):
+    """
+    One way to take a course: an enroll group and one section of each of its
+    required components, with the preference score of those sections.
+    """
+
+    def conflicts(self, other):
+        if not self.mask & other.mask:
+            return False
+        return any(
+            mine.conflicts(theirs)
+            for mine in self.sections
+            for theirs in other.sections
+        )
+
+    def to_dict(self):
+        return {
+            "group": self.group,
+            "sections": [section.key for section in self.sections],
+        }
+
+    def __init__(self, course_code, group, sections, score):
+        self.course_code = course_code
+        self.group = group
+        self.sections = sections
+        self.score = score
+        self.mask = 0
+        for section in sections:
+            self.mask |= section.mask
+
+
+class Preferences(object):
+    """
+    Additive score of sections; higher is better and 0 is a perfect fit.
+
+    Every minute of class before earliest or after latest costs a point per
+    hour, every meeting on an avoided day costs day_penalty and every section
+    that is not open costs closed_penalty. Because the score of a schedule is
+    the sum over its sections, the search can bound partial schedules.
+    """
+
+    def score(self, section):
+        total = 0.0
+        for start, end in section.get_minutes():
+            day, start = divmod(start, MINUTES_PER_DAY)
+            end -= day * MINUTES_PER_DAY
+            early = max(0, min(end, self.earliest) - start)
+            late = max(0, end - max(start, self.latest))
+            total -= (early + late) / 60
+            if day in self.avoid_days:
+                total -= self.day_penalty
+        if not section.is_open:
+            total -= self.closed_penalty
+        return total
+
+    def __init__(
+        self,
+        earliest="08:00AM",
+        latest="06:00PM",
+        avoid_days="",
+        day_penalty=5.0,
+        closed_penalty=20.0,
+    ):
+        """
+        Parameter avoid_days: the days to keep free, as a meeting pattern
+        Precondition: avoid_days is a str such as "F" or "MW"
+        """
+        self.earliest = parse_time(earliest)
+        self.latest = parse_time(latest)
+        self.avoid_days = set(parse_pattern(avoid_days))
+        self.day_penalty = day_penalty
+        self.closed_penalty = closed_penalty
+
+
+def get_sections(session_group):
+    """
+    return a dictionary that maps each component of an enroll group from the
+    session json to its list of Sections
+    """
+    components = {}
+    for key, value in session_group.items():
+        if not isinstance(value, dict) or "-" not in key:
+            continue
+        meetings = [value[name] for name in value if name.startswith("meeting")]
+        section = Section(key, meetings, value)
+        components.setdefault(section.component, []).append(section)
+    return components
+
+
+def course_options(course_code, session_info, preferences, limit=MAX_OPTIONS):
+    """
+    return the limit best conflict-free Options of a course, best score first
+
+    The sections of every component are tried best first and the limit best
+    options so far are kept in a heap, so a branch stops as soon as even the
+    best sections of the components left cannot beat the worst option kept.
+
+    Parameter session_info: the enroll groups of the course in the session
+    json, such as {"Grp1": {"req": ["LEC", "DIS"], "LEC-001": {...}, ...}}
+    Precondition: session_info is a dictionary
+    """
+    # a min-heap of (score, -sequence, Option), so of two options with the
+    # same score the later one is dropped first
+    best = []
+    counter = itertools.count()
+    for group, session_group in session_info.items():
+        components = get_sections(session_group)
+        required = session_group.get("req") or list(components)
+        if not required or any(c not in components for c in required):
+            continue
+        # fewest sections first, so conflicts prune the widest levels early
+        ordered = sorted(required, key=lambda c: len(components[c]))
+        scored = {
+            c: sorted(
+                ((preferences.score(s), s) for s in components[c]),
+                key=lambda pair: -pair[0],
+            )
+            for c in ordered
+        }
+        # the best score the components from each index on can still add
+        bound = [0.0] * (len(ordered) + 1)
+        for index in range(len(ordered) - 1, -1, -1):
+            bound[index] = bound[index + 1] + scored[ordered[index]][0][0]
+        chosen = []
+
+        def extend(index, score):
+            if index == len(ordered):
+                sections = [section for _, section in chosen]
+                option = Option(course_code, group, sections, score)
+                entry = (score, -next(counter), option)
+                if len(best) < limit:
+                    heapq.heappush(best, entry)
+                else:
+                    heapq.heappushpop(best, entry)
+                return
+            for section_score, section in scored[ordered[index]]:
+                if (
+                    len(best) == limit
+                    and score + section_score + bound[index + 1] <= best[0][0]
+                ):
+                    # the sections left of this component score no better
+                    break
+                if any(section.conflicts(other) for _, other in chosen):
+                    continue
+                chosen.append((section_score, section))
+                extend(index + 1, score + section_score)
+                chosen.pop()
+
+        extend(0, 0.0)
+    best.sort(key=lambda entry: (-entry[0], -entry[1]))
+    return [option for _, _, option in best]
+
+
+def find_schedules(options_by_course, limit=DEFAULT_LIMIT, max_nodes=MAX_NODES):
+    """
+    return a list of the limit best conflict-free schedules as (score, list
+    of Options), best first, and False if the search stopped after max_nodes
+    partial schedules without exploring them all
+
+    Every option gets a bit, in best-first order within its course, and the
+    options still possible for a course are one int. Choosing an option ands
+    each other course's int with the bits of the options compatible with it,
+    a row computed once per option the first time it is chosen, so a dead end
+    is found as soon as a course has no bit left. The search branches on the
+    course with the fewest options left, tries its options best first, and
+    stops a branch once even the best remaining options cannot beat the
+    worst of the limit schedules found so far.
+
+    Parameter options_by_course: the Options of every course
+    Precondition: options_by_course is a dictionary of lists of Options
+    """
+    options = []
+    initial = {}
+    for course_code, course_options in options_by_course.items():
+        start = len(options)
+        options.extend(sorted(course_options, key=lambda option: -option.score))
+        initial[course_code] = ((1 << len(options)) - 1) ^ ((1 << start) - 1)
+
+    compatible = {}
+
+    def get_compatible(index):
+        row = compatible.get(index)
+        if row is None:
+            option = options[index]
+            row = 0
+            for other_index, other in enumerate(options):
+                if other.course_code != option.course_code and not option.conflicts(
+                    other
+                ):
+                    row |= 1 << other_index
+            compatible[index] = row
+        return row
+
+    def best_score(domain):
+        # the lowest bit of a course is its best option left
+        return options[(domain & -domain).bit_length() - 1].score
+
+    found = []
+    counter = itertools.count()
+    nodes = [0]
+
+    def search(domains, chosen, score):
+        nodes[0] += 1
+        if not domains:
+            entry = (score, next(counter), list(chosen))
+            if len(found) < limit:
+                heapq.heappush(found, entry)
+            else:
+                heapq.heappushpop(found, entry)
+            return
+        course_code = min(domains, key=lambda code: bin(domains[code]).count("1"))
+        rest = {code: domain for code, domain in domains.items() if code != course_code}
+        rest_bound = sum(best_score(domain) for domain in rest.values())
+        domain = domains[course_code]
+        while domain and nodes[0] < max_nodes:
+            low = domain & -domain
+            domain ^= low
+            index = low.bit_length() - 1
+            option = options[index]
+            if len(found) == limit and score + option.score + rest_bound <= found[0][0]:
+                break
+            row = get_compatible(index)
+            filtered = {}
+            for code, other in rest.items():
+                if not other & row:
+                    break
+                filtered[code] = other & row
+            else:
+                chosen.append(option)
+                search(filtered, chosen, score + option.score)
+                chosen.pop()
+
+    if all(initial.values()):
+        search(initial, [], 0.0)
+    found.sort(key=lambda entry: (-entry[0], entry[1]))
+    return [(score, chosen) for score, _, chosen in found], nodes[0] < max_nodes
+
+
+def get_season_sessions(data, semester):
+    """
+    return the session json of the season of semester
+    """
+    SP_session, FA_session, SU_session, WI_session = data.get_sessions()
+    return {
+        "SP": SP_session,
+        "FA": FA_session,
+        "SU": SU_session,
+        "WI": WI_session,
+    }[semester[:2]]
+
+
+def plan_schedules(
+    course_codes, semester, data, preferences=None, limit=DEFAULT_LIMIT
+):
+    """
+    return a dictionary with the limit best conflict-free schedules of
+    course_codes in semester, the courses that are not offered, and whether
+    the search was complete
+
+    Each schedule is {"score": float, "courses": {course_code: {"group": str,
+    "sections": [section keys]}}}. The schedule of a season is the latest one
+    in the session data.
+
+    Parameter semester: the semester to plan, such as "FA25"
+    Precondition: semester is a str whose season is SP, FA, SU or WI
+    """
+    preferences = preferences or Preferences()
+    sessions = get_season_sessions(data, semester)
+    options_by_course = {}
+    not_offered = []
+    for course_code in course_codes:
+        subject = re.match(r"[A-Z]+", course_code).group(0)
+        session_info = sessions.get(subject, {}).get(course_code)
+        options = course_options(course_code, session_info or {}, preferences)
+        if options:
+            options_by_course[course_code] = options
+        else:
+            not_offered.append(course_code)
+    found, complete = find_schedules(options_by_course, limit)
+    schedules = [
+        {
+            "score": round(score, 2),
+            "courses": {option.course_code: option.to_dict() for option in chosen},
+        }
+        for score, chosen in found
+    ]
+    return {"schedules": schedules, "not_offered": not_offered, "complete": complete}
@@ -0,0 +1,209 @@
+import heapq
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+# number of results returned by default, as many as the typeahead shows
+DEFAULT_LIMIT = 8
+
+# seconds a query may spend scoring before it ranks what it found so far; this
+# leaves room for ranking within the 5 ms typeahead target
+DEFAULT_BUDGET = 0.003
+
+# most vocabulary words one query word expands to
+MAX_EXPANSIONS = 64
+
+# results kept for repeated keystrokes
+CACHE_SIZE = 2048
+
+# score of a course code that starts with the query; above any text match
+CODE_SCORE = 1000.0
+
+# weight of a query word found in the title or in the description
+TITLE_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+# a word that only matches as the prefix of a longer word counts less
+PREFIX_FACTOR = 0.5
+
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this "
+    "to with will students course courses".split()
+)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+CODE_PATTERN = re.compile(r"[A-Z]+[0-9]*")
+
+
+def tokenize(text):
+    """
+    return the lowercase words of text
+    """
+    if not text:
+        return []
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex(object):
+    """
+    Typeahead index of one catalog snapshot.
+
+    Course codes are kept sorted, so the courses starting with a typed code
+    are one contiguous range found by binary search, and doc ids are
+    positions in that order. Titles (ttl and tts) and descriptions have an
+    inverted index from word to an array of doc ids. Words are kept sorted as
+    well, so every query word also matches the words it is a prefix of, for
+    words still being typed and abbreviations like "intro".
+
+    Code matches rank first, in code order, then courses matching every query
+    word, scored by where the words appear. A query stops scoring once its
+    time budget is spent and ranks what it found so far; code matches are
+    always scored, since they cost one binary search.
+    """
+
+    def search(self, query, limit=DEFAULT_LIMIT, budget=DEFAULT_BUDGET):
+        """
+        return a list of at most limit {"course_code", "title"} dictionaries
+        for query, best match first
+
+        Parameter query: the text typed so far
+        Precondition: query is a str
+
+        Parameter budget: seconds the query may spend scoring
+        Precondition: budget is a positive number
+        """
+        key = (query.strip().upper(), limit)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+
+        deadline = time.perf_counter() + budget
+        scores, complete = self._score_words(query, deadline)
+        for doc in self._match_codes(query, limit):
+            scores[doc] = scores.get(doc, 0.0) + CODE_SCORE
+        ranked = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        results = [
+            {"course_code": self._codes[doc], "title": self._titles[doc]}
+            for doc in ranked
+        ]
+
+        # a query cut short by the budget is not cached, so it can complete later
+        if complete:
+            with self._lock:
+                self._cache[key] = results
+                if len(self._cache) > CACHE_SIZE:
+                    self._cache.popitem(last=False)
+        return list(results)
+
+    def contains(self, course_code):
+        position = bisect_left(self._codes, course_code)
+        return position < len(self._codes) and self._codes[position] == course_code
+
+    def _match_codes(self, query, limit):
+        """
+        return the doc ids of the first limit courses whose code starts with
+        query; an exact match sorts first in its range
+        """
+        code = query.upper().replace(" ", "")
+        if not CODE_PATTERN.fullmatch(code):
+            return range(0)
+        start, end = self._prefix_range(self._codes, code)
+        return range(start, min(end, start + limit))
+
+    def _score_words(self, query, deadline):
+        """
+        return a dictionary with the text score of every course matching all
+        words of query, and False if the deadline was reached first, in which
+        case the courses matching the words scored so far are returned
+        """
+        words = tokenize(query)
+        if len(words) > 1:
+            words = [word for word in words if word not in STOPWORDS] or words[-1:]
+        scores = None
+        for word in words:
+            matches = []
+            for postings, weight in (
+                (self._title_postings, TITLE_WEIGHT),
+                (self._description_postings, DESCRIPTION_WEIGHT),
+            ):
+                for token, factor in self._expand(word):
+                    docs = postings.get(token)
+                    if docs is not None:
+                        matches.append((weight * factor, docs))
+            # a course keeps the best score of the word; apply the lowest first
+            matches.sort(key=lambda match: match[0])
+            word_scores = {}
+            complete = True
+            for score, docs in matches:
+                if time.perf_counter() > deadline:
+                    complete = False
+                    break
+                word_scores.update(dict.fromkeys(docs, score))
+            if scores is None:
+                scores = word_scores
+            else:
+                common = scores.keys() & word_scores.keys()
+                scores = {doc: scores[doc] + word_scores[doc] for doc in common}
+            if not complete:
+                return scores, False
+            if not scores:
+                break
+        return scores or {}, True
+
+    def _expand(self, word):
+        """
+        return the (vocabulary word, factor) pairs a query word matches, itself
+        and the words it is a prefix of, since it may still be being typed
+        """
+        start, end = self._prefix_range(self._words, word)
+        end = min(end, start + MAX_EXPANSIONS)
+        return [
+            (token, 1.0 if token == word else PREFIX_FACTOR)
+            for token in self._words[start:end]
+        ]
+
+    def _prefix_range(self, ordered, prefix):
+        # every string that starts with prefix sorts below prefix + "\uffff"
+        return bisect_left(ordered, prefix), bisect_left(ordered, prefix + "\uffff")
+
+    def __init__(self, data):
+        """
+        Parameter data: the catalog to index
+        Precondition: data is a dataStore.Snapshot
+        """
+        entries = {}
+        for course_data in (data.course_data_am, data.course_data_nz):
+            for courses in course_data.values():
+                for course_code, course_info in courses.items():
+                    entries[course_code] = course_info
+        self._codes = sorted(entries)
+        self._titles = []
+        title_postings = {}
+        description_postings = {}
+        for doc, course_code in enumerate(self._codes):
+            course_info = entries[course_code]
+            title = course_info.get("ttl") or course_info.get("Title") or ""
+            short_title = course_info.get("tts") or ""
+            description = (
+                course_info.get("dsrpn") or course_info.get("Description") or ""
+            )
+            self._titles.append(title)
+            for token in set(tokenize(title) + tokenize(short_title)):
+                title_postings.setdefault(token, array("i")).append(doc)
+            for token in set(tokenize(description)) - STOPWORDS:
+                description_postings.setdefault(token, array("i")).append(doc)
+        self._title_postings = title_postings
+        self._description_postings = description_postings
+        self._words = sorted(set(title_postings) | set(description_postings))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+
+def get_index(data):
+    """
+    return the SearchIndex of a catalog snapshot, building it on first use
+    """
+    return data.derive("searchIndex", SearchIndex)
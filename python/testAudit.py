@@ -0,0 +1,126 @@
+import unittest
+import audit
+import catalogIndex
+import dataStore
+
+
+def make_snapshot(credits):
+    """
+    return a Snapshot of a catalog offered in SP25
+
+    Parameter credits: maps course codes to their credits
+    Precondition: credits is a dict of ints
+    """
+    data = {name: {} for name in dataStore.DATA_FILES}
+    for course_code, credit in credits.items():
+        subject = course_code.rstrip("0123456789")
+        data["course_data_am"].setdefault(subject, {})[course_code] = {
+            "ttl": course_code,
+            "smst": ["SP25"],
+        }
+        session = data["SP_session"].setdefault(subject, {})
+        session[course_code] = {"Grp1": {"crd": [credit]}}
+    return dataStore.Snapshot("test", data)
+
+
+class TestAssign(unittest.TestCase):
+    def setUp(self):
+        self.index = catalogIndex.get_index(
+            make_snapshot({"CS3700": 4, "CS3780": 4, "CS4700": 4, "CS4090": 1})
+        )
+
+    def test_matching(self):
+        """
+        a course moves to the requirement only it can fill
+        """
+        requirements = [
+            audit.Requirement("ML", 1, ["CS3700", "CS3780"]),
+            audit.Requirement("AI", 1, ["CS3700", "CS4700"]),
+        ]
+        assigned = audit.assign(requirements, ["CS3700", "CS3780"], self.index)
+        self.assertEqual(assigned, [["CS3780"], ["CS3700"]])
+
+    def test_double_count(self):
+        """
+        a double_count requirement uses courses the others use, and takes
+        none from them
+        """
+        requirements = [
+            audit.Requirement("ML", 1, ["CS3700", "CS3780"]),
+            audit.Requirement("AI", 1, ["CS3700", "CS4700"]),
+            audit.Requirement("Project", 2, ["CS3700", "CS4090"], double_count=True),
+        ]
+        courses = ["CS3700", "CS3780", "CS4090"]
+        assigned = audit.assign(requirements, courses, self.index)
+        self.assertEqual(assigned, [["CS3780"], ["CS3700"], ["CS3700", "CS4090"]])
+
+    def test_rule(self):
+        """
+        a rule requirement takes the courses of its level and credits
+        """
+        requirement = audit.Requirement("Electives", 2)
+        requirement.rule = True
+        requirement.subject = "CS"
+        requirement.min_level = 4
+        requirement.min_credit = 3
+        courses = ["CS3700", "CS4090", "CS4700"]
+        self.assertEqual(audit.assign([requirement], courses, self.index), [["CS4700"]])
+
+
+class TestAuditMajors(unittest.TestCase):
+    def setUp(self):
+        data = make_snapshot(
+            {
+                "CS2800": 4,
+                "CS3110": 4,
+                "CS3700": 4,
+                "CS4090": 1,
+                "MATH2210": 4,
+                "MATH3110": 4,
+            }
+        )
+        self.audits = [
+            audit.RequirementAudit(
+                "CS",
+                {
+                    "Core": [["CS2800"], ["CS3110"]],
+                    "Electives": {"number": 2, "min_level": 3, "min_credit": 3},
+                },
+                data,
+            ),
+            audit.RequirementAudit(
+                "MATH",
+                {"Core": [["MATH2210"]], "Discrete": [["CS2800", "MATH3110"]]},
+                data,
+            ),
+        ]
+        self.taken = ["CS2800", "CS3110", "CS3700", "CS4090", "MATH2210"]
+
+    def test_share(self):
+        """
+        by default a course counts for every major it fits
+        """
+        result = audit.audit_majors(self.audits, self.taken)
+        self.assertEqual(result["MATH"]["groups"]["Discrete"]["courses"], ["CS2800"])
+        self.assertTrue(result["MATH"]["fulfilled"])
+        self.assertEqual(result["CS"]["groups"]["Electives"]["remaining"], 1)
+        self.assertEqual(result["CS"]["unused"], ["CS4090", "MATH2210"])
+
+    def test_no_share(self):
+        """
+        without sharing a course counts for one major only, and is not
+        unused because another major took it
+        """
+        result = audit.audit_majors(self.audits, self.taken, share=False)
+        core = result["CS"]["groups"]["Core"]
+        self.assertEqual(core["courses"], ["CS2800", "CS3110"])
+        discrete = result["MATH"]["groups"]["Discrete"]
+        self.assertEqual(discrete["courses"], [])
+        self.assertEqual(discrete["missing"], [["CS2800", "MATH3110"]])
+        self.assertFalse(result["MATH"]["fulfilled"])
+        self.assertEqual(result["CS"]["unused"], ["CS4090"])
+        self.assertEqual(result["MATH"]["unused"], ["CS4090"])
+
+
+if __name__ == "__main__":
+    unittest.main()
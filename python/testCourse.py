@@ -0,0 +1,103 @@
+import unittest
+import course
+
+
+def make_courses(lectures):
+    """
+    return the Course objects of courses offered in SP25
+
+    Parameter lectures: maps course codes to the meetings of their lectures
+    Precondition: lectures is a dict of lists of (start, end, pattern) tuples
+    """
+    course_data = {"CS": {}}
+    spring = {"CS": {}}
+    for course_code, meetings in lectures.items():
+        course_data["CS"][course_code] = {"ttl": course_code, "smst": ["SP25"]}
+        group = {"req": ["LEC"]}
+        for number, (start, end, pattern) in enumerate(meetings, 1):
+            group[f"LEC-00{number}"] = {
+                "meeting1": {"tmstart": start, "tmend": end, "ptn": pattern}
+            }
+        spring["CS"][course_code] = {"Grp1": group}
+    return {
+        course_code: course.Course.create(course_code, course_data, spring, {}, {}, {})
+        for course_code in lectures
+    }
+
+
+class TestFulfilled2dList(unittest.TestCase):
+    def test_shared_course(self):
+        """
+        a course in several sublists goes where the others can't
+        """
+        requirement = [["CS3700", "CS3780"], ["CS3700", "CS4700"]]
+        self.assertEqual(
+            course.fulfilled_2dlist(["CS3700", "CS3780"], requirement),
+            ["CS3700", "CS3780"],
+        )
+
+    def test_repeated_course(self):
+        """
+        a course repeated in courses_taken and listed in several sublists is
+        returned once
+        """
+        requirement = [["CS2110", "CS2112"], ["CS2110"], ["CS2800"]]
+        self.assertEqual(
+            course.fulfilled_2dlist(["CS2110", "CS2800", "CS2110"], requirement),
+            ["CS2110", "CS2800"],
+        )
+
+    def test_none_taken(self):
+        self.assertEqual(course.fulfilled_2dlist([], [["CS1110"]]), [])
+
+
+class TestLecTimeOverlap(unittest.TestCase):
+    def setUp(self):
+        self.courses = make_courses(
+            {
+                "CS2110": [("10:10AM", "11:00AM", "MWF")],
+                "CS2800": [
+                    ("10:10AM", "11:00AM", "MWF"),
+                    ("01:25PM", "02:15PM", "MWF"),
+                ],
+                "CS3110": [("10:45AM", "11:35AM", "MW")],
+                "CS3410": [("10:10AM", "11:25AM", "TR")],
+                "CS4090": [("", "", "TBA")],
+            }
+        )
+
+    def overlap(self, first, second):
+        return self.courses[first].lec_time_overlap(self.courses[second], "SP25")
+
+    def test_overlap(self):
+        """
+        lectures at the same time overlap, on other days they do not
+        """
+        self.assertTrue(self.overlap("CS2110", "CS3110"))
+        self.assertTrue(self.overlap("CS3110", "CS2110"))
+        self.assertFalse(self.overlap("CS2110", "CS3410"))
+
+    def test_other_lecture(self):
+        """
+        a course with a lecture that fits does not overlap
+        """
+        self.assertFalse(self.overlap("CS2110", "CS2800"))
+
+    def test_tba(self):
+        """
+        a lecture without a time never overlaps
+        """
+        self.assertFalse(self.overlap("CS2110", "CS4090"))
+
+
+class TestSemesterProvided(unittest.TestCase):
+    def test_listed(self):
+        """
+        a course listed in the schedule of the semester is provided in it
+        """
+        cs2110 = make_courses({"CS2110": [("10:10AM", "11:00AM", "MWF")]})["CS2110"]
+        self.assertEqual(cs2110.semester_provided("SP25"), "Provided in SP25")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import json
+import unittest
+import dataStore
+import eligibility
+
+
+def make_snapshot(courses):
+    """
+    return a Snapshot of a catalog in the short-key format of the roster
+    pipeline, where prereq, coreq and preco are json strings
+
+    Parameter courses: maps course codes to (prereq, coreq, preco)
+    Precondition: courses is a dict of tuples of 2d lists
+    """
+    course_data_am = {}
+    course_data_nz = {}
+    for course_code, (prereq, coreq, preco) in courses.items():
+        subject = course_code.rstrip("0123456789")
+        half = course_data_am if subject[0] <= "M" else course_data_nz
+        half.setdefault(subject, {})[course_code] = {
+            "ttl": course_code,
+            "smst": ["SP25"],
+            "prereq": json.dumps(prereq),
+            "coreq": json.dumps(coreq),
+            "preco": json.dumps(preco),
+        }
+    data = {name: {} for name in dataStore.DATA_FILES}
+    data["course_data_am"] = course_data_am
+    data["course_data_nz"] = course_data_nz
+    return dataStore.Snapshot("test", data)
+
+
+class TestEligibilityShortKeys(unittest.TestCase):
+    def setUp(self):
+        self.data = make_snapshot(
+            {
+                "CS1110": ([], [], []),
+                "CS2110": ([["CS1110", "CS1112"]], [], []),
+                "CS2800": ([], [], []),
+                "CS3110": ([["CS2110"]], [], [["CS2800"]]),
+                "CS4121": ([], [["CS4120"]], []),
+                "CS4120": ([["CS3110"]], [], []),
+                "MATH1920": ([], [], []),
+            }
+        )
+
+    def test_prereq(self):
+        """
+        the prerequisites are read from the json string fields
+        """
+        state = eligibility.get_engine(self.data).new_state([])
+        self.assertTrue(state.is_eligible("CS1110"))
+        self.assertFalse(state.is_eligible("CS2110"))
+        self.assertEqual(state.add("CS1110"), {"CS2110": True})
+
+    def test_preco(self):
+        """
+        a prerequisite or corequisite clause is required like a prerequisite
+        """
+        state = eligibility.get_engine(self.data).new_state(["CS1110", "CS2110"])
+        self.assertFalse(state.is_eligible("CS3110"))
+        self.assertEqual(state.missing("CS3110"), [["CS2800"]])
+        state.add("CS2800")
+        self.assertTrue(state.is_eligible("CS3110"))
+
+    def test_coreq(self):
+        """
+        a corequisite can be taken once its own prerequisites are met
+        """
+        state = eligibility.get_engine(self.data).new_state(["CS1110", "CS2110"])
+        self.assertFalse(state.is_eligible("CS4121"))
+        state.add("CS2800")
+        self.assertEqual(state.add("CS3110"), {"CS4121": True})
+        self.assertEqual(state.remove("CS3110"), {"CS4121": False})
+
+
+if __name__ == "__main__":
+    unittest.main()
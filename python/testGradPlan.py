@@ -0,0 +1,131 @@
+import itertools
+import json
+import unittest
+from unittest import mock
+import dataStore
+import gradPlan
+
+
+def make_snapshot(courses):
+    """
+    return a Snapshot of a catalog of CS courses
+
+    Parameter courses: maps course codes to (credits, semesters, prereq,
+    coreq), where the semesters are the ones the course was offered in
+    Precondition: courses is a dict of tuples of an int, a list of
+    semesters such as "SP25" and two 2d lists
+    """
+    data = {name: {} for name in dataStore.DATA_FILES}
+    for course_code, (credits, semesters, prereq, coreq) in courses.items():
+        data["course_data_am"].setdefault("CS", {})[course_code] = {
+            "ttl": course_code,
+            "smst": semesters,
+            "prereq": json.dumps(prereq),
+            "coreq": json.dumps(coreq),
+            "preco": "[]",
+        }
+        for semester in semesters:
+            session = data[f"{semester[:2]}_session"].setdefault("CS", {})
+            session[course_code] = {"Grp1": {"crd": [credits]}}
+    return dataStore.Snapshot("test", data)
+
+
+SPRING = ["SP25", "SP24", "SP23"]
+
+FALL = ["FA24", "FA23", "FA22"]
+
+CATALOG = {
+    "CS1110": (4, SPRING + FALL, [], []),
+    "CS2110": (4, SPRING + FALL, [["CS1110"]], []),
+    "CS2800": (4, SPRING + FALL, [], []),
+    "CS3110": (4, SPRING + FALL, [["CS2110"]], []),
+    "CS4120": (4, SPRING + FALL, [], []),
+    "CS4121": (4, SPRING + FALL, [], [["CS4120"]]),
+}
+
+CORE = {"CS": {"Core": [["CS1110"], ["CS2110"], ["CS3110"], ["CS2800"]]}}
+
+
+class TestGraduationPlanner(unittest.TestCase):
+    def setUp(self):
+        self.data = make_snapshot(CATALOG)
+
+    def plan(self, majors, cap=gradPlan.DEFAULT_CREDIT_CAP):
+        return gradPlan.plan_graduation(majors, [], self.data, "FA25", cap)
+
+    def courses(self, result):
+        return [sem["courses"] for sem in result["semesters"]]
+
+    def test_lower_bound(self):
+        """
+        the plan is as long as the longest prerequisite chain, or as the
+        credits over the cap if that is longer
+        """
+        result = self.plan(CORE)
+        self.assertEqual(result["min_semesters"], 3)
+        self.assertEqual(
+            self.courses(result), [["CS1110", "CS2800"], ["CS2110"], ["CS3110"]]
+        )
+        self.assertTrue(result["optimal"])
+        self.assertEqual(self.plan(CORE, cap=4)["min_semesters"], 4)
+
+    def test_credit_cap(self):
+        """
+        no semester takes more credits than the cap
+        """
+        result = self.plan(CORE, cap=4)
+        self.assertEqual(len(result["semesters"]), 4)
+        self.assertEqual([sem["credits"] for sem in result["semesters"]], [4] * 4)
+        self.assertEqual(result["credits"], 16)
+
+    def test_coreq(self):
+        """
+        a corequisite is taken in the same semester when the cap allows it,
+        and earlier otherwise
+        """
+        majors = {"CS": {"Core": [["CS4121"]]}}
+        self.assertEqual(self.courses(self.plan(majors)), [["CS4120", "CS4121"]])
+        self.assertEqual(
+            self.courses(self.plan(majors, cap=4)), [["CS4120"], ["CS4121"]]
+        )
+
+    def test_greedy(self):
+        """
+        a search out of budget settles for the greedy plan, which still keeps
+        the prerequisites and the cap
+        """
+        planner = gradPlan.GraduationPlanner(CORE, [], self.data, "FA25", 8)
+        greedy = mock.Mock(wraps=planner._greedy)
+        clock = mock.Mock(side_effect=itertools.count())
+        with mock.patch.object(planner, "_greedy", greedy), mock.patch.object(
+            gradPlan.time, "perf_counter", clock
+        ):
+            result = planner.plan(budget=0.5)
+        greedy.assert_called_once()
+        self.assertEqual(
+            self.courses(result), [["CS1110", "CS2800"], ["CS2110"], ["CS3110"]]
+        )
+        self.assertTrue(all(sem["credits"] <= 8 for sem in result["semesters"]))
+
+    def test_start_season(self):
+        """
+        a course offered in neither season of the plan is unmet, and so is
+        the course that requires it, instead of stalling the planner
+        """
+        data = make_snapshot(
+            {
+                "CS1110": (4, SPRING, [], []),
+                "CS2110": (4, SPRING + FALL, [["CS1110"]], []),
+                "CS3110": (4, FALL, [], []),
+            }
+        )
+        majors = {"CS": {"Core": [["CS1110"], ["CS2110"], ["CS3110"]]}}
+        result = gradPlan.plan_graduation(majors, [], data, start="SU25")
+        self.assertEqual(len(result["unmet"]), 2)
+        self.assertEqual(result["requirements"], {"CS": {"Core": ["CS3110"]}})
+        planned = [code for sem in result["semesters"] for code in sem["courses"]]
+        self.assertEqual(planned, ["CS3110"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import catalogIndex
+import dataStore
+import level
+
+
+def make_snapshot(credits):
+    """
+    return a Snapshot of a catalog offered in SP25
+
+    Parameter credits: maps course codes to their credits
+    Precondition: credits is a dict of ints
+    """
+    data = {name: {} for name in dataStore.DATA_FILES}
+    for course_code, credit in credits.items():
+        subject = course_code.rstrip("0123456789")
+        data["course_data_am"].setdefault(subject, {})[course_code] = {
+            "ttl": course_code,
+            "smst": ["SP25"],
+        }
+        session = data["SP_session"].setdefault(subject, {})
+        session[course_code] = {"Grp1": {"crd": [credit]}}
+    return dataStore.Snapshot("test", data)
+
+
+class TestLevel(unittest.TestCase):
+    def setUp(self):
+        self.data = make_snapshot(
+            {"ARTH2000": 4, "ARTH3100": 4, "ARTH3200": 1, "ARTH4101": 3}
+        )
+
+    def test_level(self):
+        """
+        the level helpers select from the snapshot they are given
+        """
+        self.assertEqual(
+            level.level(self.data, "ARTH", 3, excluded=["ARTH4101"]), ["ARTH3100"]
+        )
+        self.assertEqual(
+            level.only_level(self.data, "ARTH", 3, min_credit=1),
+            ["ARTH3100", "ARTH3200"],
+        )
+        self.assertTrue(level.match_level(self.data, "ARTH4101", "ARTH", 3))
+        self.assertFalse(level.match_level(self.data, "ARTH3200", "ARTH", 3))
+        other = make_snapshot({"ARTH3300": 3})
+        self.assertEqual(level.level(other, "ARTH", 3), ["ARTH3300"])
+
+    def test_malformed(self):
+        """
+        codes that are not course codes are collected instead of indexed
+        """
+        self.data.course_data_am["ARTH"]["ARTH31"] = {"ttl": "", "smst": []}
+        index = catalogIndex.get_index(self.data)
+        self.assertEqual(index.get_malformed(), ["ARTH31"])
+        self.assertFalse(index.contains("ARTH31"))
+
+
+if __name__ == "__main__":
+    unittest.main()
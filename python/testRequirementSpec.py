@@ -0,0 +1,156 @@
+import unittest
+import dataStore
+import requirementSpec
+
+
+def make_snapshot(credits):
+    """
+    return a Snapshot of a catalog offered in SP25
+
+    Parameter credits: maps course codes to their credits
+    Precondition: credits is a dict of ints
+    """
+    data = {name: {} for name in dataStore.DATA_FILES}
+    for course_code, credit in credits.items():
+        subject = course_code.rstrip("0123456789")
+        half = "course_data_am" if subject[0] <= "M" else "course_data_nz"
+        data[half].setdefault(subject, {})[course_code] = {
+            "ttl": course_code,
+            "smst": ["SP25"],
+        }
+        session = data["SP_session"].setdefault(subject, {})
+        session[course_code] = {"Grp1": {"crd": [credit]}}
+    return dataStore.Snapshot("test", data)
+
+
+def make_spec(*requirements):
+    spec = {"major": "ARTH", "college": "CAS", "requirements": list(requirements)}
+    requirementSpec.validate(spec)
+    return spec
+
+
+class TestCompiledRequirement(unittest.TestCase):
+    def setUp(self):
+        self.data = make_snapshot(
+            {
+                "ARTH2000": 4,
+                "ARTH2100": 3,
+                "ARTH3100": 4,
+                "ARTH3200": 1,
+                "ARTH4101": 4,
+                "ARTH4200": 3,
+                "MATH1920": 4,
+            }
+        )
+
+    def compile(self, *requirements):
+        return requirementSpec.CompiledMajor(make_spec(*requirements), self.data)
+
+    def test_level(self):
+        """
+        a level rule selects its subject and levels with at least min_credit
+        credits, and needs number of them
+        """
+        major = self.compile(
+            {
+                "id": "ARTH_req1",
+                "type": "level",
+                "subject": "ARTH",
+                "min_level": 3,
+                "number": 2,
+                "excluded": ["ARTH4101"],
+            }
+        )
+        requirement = major.get_requirement("ARTH_req1")
+        self.assertEqual(requirement.courses, {"ARTH3100", "ARTH4200"})
+        self.assertFalse(requirement.is_met(["ARTH3100", "ARTH3200"]))
+        self.assertTrue(requirement.is_met(["ARTH3100", "ARTH4200"]))
+
+    def test_course_groups(self):
+        """
+        type C needs a course of every group unless number says fewer
+        """
+        major = self.compile(
+            {
+                "id": "ARTH_req1",
+                "type": "C",
+                "courseGrps": [
+                    {"id": 1, "courses": ["ARTH2000"]},
+                    {"id": 2, "courses": ["ARTH3100", "ARTH3200"]},
+                ],
+            },
+            {
+                "id": "ARTH_req2",
+                "type": "C",
+                "number": 1,
+                "courseGrps": [
+                    {"id": 1, "courses": ["ARTH2000"]},
+                    {"id": 2, "courses": ["ARTH2100"]},
+                ],
+            },
+        )
+        taken = ["ARTH2000", "ARTH2000"]
+        self.assertEqual([r.id for r in major.get_unmet(taken)], ["ARTH_req1"])
+        self.assertEqual(major.get_unmet(taken + ["ARTH3200"]), [])
+
+    def test_credit(self):
+        """
+        a credit rule counts the credits of its courses, whatever their
+        number
+        """
+        major = self.compile(
+            {
+                "id": "ARTH_req1",
+                "type": "credit",
+                "subject": "ARTH",
+                "min_level": 2,
+                "min_credit": 0,
+                "credits": 8,
+            }
+        )
+        requirement = major.get_requirement("ARTH_req1")
+        self.assertFalse(requirement.is_met(["ARTH2100", "ARTH3200", "MATH1920"]))
+        self.assertFalse(requirement.is_met(["ARTH2100", "ARTH2100", "ARTH3200"]))
+        self.assertTrue(requirement.is_met(["ARTH2100", "ARTH3200", "ARTH4101"]))
+
+    def test_credit_needs_credits(self):
+        """
+        a credit rule without credits is malformed
+        """
+        with self.assertRaises(ValueError):
+            make_spec(
+                {"id": "ARTH_req1", "type": "credit", "subject": "ARTH", "level": 2}
+            )
+
+
+class TestSpecFromMajorData(unittest.TestCase):
+    def test_groups(self):
+        """
+        list groups become type C and level groups type level, with the
+        features of the file
+        """
+        major_data = {
+            "A&S": {
+                "Core": [["ARTH2000", "Equivalent"], "ARTH2100"],
+                "Electives": {"number": 2, "min_level": 3},
+                "Any": {"number": 1, "subject": "any"},
+            },
+            "Features": {
+                "A&S": {"Core": {"tag": "Core", "tagDescr": "core", "score": 10}}
+            },
+        }
+        spec = requirementSpec.spec_from_major_data("ARTH", major_data, "CAS")
+        requirementSpec.validate(spec)
+        core, electives = spec["requirements"]
+        self.assertEqual(core["type"], "C")
+        self.assertEqual(
+            [grp["courses"] for grp in core["courseGrps"]],
+            [["ARTH2000"], ["ARTH2100"]],
+        )
+        self.assertEqual(core["score"], 10)
+        self.assertEqual(electives["type"], "level")
+        self.assertEqual(electives["subject"], "ARTH")
+
+
+if __name__ == "__main__":
+    unittest.main()
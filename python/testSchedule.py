@@ -0,0 +1,206 @@
+import unittest
+import dataStore
+import schedule
+
+
+def meeting(start, end, pattern, first=None, last=None):
+    """
+    return a meeting of the session json, over the whole term unless first
+    and last dates are given
+    """
+    result = {"tmstart": start, "tmend": end, "ptn": pattern}
+    if first:
+        result["start_dt"] = first
+        result["end_dt"] = last
+    return result
+
+
+def section(key, *meetings):
+    return schedule.Section(key, list(meetings))
+
+
+def option(course_code, score, *sections):
+    return schedule.Option(course_code, "Grp1", list(sections), score)
+
+
+class TestSection(unittest.TestCase):
+    def test_overlap(self):
+        """
+        sections conflict when their meetings share minutes of a day
+        """
+        mwf = section("LEC-001", meeting("10:10AM", "11:00AM", "MWF"))
+        late = section("LEC-002", meeting("10:55AM", "11:45AM", "W"))
+        after = section("LEC-003", meeting("11:00AM", "11:50AM", "MWF"))
+        tr = section("LEC-004", meeting("10:10AM", "11:25AM", "TR"))
+        self.assertTrue(mwf.conflicts(late))
+        self.assertTrue(late.conflicts(mwf))
+        self.assertFalse(mwf.conflicts(after))
+        self.assertFalse(mwf.conflicts(tr))
+
+    def test_dates(self):
+        """
+        sections at the same time conflict only if their dates overlap
+        """
+        first_half = section(
+            "LEC-001", meeting("09:05AM", "09:55AM", "TR", "01/21/2025", "03/07/2025")
+        )
+        second_half = section(
+            "LEC-002", meeting("09:05AM", "09:55AM", "TR", "03/10/2025", "05/06/2025")
+        )
+        middle = section(
+            "LEC-003", meeting("09:30AM", "10:20AM", "R", "03/01/2025", "03/20/2025")
+        )
+        whole = section("LEC-004", meeting("09:05AM", "09:55AM", "T"))
+        self.assertFalse(first_half.conflicts(second_half))
+        self.assertTrue(middle.conflicts(first_half))
+        self.assertTrue(middle.conflicts(second_half))
+        self.assertTrue(whole.conflicts(first_half))
+
+    def test_tba(self):
+        """
+        a meeting without days or times never conflicts
+        """
+        tba = section("LEC-001", meeting("", "", "TBA"))
+        no_days = section("LEC-002", meeting("09:05AM", "09:55AM", ""))
+        lecture = section("LEC-003", meeting("09:05AM", "09:55AM", "MTWRF"))
+        self.assertEqual(tba.mask, 0)
+        self.assertFalse(tba.conflicts(lecture))
+        self.assertFalse(no_days.conflicts(lecture))
+
+
+class TestCourseOptions(unittest.TestCase):
+    def setUp(self):
+        self.session_info = {
+            "Grp1": {
+                "req": ["LEC", "DIS"],
+                "LEC-001": {"meeting1": meeting("10:10AM", "11:00AM", "MWF")},
+                "DIS-201": {"meeting1": meeting("10:10AM", "11:00AM", "F")},
+                "DIS-202": {"meeting1": meeting("07:30AM", "08:20AM", "T")},
+                "DIS-203": {"meeting1": meeting("02:30PM", "03:20PM", "T")},
+                "DIS-204": {
+                    "open": "C",
+                    "meeting1": meeting("03:35PM", "04:25PM", "R"),
+                },
+            }
+        }
+
+    def test_options(self):
+        """
+        the options skip conflicting sections and come best first
+        """
+        options = schedule.course_options(
+            "CS2110", self.session_info, schedule.Preferences()
+        )
+        self.assertEqual(
+            [option.sections[-1].key for option in options],
+            ["DIS-203", "DIS-202", "DIS-204"],
+        )
+        self.assertEqual([option.score for option in options], [0.0, -0.5, -20.0])
+
+    def test_limit(self):
+        """
+        only the limit best options are kept
+        """
+        options = schedule.course_options(
+            "CS2110", self.session_info, schedule.Preferences(), limit=2
+        )
+        self.assertEqual(
+            [option.sections[-1].key for option in options], ["DIS-203", "DIS-202"]
+        )
+
+
+class TestFindSchedules(unittest.TestCase):
+    def test_best_compatible(self):
+        """
+        the schedules combine one option of every course without conflicts,
+        best total score first
+        """
+        morning = section("LEC-001", meeting("09:05AM", "09:55AM", "MWF"))
+        noon = section("LEC-002", meeting("12:20PM", "01:10PM", "MWF"))
+        also_morning = section("LEC-001", meeting("09:05AM", "10:20AM", "MW"))
+        options = {
+            "CS2110": [option("CS2110", 0.0, morning), option("CS2110", -1.0, noon)],
+            "CS2800": [option("CS2800", 0.0, also_morning)],
+        }
+        found, complete = schedule.find_schedules(options)
+        self.assertTrue(complete)
+        self.assertEqual(len(found), 1)
+        score, chosen = found[0]
+        self.assertEqual(score, -1.0)
+        self.assertEqual([o.sections[0] for o in chosen], [also_morning, noon])
+
+    def test_order_and_limit(self):
+        """
+        the limit best schedules are returned, best first
+        """
+        times = [("09:05AM", "09:55AM"), ("10:10AM", "11:00AM"), ("11:15AM", "12:05PM")]
+        lectures = [section("LEC-001", meeting(*time, "M")) for time in times]
+        calculus = section("LEC-001", meeting("01:25PM", "02:15PM", "M"))
+        options = {
+            "CS2110": [
+                option("CS2110", -float(hour), lecture)
+                for hour, lecture in enumerate(lectures)
+            ],
+            "MATH1920": [option("MATH1920", -0.5, calculus)],
+        }
+        found, complete = schedule.find_schedules(options, limit=2)
+        self.assertTrue(complete)
+        self.assertEqual([score for score, _ in found], [-0.5, -1.5])
+
+    def test_impossible(self):
+        """
+        courses that cannot fit together give no schedule
+        """
+        lecture = section("LEC-001", meeting("09:05AM", "09:55AM", "MWF"))
+        options = {
+            "CS2110": [option("CS2110", 0.0, lecture)],
+            "CS2800": [option("CS2800", 0.0, lecture)],
+        }
+        self.assertEqual(schedule.find_schedules(options), ([], True))
+
+
+class TestPlanSchedules(unittest.TestCase):
+    def test_plan(self):
+        """
+        the schedules name the sections of every course, and a course missing
+        from the session is not offered
+        """
+        data = {name: {} for name in dataStore.DATA_FILES}
+        data["SP_session"] = {
+            "CS": {
+                "CS2110": {
+                    "Grp1": {
+                        "LEC-001": {"meeting1": meeting("10:10AM", "11:00AM", "MWF")}
+                    }
+                },
+                "CS2800": {
+                    "Grp1": {
+                        "LEC-001": {"meeting1": meeting("10:10AM", "11:00AM", "MWF")},
+                        "LEC-002": {"meeting1": meeting("01:25PM", "02:40PM", "TR")},
+                    }
+                },
+            }
+        }
+        result = schedule.plan_schedules(
+            ["CS2110", "CS2800", "CS9999"],
+            "SP26",
+            dataStore.Snapshot("test", data),
+        )
+        self.assertEqual(result["not_offered"], ["CS9999"])
+        self.assertTrue(result["complete"])
+        self.assertEqual(
+            result["schedules"],
+            [
+                {
+                    "score": 0.0,
+                    "courses": {
+                        "CS2110": {"group": "Grp1", "sections": ["LEC-001"]},
+                        "CS2800": {"group": "Grp1", "sections": ["LEC-002"]},
+                    },
+                }
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
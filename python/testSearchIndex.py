@@ -0,0 +1,110 @@
+import unittest
+from unittest import mock
+import dataStore
+import searchIndex
+
+CATALOG = {
+    "CS1110": ("Introduction to Computing Using Python", "Programming in Python."),
+    "CS2110": ("Object-Oriented Programming and Data Structures", "Java."),
+    "CS2112": ("Object-Oriented Design and Data Structures - Honors", ""),
+    "CS2800": ("Mathematical Foundations of Computing", "Discrete structures."),
+    "CS3110": ("Functional Programming", "Requires CS 2110 and CS 2800."),
+    "ARTH1100": ("Introduction to the History of Art", "Painting."),
+    "MATH1920": ("Multivariable Calculus for Engineers", "Vectors."),
+}
+
+
+def make_snapshot(catalog):
+    """
+    return a Snapshot of a catalog
+
+    Parameter catalog: maps course codes to their (title, description)
+    Precondition: catalog is a dict of tuples of two str
+    """
+    data = {name: {} for name in dataStore.DATA_FILES}
+    for course_code, (title, description) in catalog.items():
+        subject = course_code.rstrip("0123456789")
+        half = "course_data_am" if subject[0] <= "M" else "course_data_nz"
+        data[half].setdefault(subject, {})[course_code] = {
+            "ttl": title,
+            "dsrpn": description,
+        }
+    return dataStore.Snapshot("test", data)
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = searchIndex.SearchIndex(make_snapshot(CATALOG))
+
+    def codes(self, query, limit=searchIndex.DEFAULT_LIMIT):
+        return [result["course_code"] for result in self.index.search(query, limit)]
+
+    def test_ranking(self):
+        """
+        a word in the title ranks above a word in the description, and every
+        query word must match
+        """
+        self.assertEqual(self.codes("python"), ["CS1110"])
+        self.assertEqual(self.codes("programming")[-1], "CS1110")
+        self.assertEqual(set(self.codes("programming")[:2]), {"CS2110", "CS3110"})
+        self.assertEqual(set(self.codes("data structures")), {"CS2110", "CS2112"})
+        self.assertEqual(self.codes("python calculus"), [])
+
+    def test_prefix(self):
+        """
+        a word still being typed matches the words it starts
+        """
+        self.assertEqual(set(self.codes("intro")), {"CS1110", "ARTH1100"})
+        self.assertEqual(self.codes("multivar"), ["MATH1920"])
+        self.assertEqual(self.codes("structures"), ["CS2110", "CS2112", "CS2800"])
+
+    def test_codes(self):
+        """
+        the courses whose code starts with the query come first, in code order
+        """
+        self.assertEqual(self.codes("cs21"), ["CS2110", "CS2112"])
+        self.assertEqual(self.codes("CS 2110"), ["CS2110", "CS3110"])
+        self.assertEqual(self.codes("CS", limit=3), ["CS1110", "CS2110", "CS2112"])
+        self.assertEqual(
+            self.index.search("MATH1920"),
+            [{"course_code": "MATH1920", "title": CATALOG["MATH1920"][0]}],
+        )
+
+    def test_stopwords(self):
+        """
+        stopwords are dropped from queries of several words, unless the query
+        has nothing else
+        """
+        self.assertEqual(self.codes("the history of art"), self.codes("history art"))
+        self.assertEqual(self.codes("the of"), ["ARTH1100", "CS2800"])
+
+    def test_cache(self):
+        """
+        repeated queries come from the cache, which drops the oldest query
+        when it is full
+        """
+        with mock.patch.object(searchIndex, "CACHE_SIZE", 2):
+            first = self.index.search("python")
+            first.clear()
+            self.assertEqual(self.codes("python"), ["CS1110"])
+            self.codes("calculus")
+            self.codes("java")
+            limit = searchIndex.DEFAULT_LIMIT
+            self.assertEqual(
+                list(self.index._cache), [("CALCULUS", limit), ("JAVA", limit)]
+            )
+
+    def test_budget(self):
+        """
+        a query cut short by its budget is not cached
+        """
+        clock = mock.Mock(side_effect=range(100))
+        with mock.patch.object(searchIndex.time, "perf_counter", clock):
+            self.index.search("programming", budget=0.5)
+        self.assertEqual(len(self.index._cache), 0)
+        self.index.search("programming")
+        self.assertEqual(len(self.index._cache), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()